@@ -4,9 +4,19 @@ from flask_limiter.errors import RateLimitExceeded
 from app.extensions import db, migrate, login_manager, mail, limiter, scheduler, csrf
 
 
-from app.services.audit_retention import auto_archive_old_audit_logs
-from app.services.audit_cleanup_service import cleanup_old_archived_audit_logs
+from app.services.audit_retention import auto_archive_job
+from app.services.audit_cleanup_service import cleanup_archived_job
+from app.services.audit_cold_storage import cold_storage_job
+from app.services.audit_insight_service import generate_insights_job
+from app.services.export_jobs import export_sweeper_job
+from app.services.email_outbox import email_outbox_job, purge_sent_emails_job
+from app.services.stock_reservations import release_expired_reservations_job
+from app.services.stock_shards import consolidate_stock_shards_job
 from app.services.system_jobs import cleanup_expired_otps
+from app.services.dashboard_metrics_service import refresh_dashboard_snapshot
+from app.services.rating_service import reconcile_rating_aggregates
+from app.utils import rate_limit_storage  # noqa: F401 (registers sql+... limiter storage)
+from app.utils.server_session import SqlSessionInterface, purge_expired_sessions_job
 from flask_login import current_user
 from app.models import Wishlist, User
 from sqlalchemy import func
@@ -49,6 +59,12 @@ def create_app():
     limiter.init_app(app)
     csrf.init_app(app)
 
+    # --------------------------------------------------
+    # SESSIONS (server-side → cookie carries only the id)
+    # --------------------------------------------------
+    if app.config.get("SESSION_STORE", "sql") == "sql":
+        app.session_interface = SqlSessionInterface()
+
     # --------------------------------------------------
     # INIT SCHEDULER
     # --------------------------------------------------
@@ -57,23 +73,99 @@ def create_app():
     # 🔁 90 DAYS → AUTO ARCHIVE AUDIT LOGS (01:30 AM)
     scheduler.add_job(
         id="audit_auto_archive_90_days",
-        func=auto_archive_old_audit_logs,
+        func=auto_archive_job,
         trigger="cron",
         hour=1,
         minute=30,
         replace_existing=True
     )
 
+    # 🧊 ARCHIVED LOGS → COLD STORAGE SEGMENTS (01:45 AM)
+    if app.config.get("AUDIT_COLD_STORAGE_ENABLED", True):
+        scheduler.add_job(
+            id="audit_cold_storage",
+            func=cold_storage_job,
+            trigger="cron",
+            hour=1,
+            minute=45,
+            replace_existing=True
+        )
+
     # 🔁 180 DAYS → AUTO DELETE ARCHIVED LOGS (02:00 AM)
     scheduler.add_job(
         id="audit_cleanup_180_days",
-        func=lambda: cleanup_old_archived_audit_logs(days=180),
+        func=lambda: cleanup_archived_job(days=180),
         trigger="cron",
         hour=2,
         minute=0,
         replace_existing=True
     )
 
+    # 🧠 AUDIT INSIGHTS (EVERY 15 MINUTES BY DEFAULT)
+    scheduler.add_job(
+        id="generate_audit_insights",
+        func=generate_insights_job,
+        trigger="interval",
+        minutes=app.config.get("AUDIT_INSIGHTS_MINUTES", 15),
+        replace_existing=True
+    )
+
+    # 📦 EXPORT JOBS: PICKUP / RESTART / EXPIRE (EVERY MINUTE)
+    scheduler.add_job(
+        id="export_jobs_sweeper",
+        func=export_sweeper_job,
+        trigger="interval",
+        minutes=1,
+        replace_existing=True
+    )
+
+    # ✉️ EMAIL OUTBOX: KEEP WORKERS ALIVE / PICK UP LEFTOVERS (EVERY MINUTE)
+    scheduler.add_job(
+        id="email_outbox",
+        func=email_outbox_job,
+        trigger="interval",
+        minutes=1,
+        replace_existing=True
+    )
+
+    # ✉️ PURGE DELIVERED EMAILS (03:15 AM)
+    scheduler.add_job(
+        id="purge_sent_emails",
+        func=purge_sent_emails_job,
+        trigger="cron",
+        hour=3,
+        minute=15,
+        replace_existing=True
+    )
+
+    # ⏳ RELEASE EXPIRED STOCK RESERVATIONS (EVERY MINUTE)
+    scheduler.add_job(
+        id="release_expired_stock_reservations",
+        func=release_expired_reservations_job,
+        trigger="interval",
+        minutes=1,
+        replace_existing=True
+    )
+
+    # ⚡ CONSOLIDATE HOT SKU STOCK SHARDS → products.stock
+    scheduler.add_job(
+        id="consolidate_stock_shards",
+        func=consolidate_stock_shards_job,
+        trigger="interval",
+        seconds=app.config.get("STOCK_SHARD_CONSOLIDATE_SECONDS", 30),
+        replace_existing=True
+    )
+
+    # 🍪 PURGE EXPIRED SERVER-SIDE SESSIONS
+    if app.config.get("SESSION_STORE", "sql") == "sql":
+        scheduler.add_job(
+            id="purge_expired_sessions",
+            func=purge_expired_sessions_job,
+            trigger="interval",
+            minutes=app.config.get("SERVER_SESSION_SWEEP_MINUTES", 15),
+            replace_existing=True
+        )
+
     # 🔁 CLEANUP EXPIRED OTPS (EVERY 6 HOURS)
     scheduler.add_job(
         id="cleanup_expired_otps",
@@ -83,6 +175,25 @@ def create_app():
         replace_existing=True
     )
 
+    # 🔁 ADMIN DASHBOARD SNAPSHOT (EVERY MINUTE BY DEFAULT)
+    scheduler.add_job(
+        id="refresh_dashboard_snapshot",
+        func=refresh_dashboard_snapshot,
+        trigger="interval",
+        seconds=app.config.get("DASHBOARD_SNAPSHOT_SECONDS", 60),
+        replace_existing=True
+    )
+
+    # 🔁 RECONCILE PRODUCT RATING AGGREGATES (03:30 AM)
+    scheduler.add_job(
+        id="reconcile_rating_aggregates",
+        func=reconcile_rating_aggregates,
+        trigger="cron",
+        hour=3,
+        minute=30,
+        replace_existing=True
+    )
+
     if not scheduler.running:
         scheduler.start()
 
@@ -181,7 +292,29 @@ def create_app():
     # --------------------------------------------------
     # CLI COMMANDS
     # --------------------------------------------------
-    from app.commands import cleanup_otps_command
+    from app.commands import (
+        cleanup_otps_command,
+        reconcile_ratings_command,
+        archive_audit_logs_command,
+        cleanup_audit_logs_command,
+        move_audit_logs_cold_command,
+        backfill_audit_rollups_command,
+        generate_audit_insights_command,
+        send_queued_emails_command,
+        compile_email_templates_command,
+        shard_stock_command,
+        consolidate_stock_shards_command,
+    )
     app.cli.add_command(cleanup_otps_command)
+    app.cli.add_command(reconcile_ratings_command)
+    app.cli.add_command(archive_audit_logs_command)
+    app.cli.add_command(cleanup_audit_logs_command)
+    app.cli.add_command(move_audit_logs_cold_command)
+    app.cli.add_command(backfill_audit_rollups_command)
+    app.cli.add_command(generate_audit_insights_command)
+    app.cli.add_command(send_queued_emails_command)
+    app.cli.add_command(compile_email_templates_command)
+    app.cli.add_command(shard_stock_command)
+    app.cli.add_command(consolidate_stock_shards_command)
 
     return app
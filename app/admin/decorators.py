@@ -1,7 +1,7 @@
 from functools import wraps
 from flask import session, redirect, url_for, flash
-from app.models import Admin
 from flask_login import current_user
+from app.services.identity_cache import get_admin_identity, admin_session_valid
 
 
 # --------------------------------------------------
@@ -17,8 +17,8 @@ def admin_required(view_func):
             flash("Please login as admin.", "warning")
             return redirect(url_for("admin.login"))
 
-        admin = Admin.query.get(admin_id)
-        if not admin or admin.session_version != session_version:
+        # 🔐 cached (id, session_version, is_active) check
+        if not admin_session_valid(admin_id, session_version):
             session.clear()
             flash("Session expired. Please login again.", "warning")
             return redirect(url_for("admin.login"))
@@ -41,14 +41,14 @@ def super_admin_required(view_func):
             flash("Please login as admin.", "warning")
             return redirect(url_for("admin.login"))
 
-        admin = Admin.query.get(admin_id)
-        if not admin or admin.session_version != session_version:
+        # 🔐 cached (id, session_version, is_active) check
+        if not admin_session_valid(admin_id, session_version):
             session.clear()
             flash("Session expired. Please login again.", "warning")
             return redirect(url_for("admin.login"))
 
         # 🔐 SUPER ADMIN CHECK
-        if not admin.is_super_admin:
+        if not get_admin_identity(admin_id)["is_super_admin"]:
             flash("Unauthorized: Super Admin access required.", "danger")
             return redirect(url_for("admin.dashboard"))
 
@@ -7,3 +7,4 @@ from .audit_insight_routes import *
 from .security_health_routes import *
 from .product_routes import *
 from .attributes_routes import *
+from .export_job_routes import *
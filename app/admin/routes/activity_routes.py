@@ -1,16 +1,21 @@
-from flask import render_template, request, Response
+from flask import render_template, request
 from app.admin import admin_bp
 from app.admin.decorators import admin_required
-from app.models import AdminActivityLog
+from app.models import AdminActivityLog, AuditRollup
 from datetime import datetime, timezone, timedelta
-from app.utils.time_utils import to_ist, ist_date_to_utc
-import csv
-from io import StringIO
 from flask import session
 from app.utils.activity_logger import log_admin_action
 from app.extensions import db
 from sqlalchemy import func
 from app.extensions import csrf
+from app.utils.pagination import paginate_request
+from app.utils.csv_export import csv_response
+from app.services.audit_rollup_service import set_archived, hour_bucket
+from app.services.audit_log_query import (
+    AUDIT_LOG_KEYS, parse_filters, apply_filters,
+    archived_page, iter_export_rows, with_ist_time,
+    AUDIT_CSV_HEADER, audit_log_csv_row
+)
 
 
 #---------------------------------------------
@@ -20,81 +25,32 @@ from app.extensions import csrf
 @admin_required
 def admin_audit_logs():
 
-    q = request.args.get("q", "").strip()
-    action = request.args.get("action")
-    severity = request.args.get("severity")
-    archived = request.args.get("archived")
-    from_date = request.args.get("from_date")
-    to_date = request.args.get("to_date")
-
-    query = AdminActivityLog.query
+    # 🔒 RBAC + search / action / severity / archive / IST date filters
+    filters = parse_filters(
+        request.args,
+        is_super_admin=session.get("is_super_admin", False)
+    )
 
-    # 🔒 RBAC HARDENING
-    is_super_admin = session.get("is_super_admin", False)
+    query = apply_filters(AdminActivityLog.query, filters)
 
-    if not is_super_admin:
-        # Normal admins CANNOT see system or bulk logs
-        query = query.filter(
-            AdminActivityLog.actor_type == "admin",
-            AdminActivityLog.is_bulk == 0
+    if filters["archived"]:
+        # 🗄️ archived rows still in the table + cold storage segments
+        pagination = archived_page(
+            query,
+            filters,
+            cursor=request.args.get("cursor"),
+            per_page=20
         )
-
-    # 🔍 SEARCH (admin_id / target_user_id)
-    if q:
-        if q.isdigit():
-            query = query.filter(
-                (AdminActivityLog.admin_id == int(q)) |
-                (AdminActivityLog.target_user_id == int(q))
-            )
-        else:
-            query = query.join(AdminActivityLog.admin).filter(
-                AdminActivityLog.admin.has(email=q)
-            )
-
-    # 🔍 ACTION FILTER
-    if action:
-        query = query.filter(AdminActivityLog.action.ilike(f"%{action}%"))
-
-    # SEVERITY FILTER (PURE)
-    if severity:
-        query = query.filter(AdminActivityLog.severity == severity)
-
-    # 🗄️ ARCHIVE FILTER (GLOBAL)
-    if archived == "1":
-        query = query.filter(AdminActivityLog.is_archived.is_(True))
     else:
-        query = query.filter(AdminActivityLog.is_archived.is_(False))
-
-    # 📅 DATE FILTER (IST DAY RANGE – AUDIT SAFE)
-    if from_date:
-        ist_start = datetime.strptime(from_date, "%Y-%m-%d")
-        utc_start = ist_date_to_utc(ist_start)
-
-        # 🔒 subtract 1 second buffer for boundary safety
-        utc_start = utc_start - timedelta(seconds=1)
-
-        query = query.filter(AdminActivityLog.created_at >= utc_start)
-
-    if to_date:
-        ist_end = datetime.strptime(to_date, "%Y-%m-%d") + timedelta(days=1)
-        utc_end = ist_date_to_utc(ist_end)
-        query = query.filter(AdminActivityLog.created_at < utc_end)
-
-
-
-    page = request.args.get("page", 1, type=int)
-    per_page = 20
-
-    pagination = (
-        query
-        .order_by(AdminActivityLog.created_at.desc())
-        .paginate(page=page, per_page=per_page, error_out=False)
-    )
-
-    logs = pagination.items
+        # ?cursor= → keyset pages (deep pages stay O(per_page))
+        pagination = paginate_request(
+            query,
+            AUDIT_LOG_KEYS,
+            request.args,
+            per_page=20
+        )
 
-    for log in logs:
-        log.ist_time = to_ist(log.created_at)
+    logs = with_ist_time(pagination.items)
 
     return render_template(
         "admin/admin_activity_logs.html",
@@ -111,16 +67,10 @@ def admin_audit_logs():
 @admin_required
 def archive_audit_log(log_id):
     try:
-        updated = (
-            AdminActivityLog.query
-            .filter(
-                AdminActivityLog.id == log_id,
-                AdminActivityLog.is_archived.is_(False)
-            )
-            .update(
-                {"is_archived": True},
-                synchronize_session=False
-            )
+        # 📊 audit_rollups archived counters move in the same transaction
+        updated = set_archived(
+            AdminActivityLog.id == log_id,
+            archived=True
         )
 
         if updated == 0:
@@ -156,16 +106,10 @@ def bulk_archive_audit_logs():
         return {"error": "No logs selected"}, 400
 
     try:
-        updated = (
-            AdminActivityLog.query
-            .filter(
-                AdminActivityLog.id.in_(log_ids),
-                AdminActivityLog.is_archived.is_(False)
-            )
-            .update(
-                {"is_archived": True},
-                synchronize_session=False
-            )
+        # 📊 audit_rollups archived counters move in the same transaction
+        updated = set_archived(
+            AdminActivityLog.id.in_(log_ids),
+            archived=True
         )
 
         if updated == 0:
@@ -198,16 +142,10 @@ def unarchive_audit_log(log_id):
         return {"error": "Unauthorized"}, 403
 
     try:
-        updated = (
-            AdminActivityLog.query
-            .filter(
-                AdminActivityLog.id == log_id,
-                AdminActivityLog.is_archived.is_(True)
-            )
-            .update(
-                {"is_archived": False},
-                synchronize_session=False
-            )
+        # 📊 audit_rollups archived counters move in the same transaction
+        updated = set_archived(
+            AdminActivityLog.id == log_id,
+            archived=False
         )
 
         if updated == 0:
@@ -230,41 +168,24 @@ def unarchive_audit_log(log_id):
 @admin_bp.route("/audit-logs/export")
 @admin_required
 def export_audit_logs():
-    logs = AdminActivityLog.query.filter(
-        # export_audit_logs()
-        AdminActivityLog.is_archived.is_(False)
-
-    ).order_by(
-        AdminActivityLog.created_at.desc()
-    ).all()
-
-    output = StringIO()
-    writer = csv.writer(output)
-
-    writer.writerow([
-        "Date",
-        "Time",
-        "Admin ID",
-        "Action",
-        "Target User ID"
-    ])
-
-    for log in logs:
-        ist_time = to_ist(log.created_at)
-        writer.writerow([
-            ist_time.strftime("%d %b %Y"),
-            ist_time.strftime("%I:%M %p"),
-            log.admin_id,
-            log.action,
-            log.target_user_id
-        ])
-
-    response = Response(output.getvalue(), mimetype="text/csv")
-    response.headers["Content-Disposition"] = (
-        "attachment; filename=audit_logs.csv"
+    # same filters as the listing; archived=1 also reads cold storage
+    filters = parse_filters(
+        request.args,
+        is_super_admin=session.get("is_super_admin", False)
     )
 
-    return response
+    logs = iter_export_rows(
+        apply_filters(AdminActivityLog.query, filters),
+        filters
+    )
+
+    # STREAMED CSV (constant memory, ?gzip=1 → .csv.gz)
+    return csv_response(
+        "audit_logs_archived.csv" if filters["archived"] else "audit_logs.csv",
+        AUDIT_CSV_HEADER,
+        logs,
+        audit_log_csv_row
+    )
 
 
 
@@ -282,50 +203,53 @@ def audit_log_trends():
     days = int(request.args.get("days", 7))
 
     now = datetime.now(timezone.utc)
-    start_date = now - timedelta(days=days)
+    start_date = hour_bucket(now - timedelta(days=days))
+
+    # 📊 hourly rollups, not the raw log
+    day = func.date(AuditRollup.hour)
 
     logs = (
         db.session.query(
-            func.date(AdminActivityLog.created_at).label("day"),
-            func.count(AdminActivityLog.id).label("count")
+            day.label("day"),
+            func.sum(AuditRollup.events).label("count")
         )
-        .filter(AdminActivityLog.created_at >= start_date)
-        .group_by(func.date(AdminActivityLog.created_at))
-        .order_by(func.date(AdminActivityLog.created_at))
+        .filter(AuditRollup.hour >= start_date)
+        .group_by(day)
+        .order_by(day)
         .all()
     )
 
     severity_data = (
         db.session.query(
-            AdminActivityLog.severity,
-            func.count(AdminActivityLog.id)
+            AuditRollup.severity,
+            func.sum(AuditRollup.events)
         )
-        .filter(AdminActivityLog.created_at >= start_date)
-        .group_by(AdminActivityLog.severity)
+        .filter(AuditRollup.hour >= start_date)
+        .group_by(AuditRollup.severity)
         .all()
     )
 
     actor_data = (
         db.session.query(
-            AdminActivityLog.actor_type,
-            func.count(AdminActivityLog.id)
+            AuditRollup.actor_type,
+            func.sum(AuditRollup.events)
         )
-        .filter(AdminActivityLog.created_at >= start_date)
-        .group_by(AdminActivityLog.actor_type)
+        .filter(AuditRollup.hour >= start_date)
+        .group_by(AuditRollup.actor_type)
         .all()
     )
 
     return {
         "days": days,
         "daily": [
-            {"date": str(row.day), "count": row.count}
+            {"date": str(row.day), "count": int(row.count)}
             for row in logs
         ],
         "severity": {
-            severity: count for severity, count in severity_data
+            severity: int(count) for severity, count in severity_data
         },
         "actors": {
-            actor: count for actor, count in actor_data
+            actor: int(count) for actor, count in actor_data
         }
     }
 
@@ -342,20 +266,22 @@ def audit_top_actions():
 
     limit = int(request.args.get("limit", 5))
 
+    total = func.sum(AuditRollup.events)
+
     results = (
         db.session.query(
-            AdminActivityLog.action,
-            func.count(AdminActivityLog.id).label("count")
+            AuditRollup.action,
+            total.label("count")
         )
-        .group_by(AdminActivityLog.action)
-        .order_by(func.count(AdminActivityLog.id).desc())
+        .group_by(AuditRollup.action)
+        .order_by(total.desc())
         .limit(limit)
         .all()
     )
 
     return {
         "labels": [row.action for row in results],
-        "counts": [row.count for row in results]
+        "counts": [int(row.count) for row in results]
     }
 
 
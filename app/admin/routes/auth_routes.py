@@ -9,6 +9,8 @@ from werkzeug.security import check_password_hash, generate_password_hash
 from app.extensions import db
 from app.admin import admin_bp
 from app.models import Admin, AdminOTP
+from app.services.identity_cache import invalidate_admin, admin_session_valid
+from app.utils.server_session import regenerate_session
 from app.services.email_service import (
     send_admin_otp_email,
     send_admin_password_reset_success_email,
@@ -70,8 +72,10 @@ def login():
         admin.session_version += 1
 
         db.session.commit()
+        invalidate_admin(admin.id)
 
         session.clear()
+        regenerate_session()
         session["admin_id"] = admin.id
         session["admin_session_version"] = admin.session_version
         session["is_super_admin"] = admin.is_super_admin
@@ -86,6 +90,10 @@ def login():
 # --------------------------------------------------
 @admin_bp.route("/logout")
 def logout():
+    admin_id = session.get("admin_id")
+    if admin_id:
+        invalidate_admin(admin_id)
+
     session.clear()
     flash("Logged out successfully.", "success")
     return redirect(url_for("admin.login"))
@@ -193,6 +201,7 @@ def reset_password():
         admin.password_hash = generate_password_hash(password)
         admin.session_version += 1
         db.session.commit()
+        invalidate_admin(admin.id)
 
         send_admin_password_reset_success_email(
             to_email=admin.notification_email
@@ -216,8 +225,7 @@ def _is_admin_logged_in():
     if not admin_id or not version:
         return False
 
-    admin = Admin.query.get(admin_id)
-    return bool(admin and admin.session_version == version)
+    return admin_session_valid(admin_id, version)
 
 
 def _generate_otp():
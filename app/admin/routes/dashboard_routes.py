@@ -2,12 +2,14 @@ from datetime import datetime
 from sqlalchemy import func
 from sqlalchemy import or_
 from flask import render_template, redirect, url_for, flash
-from flask import request
+from flask import request, current_app
 from flask_login import current_user
 from app.admin import admin_bp
 from app.admin.decorators import admin_required
 from app.extensions import db
 from app.models import User, Order, Product, Admin, ProductReview, OrderStatus
+from app.services.dashboard_metrics_service import DashboardMetricsService
+from app.services import product_cache
 
 
 # ==================================================
@@ -18,75 +20,18 @@ from app.models import User, Order, Product, Admin, ProductReview, OrderStatus
 def dashboard():
 
     now = datetime.utcnow()
-    today_start = datetime(now.year, now.month, now.day)
-    month_start = datetime(now.year, now.month, 1)
 
     # -----------------------------
-    # USERS
+    # USERS / ORDERS / REVENUE / PRODUCTS / REVIEWS
+    # snapshot row (scheduler) or ?live=1 → recompute now
     # -----------------------------
-    total_users = db.session.query(func.count(User.id)).scalar()
-    active_users = db.session.query(func.count(User.id)).filter(User.is_active == True).scalar()
-    locked_users = db.session.query(func.count(User.id)).filter(User.lock_until > now).scalar()
-    new_users_today = db.session.query(func.count(User.id)).filter(User.created_at >= today_start).scalar()
+    live = request.args.get("live") == "1"
 
-    # -----------------------------
-    # ORDERS
-    # -----------------------------
-    total_orders = db.session.query(func.count(Order.id)).scalar()
-    today_orders = db.session.query(func.count(Order.id)).filter(Order.created_at >= today_start).scalar()
-
-    pending_orders = db.session.query(func.count(Order.id)) \
-        .filter(Order.status == OrderStatus.CONFIRMED.value).scalar()
-
-    shipped_orders = db.session.query(func.count(Order.id)) \
-        .filter(Order.status == OrderStatus.SHIPPED.value).scalar()
-
-    delivered_orders = db.session.query(func.count(Order.id)) \
-        .filter(Order.status == OrderStatus.DELIVERED.value).scalar()
-
-    cancelled_orders = db.session.query(func.count(Order.id)) \
-        .filter(Order.status == OrderStatus.CANCELLED.value).scalar()
-
-    # -----------------------------
-    # REVENUE
-    # -----------------------------
-    total_revenue = (
-        db.session.query(func.coalesce(func.sum(Order.total_amount), 0))
-        .filter(Order.payment_status == "paid")
-        .scalar()
-    )
-
-    today_revenue = (
-        db.session.query(func.coalesce(func.sum(Order.total_amount), 0))
-        .filter(Order.payment_status == "paid", Order.created_at >= today_start)
-        .scalar()
-    )
-
-    monthly_revenue = (
-        db.session.query(func.coalesce(func.sum(Order.total_amount), 0))
-        .filter(Order.payment_status == "paid", Order.created_at >= month_start)
-        .scalar()
-    )
-
-    # -----------------------------
-    # PRODUCTS
-    # -----------------------------
-    total_products = db.session.query(func.count(Product.id)).scalar()
-
-    active_products = (
-        db.session.query(func.count(Product.id))
-        .filter(Product.status == "ACTIVE")
-        .scalar()
+    metrics, computed_at, is_live = DashboardMetricsService.get_metrics(
+        live=live,
+        max_age_seconds=current_app.config.get("DASHBOARD_SNAPSHOT_SECONDS", 60) * 3
     )
 
-    inactive_products = (
-        db.session.query(func.count(Product.id))
-        .filter(Product.status == "INACTIVE")
-        .scalar()
-    )
-
-
-
     # -----------------------------
     # RECENT ORDERS
     # -----------------------------
@@ -120,74 +65,23 @@ def dashboard():
         })
 
 
-    # -----------------------------
-    # REVIEW MODERATION COUNTS ✅
-    # -----------------------------
-    pending_review_count = (
-        db.session.query(func.count(ProductReview.id))
-        .filter(
-            ProductReview.is_active == False,
-            ProductReview.is_reported == False,
-            ProductReview.is_deleted == False,
-            ProductReview.review_text.isnot(None)
-
-        )
-        .scalar()
-    )
-
-    reported_review_count = (
-        db.session.query(func.count(ProductReview.id))
-        .filter(
-            ProductReview.is_reported == True,
-            ProductReview.is_deleted == False,
-            ProductReview.review_text.isnot(None)
-        )
-        .scalar()
-    )
-
     # -----------------------------
     # FINAL DASHBOARD DATA
     # -----------------------------
     dashboard_data = {
-        "users": {
-            "total": total_users,
-            "active": active_users,
-            "locked": locked_users,
-            "new_today": new_users_today
-        },
-        "orders": {
-            "total": total_orders,
-            "today": today_orders,
-            "pending": pending_orders,
-            "shipped": shipped_orders,
-            "delivered": delivered_orders,
-            "cancelled": cancelled_orders
-        },
-
-        "revenue": {
-            "total": total_revenue,
-            "today": today_revenue,
-            "this_month": monthly_revenue
-        },
-        "products": {
-            "total": total_products,
-            "active": active_products,
-            "inactive": inactive_products
-        },
-        "reviews": {
-            "pending": pending_review_count,
-            "reported": reported_review_count
-        },
+        **metrics,
         "recent_orders": recent_orders,
         "alerts": {
             "locked_admins": locked_admins
-        }
+        },
+        "computed_at": computed_at,
+        "is_live": is_live
     }
 
     return render_template(
         "admin/dashboard.html",
         dashboard=dashboard_data,
-        new_users_count=new_users_today
+        new_users_count=metrics["users"]["new_today"]
     )
 
 
@@ -300,12 +194,9 @@ def approve_review(review_id):
     review.action_by_admin = current_user.id if isinstance(current_user, Admin) else None
     review.action_at = datetime.utcnow()
 
-    # 🔁 UPDATE PRODUCT RATING (PHASE-3 CORE)
-    product = Product.query.get(review.product_id)
-    if product:
-        product.update_avg_rating()
-
+    # 🔁 PRODUCT RATING follows by delta (ProductReview events)
     db.session.commit()
+    product_cache.invalidate_product(review.product_id)
 
     flash("Review Approved ✅", "success")
     return redirect(url_for("admin.review_moderation"))
@@ -334,11 +225,8 @@ def hide_review(review_id):
     review.action_by_admin = current_user.id if isinstance(current_user, Admin) else None
     review.action_at = datetime.utcnow()
 
-    product = Product.query.get(review.product_id)
-    if product:
-        product.update_avg_rating()
-
     db.session.commit()
+    product_cache.invalidate_product(review.product_id)
 
     flash("Review Hidden ❌", "warning")
     return redirect(url_for("admin.review_moderation"))
@@ -363,11 +251,8 @@ def delete_review_admin(review_id):
     review.action_by_admin = current_user.id
     review.action_at = datetime.utcnow()
 
-    product = Product.query.get(review.product_id)
-    if product:
-        product.update_avg_rating()
-
     db.session.commit()
+    product_cache.invalidate_product(review.product_id)
 
     flash("Review Deleted (soft) 🗑️", "danger")
     return redirect(url_for("admin.review_moderation"))
@@ -0,0 +1,114 @@
+import os
+
+from flask import request, session, url_for, send_file, abort
+
+from app.admin import admin_bp
+from app.admin.decorators import admin_required
+from app.models import ExportJob, User
+from app.services.export_jobs import create_export_job, artifact_path
+from app.utils.activity_logger import log_admin_action
+
+
+EXPORT_ACTIONS = {
+    "users": "Exported users CSV",
+    "login_history": "Exported User Login CSV",
+    "audit_logs": "Exported Audit Logs CSV",
+}
+
+
+def _job_json(job):
+    percent = None
+    if job.status == "done":
+        percent = 100
+    elif job.total_rows:
+        percent = min(99, int(job.rows_written * 100 / job.total_rows))
+
+    return {
+        "id": job.public_id,
+        "kind": job.kind,
+        "status": job.status,
+        "rows_written": job.rows_written,
+        "total_rows": job.total_rows,
+        "percent": percent,
+        "file_name": job.file_name,
+        "file_size": job.file_size,
+        "error": job.error,
+        "status_url": url_for("admin.export_job_status", public_id=job.public_id),
+        "download_url": (
+            url_for("admin.export_job_download", public_id=job.public_id)
+            if job.status == "done" else None
+        ),
+    }
+
+
+def _get_own_job(public_id):
+    job = ExportJob.query.filter_by(public_id=public_id).first_or_404()
+
+    # 🔒 own exports only (super admin sees all)
+    if job.admin_id != session.get("admin_id") and not session.get("is_super_admin", False):
+        abort(404)
+
+    return job
+
+
+#---------------------------------------------
+#   START BACKGROUND EXPORT
+#   (filters = query string of the screen it was started from)
+#---------------------------------------------
+@admin_bp.route("/exports/<kind>", methods=["POST"])
+@admin_required
+def start_export_job(kind):
+    if kind not in EXPORT_ACTIONS:
+        abort(404)
+
+    user_id = None
+    if kind == "login_history":
+        user_id = User.query.get_or_404(request.args.get("user_id", type=int)).id
+
+    job = create_export_job(
+        kind,
+        request.args,
+        session.get("admin_id"),
+        user_id=user_id,
+        is_super_admin=session.get("is_super_admin", False)
+    )
+
+    log_admin_action(
+        action=EXPORT_ACTIONS[kind],
+        target_user_id=user_id,
+        reason=f"Admin started background export {job.public_id}"
+    )
+
+    return _job_json(job), 202
+
+
+#---------------------------------------------
+#   EXPORT STATUS (POLLED BY THE UI)
+#---------------------------------------------
+@admin_bp.route("/exports/<public_id>/status")
+@admin_required
+def export_job_status(public_id):
+    return _job_json(_get_own_job(public_id)), 200
+
+
+#---------------------------------------------
+#   DOWNLOAD (HTTP RANGE → RESUMABLE)
+#---------------------------------------------
+@admin_bp.route("/exports/<public_id>/download")
+@admin_required
+def export_job_download(public_id):
+    job = _get_own_job(public_id)
+    path = artifact_path(job)
+
+    if job.status != "done" or not os.path.exists(path):
+        abort(404)
+
+    # conditional=True → Range / If-Range / ETag handled by Werkzeug
+    return send_file(
+        path,
+        mimetype="application/gzip",
+        as_attachment=True,
+        download_name=job.file_name,
+        conditional=True,
+        max_age=0
+    )
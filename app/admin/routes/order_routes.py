@@ -5,6 +5,7 @@ from app.admin.routes import admin_bp
 from datetime import datetime
 from app.models import Order, OrderItem, OrderTimeline, User
 from app.services.order_service import update_order_status
+from app.utils.pagination import KeysetColumn, paginate_request
 from flask import redirect, url_for, flash
 from flask_login import current_user  # ADD THIS IMPORT
 
@@ -17,7 +18,6 @@ from flask_login import current_user  # ADD THIS IMPORT
 @admin_required
 def admin_order_list():
 
-    page = request.args.get("page", 1, type=int)
     search = request.args.get("search", "").strip()
     status = request.args.get("status", "").strip()
     payment_status = request.args.get("payment_status", "").strip()
@@ -64,9 +64,15 @@ def admin_order_list():
     # --------------------------------------------------
     # 📊 DEFAULT SORT (LATEST FIRST)
     # --------------------------------------------------
-    query = query.order_by(Order.created_at.desc())
-
-    orders = query.paginate(page=page, per_page=20)
+    orders = paginate_request(
+        query,
+        [
+            KeysetColumn(Order.created_at, descending=True),
+            KeysetColumn(Order.id, descending=True),
+        ],
+        request.args,
+        per_page=20
+    )
 
     return render_template(
         "admin/orders/order_list.html",
@@ -15,6 +15,10 @@ from app.admin.validators.product_validators import (
 
 from app.services.category_service import build_category_tree
 from app.services.category_service import get_all_subcategories
+from app.services import search_index
+from app.services import autocomplete_service
+from app.services import product_cache
+from app.services import stock_shards
 from sqlalchemy import or_
 from werkzeug.utils import secure_filename
 from flask import current_app
@@ -31,6 +35,27 @@ import uuid
 product_bp = Blueprint("admin_products", __name__)
 
 
+# --------------------------------------------------
+# SEARCH INDEX + PDP CACHE REFRESH (AFTER COMMIT)
+# --------------------------------------------------
+def _refresh_product_indexes(product):
+    search_index.index_product(product)
+    autocomplete_service.refresh_product(product)
+    product_cache.invalidate_product(product.id)
+
+
+# --------------------------------------------------
+# STOCK EDIT (SHARDED HOT SKUS → REWRITE SHARDS)
+# unchanged value = the consolidated snapshot shown in the form → keep
+# the shards, or sales since the last consolidation would be undone
+# --------------------------------------------------
+def _set_stock(product, stock):
+    if product.stock_sharded and stock != product.stock:
+        stock_shards.set_stock(product.id, stock)
+
+    product.stock = stock
+
+
 # --------------------------------------------------
 # CREATE PRODUCT (API)
 # --------------------------------------------------
@@ -58,6 +83,8 @@ def create_product():
         db.session.add(product)
         db.session.commit()
 
+        _refresh_product_indexes(product)
+
         return jsonify({
             "message": "Product created successfully",
             "product_id": product.id
@@ -87,7 +114,7 @@ def update_product(product_id):
         product.price = data.get("price", product.price)
         product.description = data.get("description", product.description)
         product.images = data.get("images", product.images)
-        product.stock = data.get("stock", product.stock)
+        _set_stock(product, data.get("stock", product.stock))
 
         if "category_id" in data:
             category = Category.query.get(data["category_id"])
@@ -97,6 +124,8 @@ def update_product(product_id):
 
         db.session.commit()
 
+        _refresh_product_indexes(product)
+
         return jsonify({"message": "Product updated successfully"})
 
     except Exception as e:
@@ -273,6 +302,8 @@ def add_product_ui():
         db.session.add(product)
         db.session.commit()
 
+        _refresh_product_indexes(product)
+
         flash("Product added successfully", "success")
         return redirect(url_for("admin.admin_products.product_list_ui"))
 
@@ -310,7 +341,7 @@ def edit_product_ui(product_id):
             return redirect(request.url)
 
         product.price = price
-        product.stock = stock
+        _set_stock(product, stock)
 
         category_id = int(request.form.get("category_id"))
 
@@ -339,6 +370,8 @@ def edit_product_ui(product_id):
 
         db.session.commit()
 
+        _refresh_product_indexes(product)
+
         flash("Product updated successfully", "success")
         return redirect(url_for("admin.admin_products.product_list_ui"))
 
@@ -371,4 +404,6 @@ def toggle_product(product_id):
 
     db.session.commit()
 
+    _refresh_product_indexes(product)
+
     return redirect(url_for("admin.admin_products.product_list_ui"))
\ No newline at end of file
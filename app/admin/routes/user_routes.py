@@ -1,16 +1,19 @@
-from flask import render_template, redirect, url_for, flash, request, session, Response
-from datetime import datetime, timedelta
-from sqlalchemy import or_
+from flask import render_template, redirect, url_for, flash, request, session
+from datetime import timedelta
 from app.admin import admin_bp
 from app.admin.decorators import admin_required
 from app.extensions import db
 from app.models import User, UserStatusReason, LoginActivity
 
 
-import csv
-from io import StringIO
 from app.utils.activity_logger import log_admin_action
-from app.utils.time_utils import utc_now, IST, to_ist, ist_date_to_utc
+from app.utils.csv_export import csv_response, YIELD_PER
+from app.services.user_query import (
+    filter_users, filter_login_activity,
+    USER_CSV_HEADER, LOGIN_CSV_HEADER, user_csv_row, login_activity_csv_row
+)
+from app.services.identity_cache import invalidate_user
+from app.utils.time_utils import utc_now, IST, to_ist
 from sqlalchemy.orm import joinedload
 
 
@@ -37,66 +40,12 @@ def log_admin_user_login_activity(user, status):
 @admin_bp.route("/users")
 @admin_required
 def admin_users():
-    # FILTER PARAMS
-    q = request.args.get("q", "").strip()
-    status = request.args.get("status", "")
-    email_verified = request.args.get("email_verified")
-    from_date = request.args.get("from_date")
-    to_date = request.args.get("to_date")
-
     query = User.query.options(
         joinedload(User.status_reasons)
     )
 
-    # SEARCH
-    if q:
-        if q.isdigit():
-            query = query.filter(User.id == int(q))
-        else:
-            query = query.filter(User.email.ilike(f"%{q}%"))
-
-    # STATUS
-    if status == "active":
-        now = utc_now()
-        query = query.filter(
-            User.is_active.is_(True),
-            or_(
-                User.lock_until.is_(None),
-                User.lock_until <= now
-            )
-        )
-
-    elif status == "disabled":
-        query = query.filter(User.is_active.is_(False))
-
-    elif status == "locked":
-        now = utc_now()
-        query = query.filter(
-            User.lock_until.isnot(None),
-            User.lock_until > now
-        )
-
-    # EMAIL VERIFIED
-    if email_verified == "true":
-        query = query.filter(User.email_verified.is_(True))
-    elif email_verified == "false":
-        query = query.filter(User.email_verified.is_(False))
-
-    # DATE RANGE
-    if from_date:
-        start_date = datetime.strptime(from_date, "%Y-%m-%d")
-        start_date = start_date.replace(hour=0, minute=0, second=0)
-        start_date = ist_date_to_utc(start_date)
-        query = query.filter(User.created_at >= start_date)
-
-    if to_date:
-        end_date = datetime.strptime(to_date, "%Y-%m-%d")
-        end_date = end_date.replace(hour=23, minute=59, second=59)
-        end_date = ist_date_to_utc(end_date)
-        query = query.filter(User.created_at <= end_date)
-
-
-
+    # SEARCH / STATUS / EMAIL VERIFIED / DATE RANGE
+    query = filter_users(query, request.args)
 
     # -----------------------------
     # PAGINATION PARAMS
@@ -170,16 +119,19 @@ def lock_user(user_id):
 
     db.session.add(reason)
 
-    log_admin_action(
-        action="Locked user account",
-        target_user_id=user.id,
-        reason="Locked by admin due to security concerns"
-
-    )
     log_admin_user_login_activity(user, "locked")
 
     try:
         db.session.commit()
+        invalidate_user(user.id)
+
+        # audit only what was committed (writer uses its own connection)
+        log_admin_action(
+            action="Locked user account",
+            target_user_id=user.id,
+            reason="Locked by admin due to security concerns"
+        )
+
         flash("User locked for 24 hours 🔒", "warning")
     except Exception:
         db.session.rollback()
@@ -239,16 +191,19 @@ def toggle_user_status(user_id):
     )
     db.session.add(reason)
 
-    log_admin_action(
-        action=f"{action_text} user account",
-        target_user_id=user.id,
-        reason=f"User account {action_text.lower()} by admin"
-    )
-
     log_admin_user_login_activity(user, status)
 
     try:
         db.session.commit()
+        invalidate_user(user.id)
+
+        # audit only what was committed (writer uses its own connection)
+        log_admin_action(
+            action=f"{action_text} user account",
+            target_user_id=user.id,
+            reason=f"User account {action_text.lower()} by admin"
+        )
+
         flash(f"User account {action_text} successfully.", "success")
     except Exception:
         db.session.rollback()
@@ -303,17 +258,19 @@ def unlock_user(user_id):
     )
     db.session.add(reason)
 
-    log_admin_action(
-        action="Unlocked user account",
-        target_user_id=user.id,
-        reason="Admin force unlocked account"
-    )
-
-
     log_admin_user_login_activity(user, "success")
 
     try:
         db.session.commit()
+        invalidate_user(user.id)
+
+        # audit only what was committed (writer uses its own connection)
+        log_admin_action(
+            action="Unlocked user account",
+            target_user_id=user.id,
+            reason="Admin force unlocked account"
+        )
+
         flash("User unlocked and updated successfully ✅", "success")
     except Exception:
         db.session.rollback()
@@ -350,52 +307,12 @@ def user_login_history(user_id):
     per_page = 10   # records per page
 
     # -----------------------------
-    # FILTER PARAMS
-    # -----------------------------
-    q = request.args.get("q", "").strip()
-    status = request.args.get("status")
-    from_date = request.args.get("from_date")
-    to_date = request.args.get("to_date")
-
-    # -----------------------------
-    # BASE QUERY
+    # SEARCH / STATUS / DATE RANGE
     # -----------------------------
-    logs_query = LoginActivity.query.filter_by(user_id=user.id)
-
-    # SEARCH
-    if q:
-        logs_query = logs_query.filter(
-            or_(
-                LoginActivity.ip_address.ilike(f"%{q}%"),
-                LoginActivity.user_agent.ilike(f"%{q}%"),
-                LoginActivity.login_status.ilike(f"%{q}%")
-            )
-        )
-
-    # STATUS FILTER
-    if status:
-        logs_query = logs_query.filter(
-            LoginActivity.login_status == status
-        )
-
-
-    # DATE RANGE
-    if from_date:
-        start_date = datetime.strptime(from_date, "%Y-%m-%d")
-        start_date = start_date.replace(hour=0, minute=0, second=0)
-        start_date = ist_date_to_utc(start_date)
-        logs_query = logs_query.filter(
-            LoginActivity.created_at >= start_date
-        )
-
-    if to_date:
-        end_date = datetime.strptime(to_date, "%Y-%m-%d")
-        end_date = end_date.replace(hour=23, minute=59, second=59)
-        end_date = ist_date_to_utc(end_date)
-        logs_query = logs_query.filter(
-            LoginActivity.created_at <= end_date
-        )
-
+    logs_query = filter_login_activity(
+        LoginActivity.query.filter_by(user_id=user.id),
+        request.args
+    )
 
     # -----------------------------
     # PAGINATE
@@ -429,93 +346,28 @@ def export_user_login_history_csv(user_id):
 
     user = User.query.get_or_404(user_id)
 
-    # SAME FILTER PARAMS
-    q = request.args.get("q", "").strip()
-    status = request.args.get("status")
-    from_date = request.args.get("from_date")
-    to_date = request.args.get("to_date")
-
-    # BASE QUERY
-    logs_query = LoginActivity.query.filter_by(user_id=user.id)
-
-    if q:
-        logs_query = logs_query.filter(
-            or_(
-                LoginActivity.ip_address.ilike(f"%{q}%"),
-                LoginActivity.user_agent.ilike(f"%{q}%"),
-                LoginActivity.login_status.ilike(f"%{q}%")
-            )
-        )
-
-    if status:
-        logs_query = logs_query.filter(
-            LoginActivity.login_status == status
-        )
-
-    # DATE RANGE (FULL DAY – UTC SAFE)
-    if from_date:
-        start_date = datetime.strptime(from_date, "%Y-%m-%d")
-        start_date = start_date.replace(hour=0, minute=0, second=0)
-        start_date = ist_date_to_utc(start_date)
-        logs_query = logs_query.filter(
-            LoginActivity.created_at >= start_date
-        )
-
-    if to_date:
-        end_date = datetime.strptime(to_date, "%Y-%m-%d")
-        end_date = end_date.replace(hour=23, minute=59, second=59)
-        end_date = ist_date_to_utc(end_date)
-        logs_query = logs_query.filter(
-            LoginActivity.created_at <= end_date
-        )
-
-
+    # SAME FILTERS AS THE LISTING
+    logs_query = filter_login_activity(
+        LoginActivity.query.filter_by(user_id=user.id),
+        request.args
+    )
 
-    logs = logs_query.order_by(
+    logs_query = logs_query.order_by(
         LoginActivity.created_at.desc()
-    ).all()
+    )
 
-    if not logs:
+    if logs_query.first() is None:
         flash("No login activity found for export.", "warning")
         return redirect(
             url_for("admin.user_login_history", user_id=user.id)
         )
 
-
-
-    # CREATE CSV
-    output = StringIO()
-    writer = csv.writer(output)
-
-    # CSV HEADER
-    writer.writerow([
-        "Date",
-        "Time",
-        "IP Address",
-        "Device",
-        "Status"
-    ])
-
-    # CSV ROWS
-    for log in logs:
-
-
-        ist_time = to_ist(log.created_at)
-        writer.writerow([
-            ist_time.strftime("%d %b %Y"),
-            ist_time.strftime("%I:%M %p"),
-            log.ip_address,
-            log.user_agent,
-            log.login_status
-        ])
-
-    # RESPONSE
-    response = Response(
-        output.getvalue(),
-        mimetype="text/csv"
-    )
-    response.headers["Content-Disposition"] = (
-        f"attachment; filename=login_activity_user_{user.id}.csv"
+    # STREAMED CSV (constant memory, ?gzip=1 → .csv.gz)
+    response = csv_response(
+        f"login_activity_user_{user.id}.csv",
+        LOGIN_CSV_HEADER,
+        logs_query.yield_per(YIELD_PER),
+        login_activity_csv_row
     )
 
     log_admin_action(
@@ -534,85 +386,22 @@ def export_user_login_history_csv(user_id):
 @admin_required
 def export_users():
 
-    # FILTER PARAMS
-    q = request.args.get("q", "").strip()
-    status = request.args.get("status", "")
-    email_verified = request.args.get("email_verified")
-    from_date = request.args.get("from_date")
-    to_date = request.args.get("to_date")
-
-    query = User.query
-
-    # SEARCH
-    if q:
-        if q.isdigit():
-            query = query.filter(User.id == int(q))
-        else:
-            query = query.filter(User.email.ilike(f"%{q}%"))
-
-    # STATUS
-    if status == "active":
-        now = utc_now()
-        query = query.filter(
-            User.is_active.is_(True),
-            or_(User.lock_until.is_(None), User.lock_until <= now)
-        )
-
-    elif status == "disabled":
-        query = query.filter(User.is_active.is_(False))
-
-    elif status == "locked":
-        query = query.filter(
-            User.lock_until.isnot(None),
-            User.lock_until > utc_now()
-        )
-
-    # EMAIL VERIFIED
-    if email_verified == "true":
-        query = query.filter(User.email_verified.is_(True))
-    elif email_verified == "false":
-        query = query.filter(User.email_verified.is_(False))
-
-    # DATE RANGE
-    if from_date:
-        start_date = datetime.strptime(from_date, "%Y-%m-%d")
-        start_date = start_date.replace(hour=0, minute=0, second=0)
-        start_date = ist_date_to_utc(start_date)
-        query = query.filter(User.created_at >= start_date)
+    # SAME FILTERS AS THE LISTING
+    query = filter_users(User.query, request.args)
 
-    if to_date:
-        end_date = datetime.strptime(to_date, "%Y-%m-%d")
-        end_date = end_date.replace(hour=23, minute=59, second=59)
-        end_date = ist_date_to_utc(end_date)
-        query = query.filter(User.created_at <= end_date)
+    query = query.order_by(User.created_at.desc())
 
-    users = query.order_by(User.created_at.desc()).all()
-
-    if not users:
+    if query.first() is None:
         flash("No users found for export.", "warning")
         return redirect(url_for("admin.admin_users"))
 
-    # CSV
-    output = StringIO()
-    writer = csv.writer(output)
-
-    writer.writerow(["ID", "Email", "Status", "Created Date", "Created Time"])
-
-    for u in users:
-        created_date = ""
-        created_time = ""
-
-        if u.created_at:
-
-
-            ist_time = to_ist(u.created_at)
-            created_date = ist_time.strftime("%d %b %Y")
-            created_time = ist_time.strftime("%I:%M %p")
-
-        writer.writerow([u.id, u.email, u.status, created_date, created_time])
-
-    response = Response(output.getvalue(), mimetype="text/csv")
-    response.headers["Content-Disposition"] = "attachment; filename=users.csv"
+    # STREAMED CSV (constant memory, ?gzip=1 → .csv.gz)
+    response = csv_response(
+        "users.csv",
+        USER_CSV_HEADER,
+        query.yield_per(YIELD_PER),
+        user_csv_row
+    )
 
     log_admin_action(
         action="Exported users CSV",
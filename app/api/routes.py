@@ -1,13 +1,22 @@
-from flask import request, jsonify, url_for
+from flask import request, jsonify, url_for, render_template
 from flask_login import login_required, current_user
 from app.extensions import db
 from app.models import Product, DeliveryPincode, SavedForLater, User
+from app.models import ProductReview, Order, OrderItem, OrderStatus
 from app.utils.time_utils import utc_now
 from . import api_bp
 from app.models import CartItem
 from flask import session
-from app.services.price_service import PriceService
+from app.services.checkout_service import place_order, CheckoutError
+from app.services.cart_read_model import load_cart
+from app.services.stock_reservations import available_quantity, reserve, release
+from app.services.search_index import apply_search, search_truncated
+from app.services import autocomplete_service
+from app.services import product_cache
+from app.services.review_service import ReviewService, REVIEW_SORTS
+from app.services.facet_service import FacetService
 from app.admin.decorators import admin_required
+from app.utils.pagination import KeysetColumn, paginate_request
 from datetime import timezone
 
 
@@ -17,7 +26,6 @@ from datetime import timezone
 # =====================================================
 @api_bp.route("/products", methods=["GET"])
 def get_products():
-    page = request.args.get("page", 1, type=int)
     limit = min(request.args.get("limit", 8, type=int), 50)
     category = request.args.get("category")
     search = request.args.get("search")
@@ -31,16 +39,36 @@ def get_products():
         query = query.filter(Product.category_id == int(category))
 
     if search and isinstance(search, str):
-        query = query.filter(Product.name.ilike(f"%{search}%"))
+        query = apply_search(
+            query, search,
+            rank=sort not in ("price_asc", "price_desc")
+        )
 
     if sort == "price_asc":
-        query = query.order_by(Product.price.asc())
+        keys = [KeysetColumn(Product.price), KeysetColumn(Product.id)]
     elif sort == "price_desc":
-        query = query.order_by(Product.price.desc())
+        keys = [
+            KeysetColumn(Product.price, descending=True),
+            KeysetColumn(Product.id, descending=True),
+        ]
     else:
-        query = query.order_by(Product.created_at.desc())
+        keys = [
+            KeysetColumn(Product.created_at, descending=True),
+            KeysetColumn(Product.id, descending=True),
+        ]
+
+    # ?cursor= → keyset pages (relevance ranked search stays on OFFSET)
+    pagination = paginate_request(
+        query,
+        keys,
+        request.args,
+        per_page=limit,
+        keyset=not (search and sort not in ("price_asc", "price_desc"))
+    )
 
-    pagination = query.paginate(page=page, per_page=limit, error_out=False)
+    # in-memory index keeps the best SEARCH_MAX_CANDIDATES → estimate
+    if search_truncated():
+        pagination.total_is_estimate = True
 
     products = []
     for p in pagination.items:
@@ -64,16 +92,139 @@ def get_products():
         "success": True,
         "products": products,
         "pagination": {
-            "page": page,
+            "page": pagination.page,
             "limit": limit,
             "total_items": pagination.total,
             "total_pages": pagination.pages,
+            "total_is_estimate": getattr(pagination, "total_is_estimate", False),
             "has_next": pagination.has_next,
-            "has_prev": pagination.has_prev
+            "has_prev": pagination.has_prev,
+            "next_cursor": getattr(pagination, "next_cursor", None),
+            "prev_cursor": getattr(pagination, "prev_cursor", None)
         }
     })
 
 
+# =====================================================
+# PRODUCT REVIEWS (CURSOR PAGES FOR PDP SCROLL)
+# =====================================================
+@api_bp.route("/products/<int:product_id>/reviews", methods=["GET"])
+def product_reviews(product_id):
+    sort = request.args.get("sort", "newest")
+    limit = request.args.get("limit", 10, type=int)
+
+    pagination = ReviewService.page(
+        product_id,
+        sort=sort,
+        cursor=request.args.get("cursor"),
+        per_page=limit
+    )
+
+    reviews = [ReviewService.serialize(r) for r in pagination.items]
+
+    # verified badge only matters on the viewer's own review
+    user_has_purchased = False
+    if current_user.is_authenticated and any(
+        r["user_id"] == current_user.id for r in reviews
+    ):
+        user_has_purchased = (
+            db.session.query(OrderItem.id)
+            .join(OrderItem.order)
+            .filter(
+                Order.user_id == current_user.id,
+                Order.status == OrderStatus.DELIVERED.value,
+                OrderItem.product_id == product_id
+            )
+            .first()
+            is not None
+        )
+
+    html = "".join(
+        render_template(
+            "components/_review_card.html",
+            r=r,
+            user_has_purchased=user_has_purchased
+        )
+        for r in reviews
+    )
+
+    return jsonify({
+        "success": True,
+        "sort": sort if sort in REVIEW_SORTS else "newest",
+        "reviews": [
+            {
+                "id": r["id"],
+                "user": r["user"]["username"],
+                "review_text": r["review_text"],
+                "rating": r["rating"],
+                "helpful_count": r["helpful_count"],
+                "created_at": r["created_at"].isoformat() if r["created_at"] else None
+            }
+            for r in reviews
+        ],
+        "html": html,
+        "next_cursor": pagination.next_cursor
+    })
+
+
+# =====================================================
+# MARK REVIEW HELPFUL (ONE VOTE PER USER)
+# =====================================================
+@api_bp.route("/reviews/<int:review_id>/helpful", methods=["POST"])
+def mark_review_helpful(review_id):
+    if not current_user.is_authenticated:
+        return jsonify(success=False, message="Login required"), 401
+
+    review = ProductReview.query.filter_by(
+        id=review_id,
+        is_active=True,
+        is_deleted=False
+    ).first()
+
+    if not review:
+        return jsonify(success=False, message="Review not found"), 404
+
+    if review.user_id == current_user.id:
+        return jsonify(success=False, message="You cannot vote on your own review"), 400
+
+    counted = ReviewService.mark_helpful(review, current_user.id)
+
+    if counted:
+        product_cache.invalidate_product(review.product_id)
+
+    db.session.refresh(review)
+
+    return jsonify(
+        success=True,
+        counted=counted,
+        helpful_count=review.helpful_count
+    )
+
+
+# =====================================================
+# ATTRIBUTE FACETS (SEARCH FILTER PANEL)
+# =====================================================
+@api_bp.route("/facets", methods=["GET"])
+def get_facets():
+
+    query, attributes, _ = FacetService.build(
+        request.args,
+        rank=False
+    )
+
+    return jsonify({
+        "success": True,
+        "total": query.order_by(None).count(),
+        "total_is_estimate": search_truncated() is not None,
+        "selected": {
+            attr.slug: attr.selected
+            for attr in attributes
+            if attr.selected
+        },
+        "facets": FacetService.serialize(attributes)
+    })
+
+
 # =====================================================
 # ADD TO CART
 # =====================================================
@@ -102,7 +253,13 @@ def add_to_cart():
     if qty < 1:
         return jsonify(success=False, message="Invalid quantity"), 400
 
-    if qty > product.stock:
+    # stock minus other users' active holds
+    available = available_quantity(
+        product,
+        current_user.id if current_user.is_authenticated else None
+    )
+
+    if qty > available:
         return jsonify(success=False, message="Quantity exceeds stock"), 400
 
     # =====================================================
@@ -112,7 +269,7 @@ def add_to_cart():
         cart = session.get("cart", {})
 
         existing_qty = int(cart.get(str(product_id), 0))
-        new_qty = min(existing_qty + qty, product.stock)
+        new_qty = min(existing_qty + qty, available)
 
         cart[str(product_id)] = new_qty
         session["cart"] = cart
@@ -132,10 +289,12 @@ def add_to_cart():
         product_id=product.id
     ).first()
 
+    # ⏳ HOLD THE UNITS (PDP behaviour: overwrite quantity)
+    if not reserve(current_user.id, product, qty):
+        db.session.rollback()
+        return jsonify(success=False, message="Stock limit exceeded"), 400
+
     if cart_item:
-        # PDP behaviour: overwrite quantity
-        if qty > product.stock:
-            return jsonify(success=False, message="Stock limit exceeded"), 400
         cart_item.quantity = qty
 
     else:
@@ -167,61 +326,14 @@ def add_to_cart():
 @login_required
 def get_cart():
 
-    items = CartItem.query.filter_by(user_id=current_user.id).all()
-
-    cart_items = []
-    total = 0
-    changes_made = False  # 🔥 Track any auto adjustments
-
-    for item in items:
-
-        product = item.product
-
-        # 🚫 Remove inactive products
-        if product.status != "ACTIVE":
-            db.session.delete(item)
-            changes_made = True
-            continue
-
-        # 🔴 Remove if stock is zero
-        if product.stock <= 0:
-            db.session.delete(item)
-            changes_made = True
-            continue
+    # one joined query + bulk fixes for stale lines (see cart_read_model)
+    cart_items, pricing, adjusted = load_cart(current_user.id)
 
-        # 🟠 Auto-adjust quantity if stock reduced
-        if item.quantity > product.stock:
-            item.quantity = product.stock
-            changes_made = True
-
-        # ✅ Safe subtotal calculation AFTER adjustments
-        subtotal = item.item_total
-        total += subtotal
-
-        cart_items.append({
-            "id": item.id,
-            "product_id": product.id,
-            "name": product.name,
-            "price": float(item.price_at_add),
-            "quantity": item.quantity,
-            "image": (
-                url_for("static", filename=product.images[0])
-                if product.images else
-                url_for("static", filename="img/placeholders/product.png")
-            ),
-            "subtotal": float(subtotal)
-        })
-
-    # ✅ Commit only if adjustments happened
-    if changes_made:
-        db.session.commit()
-
-    pricing = PriceService.calculate_total(cart_items)
-    
     return jsonify(
         success=True,
         cart=cart_items,
-        pricing=pricing
+        pricing=pricing,
+        adjusted=adjusted
     )
 
 
@@ -249,6 +361,7 @@ def remove_from_cart():
         return jsonify(success=False, message="Item not found"), 404
 
     db.session.delete(item)
+    release(current_user.id, [item.product_id])
     db.session.commit()
 
     return jsonify(success=True)
@@ -281,6 +394,7 @@ def save_for_later():
 
     db.session.add(saved)
     db.session.delete(item)
+    release(current_user.id, [item.product_id])
 
     db.session.commit()
 
@@ -318,11 +432,14 @@ def move_saved_to_cart():
         product_id=product.id
     ).first()
 
-    if existing:
-        if existing.quantity + 1 > product.stock:
-            return jsonify(success=False, message="Stock limit exceeded"), 400
+    new_qty = existing.quantity + 1 if existing else 1
 
-        existing.quantity += 1
+    if not reserve(current_user.id, product, new_qty):
+        db.session.rollback()
+        return jsonify(success=False, message="Stock limit exceeded"), 400
+
+    if existing:
+        existing.quantity = new_qty
 
     else:
         existing = CartItem(
@@ -391,7 +508,8 @@ def update_cart_qty():
     if item.product.status != "ACTIVE":
         return jsonify(success=False, message="Product unavailable"), 400
 
-    if qty > item.product.stock:
+    if not reserve(current_user.id, item.product, qty):
+        db.session.rollback()
         return jsonify(success=False, message="Stock limit exceeded"), 400
 
     item.quantity = qty
@@ -408,10 +526,37 @@ def update_cart_qty():
 @api_bp.route("/order/create", methods=["POST"])
 @login_required
 def create_order():
-    return jsonify({
-        "success": False,
-        "message": "Order service is under development"
-    }), 503
+    data = request.get_json(silent=True) or {}
+
+    idempotency_key = (
+        request.headers.get("Idempotency-Key")
+        or data.get("idempotency_key")
+        or request.form.get("idempotency_key")
+    )
+    address_id = data.get("address_id") or request.form.get("address_id", type=int)
+
+    try:
+        order, created = place_order(
+            current_user.id,
+            address_id=address_id,
+            idempotency_key=idempotency_key
+        )
+    except CheckoutError as e:
+        return jsonify(
+            success=False,
+            message=str(e),
+            product_ids=e.product_ids
+        ), e.status
+
+    return jsonify(
+        success=True,
+        message="Order placed successfully" if created else "Order already placed",
+        order_id=order.id,
+        order_number=order.order_number,
+        total=float(order.total_amount),
+        status=order.status,
+        replayed=not created
+    ), 201 if created else 200
 
 
 
@@ -512,11 +657,20 @@ def live_search():
     if not q or len(q) < 2:
         return jsonify(success=True, results=[])
 
+    # ⚡ IN-MEMORY SUGGESTIONS (NO DB)
+    results = autocomplete_service.suggest(q, limit=6)
+
+    if results is not None:
+        return jsonify(
+            success=True,
+            results=results
+        )
+
+    # 🧊 COLD INDEX → DB FALLBACK
     products = (
-        Product.query
-        .filter(
-            Product.status == "ACTIVE",
-            Product.name.ilike(f"%{q}%")
+        apply_search(
+            Product.query.filter(Product.status == "ACTIVE"),
+            q
         )
         .order_by(Product.created_at.desc())
         .limit(6)
@@ -545,6 +699,31 @@ def live_search():
 
 
 
+# =====================================================
+# LIVE SEARCH CACHE STATS (ADMIN)
+# =====================================================
+@api_bp.route("/search/stats", methods=["GET"])
+@admin_required
+def live_search_stats():
+    return jsonify(
+        success=True,
+        stats=autocomplete_service.stats()
+    )
+
+
+# =====================================================
+# PRODUCT PAGE CACHE STATS (ADMIN)
+# =====================================================
+@api_bp.route("/product-cache/stats", methods=["GET"])
+@admin_required
+def product_cache_stats():
+    return jsonify(
+        success=True,
+        stats=product_cache.stats()
+    )
+
+
+
 # =====================================================
 # NEW USERS COUNT (ADMIN SIDEBAR BADGE )
 # =====================================================
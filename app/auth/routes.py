@@ -14,6 +14,7 @@ import requests
 
 from app.extensions import db, limiter
 from app.models import User
+from app.services.identity_cache import invalidate_user
 from app.models import LoginActivity
 from app.services.otp_service import (
     generate_otp, verify_otp, invalidate_otp
@@ -28,7 +29,8 @@ from app.services.email_service import (
 from . import auth_bp
 from datetime import timedelta
 from app.utils.time_utils import utc_now
-from app.models import CartItem, Product
+from app.services.cart_merge import merge_cart
+from app.utils.server_session import regenerate_session
 
 
 
@@ -231,37 +233,24 @@ def login():
     db.session.commit()
 
     log_login_attempt(user, "success")
+
+    # new session id on login (guest cart etc. carried over)
+    regenerate_session()
     login_user(user, remember=remember)
 
     # ---------- CART MERGE ----------
     guest_cart = session.pop("cart", None)
 
     if guest_cart:
-        for product_id, qty in guest_cart.items():
-            product = Product.query.get(int(product_id))
-            if not product:
-                continue
-
-            qty = min(int(qty), product.stock)
-
-            existing = CartItem.query.filter_by(
-                user_id=user.id,
-                product_id=product.id
-            ).first()
-
-            if existing:
-                existing.quantity = qty
-            else:
-                db.session.add(
-                    CartItem(
-                        user_id=user.id,
-                        product_id=product.id,
-                        quantity=qty
-                    )
-                )
-
+        # bulk: two IN queries + one upsert (see cart_merge)
+        report = merge_cart(user.id, guest_cart)
         db.session.commit()
-        flash("🛒 Your Cart Items Have Been Restored", "info")
+
+        if report["added"] or report["updated"]:
+            flash("🛒 Your Cart Items Have Been Restored", "info")
+
+        if report["adjusted"] or report["skipped"]:
+            flash("⚠️ Some Cart Items Were Unavailable Or Reduced To Available Stock", "warning")
 
     session["session_version"] = user.session_version
 
@@ -453,6 +442,7 @@ def reset_password():
         user.set_password(password)
         user.session_version += 1
         db.session.commit()
+        invalidate_user(user.id)
 
         invalidate_otp(user.id)
 
@@ -2,6 +2,15 @@ import click
 from flask.cli import with_appcontext
 
 from app.services.otp_service import cleanup_otps
+from app.services.rating_service import RatingService
+from app.services.audit_retention import auto_archive_old_audit_logs
+from app.services.audit_cleanup_service import cleanup_old_archived_audit_logs
+from app.services.audit_cold_storage import move_archived_to_cold_storage
+from app.services.audit_rollup_service import backfill as backfill_audit_rollups
+from app.services.audit_insight_service import refresh_audit_insights
+from app.services.email_outbox import get_email_worker, requeue_dead_emails
+from app.services.email_templates import get_email_templates
+from app.services import stock_shards
 
 
 @click.command("cleanup-otps")
@@ -9,3 +18,115 @@ from app.services.otp_service import cleanup_otps
 def cleanup_otps_command():
     deleted = cleanup_otps()
     click.echo(f"✅ OTP cleanup completed. Deleted {deleted} rows.")
+
+
+@click.command("reconcile-ratings")
+@click.option("--batch-size", default=500, show_default=True)
+@with_appcontext
+def reconcile_ratings_command(batch_size):
+    result = RatingService.reconcile(batch_size=batch_size)
+    click.echo(
+        f"✅ Rating reconciliation completed. "
+        f"Checked {result['checked']} products, fixed {result['fixed']}."
+    )
+
+
+@click.command("archive-audit-logs")
+@click.option("--batch-size", type=int, default=None, help="ids per batch (AUDIT_JOB_BATCH_SIZE)")
+@click.option("--sleep", "sleep_seconds", type=float, default=None, help="pause between batches")
+@click.option("--restart", is_flag=True, help="ignore an interrupted run's checkpoint")
+@with_appcontext
+def archive_audit_logs_command(batch_size, sleep_seconds, restart):
+    archived = auto_archive_old_audit_logs(
+        batch_size=batch_size, sleep_seconds=sleep_seconds, restart=restart
+    )
+    click.echo(f"✅ Audit archive completed. Archived {archived} logs.")
+
+
+@click.command("cleanup-audit-logs")
+@click.option("--days", default=180, show_default=True)
+@click.option("--batch-size", type=int, default=None, help="ids per batch (AUDIT_JOB_BATCH_SIZE)")
+@click.option("--sleep", "sleep_seconds", type=float, default=None, help="pause between batches")
+@click.option("--restart", is_flag=True, help="ignore an interrupted run's checkpoint")
+@with_appcontext
+def cleanup_audit_logs_command(days, batch_size, sleep_seconds, restart):
+    deleted = cleanup_old_archived_audit_logs(
+        days=days, batch_size=batch_size, sleep_seconds=sleep_seconds, restart=restart
+    )
+    click.echo(f"✅ Audit cleanup completed. Deleted {deleted} archived logs.")
+
+
+@click.command("move-audit-logs-cold")
+@click.option("--days", type=int, default=None, help="age threshold (AUDIT_COLD_STORAGE_DAYS)")
+@click.option("--batch-size", type=int, default=None, help="ids per batch (AUDIT_JOB_BATCH_SIZE)")
+@click.option("--sleep", "sleep_seconds", type=float, default=None, help="pause between batches")
+@click.option("--restart", is_flag=True, help="ignore an interrupted run's checkpoint")
+@with_appcontext
+def move_audit_logs_cold_command(days, batch_size, sleep_seconds, restart):
+    moved = move_archived_to_cold_storage(
+        days=days, batch_size=batch_size, sleep_seconds=sleep_seconds, restart=restart
+    )
+    click.echo(f"✅ Cold storage move completed. Moved {moved} archived logs.")
+
+
+@click.command("backfill-audit-rollups")
+@click.option("--batch-size", default=5000, show_default=True)
+@with_appcontext
+def backfill_audit_rollups_command(batch_size):
+    counted = backfill_audit_rollups(batch_size=batch_size)
+    click.echo(f"✅ Audit rollups rebuilt from {counted} audit events.")
+
+
+@click.command("generate-audit-insights")
+@click.option("--days", default=7, show_default=True)
+@with_appcontext
+def generate_audit_insights_command(days):
+    stored = refresh_audit_insights(days=days)
+    click.echo(f"✅ Audit insights generated. Stored {stored} new insights.")
+
+
+@click.command("send-queued-emails")
+@click.option("--retry-dead", is_flag=True, help="requeue dead-lettered emails first")
+@with_appcontext
+def send_queued_emails_command(retry_dead):
+    if retry_dead:
+        click.echo(f"♻️ Requeued {requeue_dead_emails()} dead-lettered emails.")
+
+    worker = get_email_worker()
+    claimed = worker.drain()
+    click.echo(
+        f"✅ Email outbox drained. Claimed {claimed}: "
+        f"{worker.sent} sent, {worker.failed} failed ({worker.dead} dead-lettered)."
+    )
+
+
+@click.command("compile-email-templates")
+@with_appcontext
+def compile_email_templates_command():
+    templates = get_email_templates()
+    compiled = templates.precompile()
+    click.echo(f"✅ Email templates compiled. {compiled} templates ({len(templates.names())} emails).")
+
+
+@click.command("shard-stock")
+@click.argument("product_id", type=int)
+@click.option("--shards", type=int, default=None, help="counter rows (STOCK_SHARDS)")
+@click.option("--off", is_flag=True, help="fold the shards back into products.stock")
+@with_appcontext
+def shard_stock_command(product_id, shards, off):
+    if off:
+        total = stock_shards.disable_sharding(product_id)
+        click.echo(f"✅ Product {product_id} unsharded. Stock {total}.")
+        return
+
+    total = stock_shards.enable_sharding(product_id, shards)
+    click.echo(
+        f"✅ Product {product_id} sharded over {shards or stock_shards.shard_count()} rows. Stock {total}."
+    )
+
+
+@click.command("consolidate-stock-shards")
+@with_appcontext
+def consolidate_stock_shards_command():
+    totals = stock_shards.consolidate()
+    click.echo(f"✅ Stock shards consolidated for {len(totals)} products.")
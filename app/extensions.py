@@ -41,12 +41,12 @@ login_manager.needs_refresh_message_category = "info"
 # --------------------------------------------------
 limiter = Limiter(
     key_func=get_remote_address,
-    default_limits=[],
-    storage_uri="memory://"
+    default_limits=[]
 )
 
 
 # NOTE: init_app(app) will be called in app/__init__.py
+# Storage comes from RATELIMIT_STORAGE_URI (config.py)
 
 
 # --------------------------------------------------
@@ -62,20 +62,15 @@ mail = Mail()
 def load_user(user_id):
     """
     Loads user from session.
-    If session_version mismatch is detected, user is treated as logged out.
+    If session_version mismatch is detected (or the account is disabled),
+    user is treated as logged out.
+    Served from the identity cache → no query on a hot page view.
     """
-    from app.models import User
+    from app.services.identity_cache import load_identity_user
 
     try:
-        user = User.query.get(int(user_id))
-    except Exception:
+        user_id = int(user_id)
+    except (TypeError, ValueError):
         return None
 
-    if not user:
-        return None
-
-    session_version = session.get("session_version")
-    if session_version is not None and session_version != user.session_version:
-        return None
-
-    return user
+    return load_identity_user(user_id, session.get("session_version"))
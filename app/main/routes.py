@@ -1,4 +1,4 @@
-from flask import render_template, redirect, url_for, request, flash, jsonify
+from flask import render_template, redirect, url_for, request, flash, jsonify, abort
 from flask_login import current_user, login_required
 from app.utils.review_utils import should_auto_flag
 from app.models import CartItem
@@ -14,9 +14,12 @@ from app.models import (
 )
 
 from app.main import main_bp
-from sqlalchemy import func
 from app.models import Category
-from app.models import AttributeType, ProductAttribute
+from app.services.facet_service import FacetService
+from app.services.search_index import search_truncated
+from app.services import product_cache
+from app.services.stock_reservations import available_quantity, reserve
+from app.utils.pagination import KeysetColumn, paginate_request
 
 
 
@@ -36,18 +39,45 @@ def index():
     return render_template("user/index.html", products=products)
 
 
+# ------------------------------------------------
+#  LISTING SORT KEYS (KEYSET SAFE → always end on id)
+# ------------------------------------------------
+NEWEST_FIRST = [
+    KeysetColumn(Product.created_at, descending=True),
+    KeysetColumn(Product.id, descending=True),
+]
+
+SEARCH_SORT_KEYS = {
+    "popularity": [
+        KeysetColumn(Product.rating_count, descending=True, null_as=0),
+        KeysetColumn(Product.id, descending=True),
+    ],
+    "price_low": [
+        KeysetColumn(Product.price),
+        KeysetColumn(Product.id),
+    ],
+    "price_high": [
+        KeysetColumn(Product.price, descending=True),
+        KeysetColumn(Product.id, descending=True),
+    ],
+    "rating": [
+        KeysetColumn(Product.avg_rating, descending=True, null_as=0),
+        KeysetColumn(Product.id, descending=True),
+    ],
+    "newest": NEWEST_FIRST,
+}
+
+
 # ------------------------------------------------
 #  PRODUCT LIST PAGE
 # ------------------------------------------------
 @main_bp.route("/products")
 def product_list():
-    page = request.args.get("page", 1, type=int)
-
-    products = (
-        Product.query
-        .filter(Product.status == "ACTIVE")
-        .order_by(Product.created_at.desc())
-        .paginate(page=page, per_page=20)
+    products = paginate_request(
+        Product.query.filter(Product.status == "ACTIVE"),
+        NEWEST_FIRST,
+        request.args,
+        per_page=20
     )
 
     return render_template("user/product_list.html", products=products)
@@ -66,135 +96,24 @@ def search_page():
     # -----------------------
     q = request.args.get("q", "").strip()
 
-    price_range = request.args.get("price")
-    min_price = None
-    max_price = None
-
-    if price_range:
-        try:
-            parts = price_range.split("-")
-            min_price = float(parts[0])
-            max_price = float(parts[1])
-        except:
-            pass
-
-    rating = request.args.get("rating", type=int)
-
-    category = request.args.get("category", type=int)
-
-    brand = request.args.get("brand", "").strip()
-
-    in_stock = request.args.get("stock")
-
     sort = request.args.get("sort")
 
-    page = request.args.get("page", 1, type=int)
-
-    # -----------------------
-    # Base query
-    # -----------------------
-    query = Product.query.filter(Product.status == "ACTIVE")
-
-    # -----------------------
-    # Dynamic Attribute Filters (PHASE-7 PRO)
-    # -----------------------
-
-    # Load attribute types for selected category
-    attributes = []
-
-    if category:
-        attributes = AttributeType.query.filter_by(category_id=category).all()
-
-        # Load possible values for UI
-        for attr in attributes:
-            values = (
-                db.session.query(ProductAttribute.value)
-                .join(Product)
-                .filter(
-                    Product.category_id == category,
-                    ProductAttribute.attribute_id == attr.id
-                )
-                .distinct()
-                .all()
-            )
-
-            attr.values = [v[0] for v in values]
-
-    # Apply dynamic filters
-    for attr in attributes:
-
-        value = request.args.get(attr.slug)
-
-        if value:
-            query = query.join(ProductAttribute).join(AttributeType).filter(
-                AttributeType.id == attr.id,
-                ProductAttribute.value == value
-            )
-
-
-        
-
-    # -----------------------
-    # Search keyword
     # -----------------------
-    if q:
-        query = query.filter(Product.name.ilike(f"%{q}%"))
-
-    # -----------------------
-    # Price filter
+    # Filters + Attribute Facets (PHASE-7 PRO)
+    # keyword / price / rating / category / brand / stock
+    # + dynamic attributes → one filter subquery, one facet query
     # -----------------------
-    if min_price is not None:
-        query = query.filter(Product.price >= min_price)
-
-    if max_price is not None:
-        query = query.filter(Product.price <= max_price)
-
-    # -----------------------
-    # Rating filter
-    # -----------------------
-    if rating:
-        query = query.filter(Product.avg_rating >= rating)
-
-    # -----------------------
-    # Category filter
-    # -----------------------
-    if category:
-        query = query.filter(Product.category_id == category)
-
-    # -----------------------
-    # Brand filter
-    # -----------------------
-    if brand:
-        query = query.filter(Product.brand.ilike(f"%{brand}%"))
-
-    # -----------------------
-    # Stock filter
-    # -----------------------
-    if in_stock:
-        query = query.filter(Product.stock > 0)
+    query, attributes, _ = FacetService.build(
+        request.args,
+        rank=sort in (None, "", "relevance")
+    )
 
     # -----------------------
     # Sorting Engine (PHASE 5)
+    # relevance ordering cannot be seeked → OFFSET pages only
     # -----------------------
-
-    if sort == "popularity":
-        query = query.order_by(Product.rating_count.desc())
-
-    elif sort == "price_low":
-        query = query.order_by(Product.price.asc())
-
-    elif sort == "price_high":
-        query = query.order_by(Product.price.desc())
-
-    elif sort == "rating":
-        query = query.order_by(Product.avg_rating.desc())
-
-    elif sort == "newest":
-        query = query.order_by(Product.created_at.desc())
-
-    else:
-        # default sorting
-        query = query.order_by(Product.created_at.desc())
+    by_relevance = bool(q) and sort in (None, "", "relevance")
+    sort_keys = SEARCH_SORT_KEYS.get(sort, NEWEST_FIRST)
 
     # -----------------------
     # Categories for filter UI
@@ -206,7 +125,17 @@ def search_page():
     # -----------------------
     # Pagination
     # -----------------------
-    pagination = query.paginate(page=page, per_page=20)
+    pagination = paginate_request(
+        query,
+        sort_keys,
+        request.args,
+        per_page=20,
+        keyset=not by_relevance
+    )
+
+    # in-memory index keeps the best SEARCH_MAX_CANDIDATES → "1000+"
+    if search_truncated():
+        pagination.total_is_estimate = True
 
     # -----------------------
     # Render page
@@ -227,41 +156,31 @@ def search_page():
 # ----------------------------------------------------
 @main_bp.route("/product/<int:product_id>")
 def product_detail(product_id):
-    product = Product.query.filter_by(
-        id=product_id,
-        status="ACTIVE"
-    ).first_or_404()
 
-    avg_rating = product.avg_rating or 0
-    rating_count = product.rating_count or 0
+    # -----------------------------
+    # Product + Related + Reviews + Rating Breakdown
+    # anonymous fragment → read-through cache (product_cache)
+    # -----------------------------
+    fragment = product_cache.get_product_fragment(product_id)
+    if fragment is None:
+        abort(404)
 
+    product = fragment["product"]
 
+    avg_rating = product["avg_rating"]
+    rating_count = product["rating_count"]
 
-    is_out_of_stock = product.stock is not None and product.stock <= 0
+
+
+    is_out_of_stock = product["stock"] is not None and product["stock"] <= 0
 
     # -----------------------------
     # Stock / Availability Guard
     # -----------------------------
-    if product.stock is not None and product.stock <= 0:
+    if is_out_of_stock:
         flash("Product currently out of stock", "warning")
 
 
-
-    # -----------------------------
-    # Related Products
-    # -----------------------------
-    related_products = (
-        Product.query
-        .filter(
-            Product.category_id == product.category_id,
-            Product.id != product.id,
-            Product.status == "ACTIVE"
-        )
-        .order_by(Product.created_at.desc())
-        .limit(4)
-        .all()
-    )
-
     # -----------------------------
     # Wishlist Status
     # -----------------------------
@@ -269,7 +188,7 @@ def product_detail(product_id):
     if current_user.is_authenticated:
         is_wishlisted = Wishlist.query.filter_by(
             user_id=current_user.id,
-            product_id=product.id
+            product_id=product_id
         ).first() is not None
 
 
@@ -291,44 +210,6 @@ def product_detail(product_id):
                 is not None
         )
 
-    # -----------------------------
-    # Reviews (approved only)
-    # -----------------------------
-    reviews = ProductReview.query.filter(
-        ProductReview.product_id == product.id,
-        ProductReview.is_active == True,
-        ProductReview.is_deleted == False,
-        ProductReview.review_text.isnot(None)
-    ).order_by(ProductReview.created_at.desc()).all()
-
-
-    # -----------------------------
-    # Rating Breakdown (Phase E)
-    # -----------------------------
-    rating_breakdown_raw = (
-        db.session.query(
-            ProductReview.rating,
-            func.count(ProductReview.id)
-        )
-        .filter(
-            ProductReview.product_id == product.id,
-            ProductReview.is_active == True,
-            ProductReview.is_deleted == False,
-            ProductReview.rating.isnot(None)
-        )
-        .group_by(ProductReview.rating)
-        .all()
-    )
-
-    # Convert to dict {5: 10, 4: 3, ...}
-    rating_map = {rating: count for rating, count in rating_breakdown_raw}
-
-    # Ensure all 1–5 stars exist (even if 0)
-    rating_breakdown = [
-        (star, rating_map.get(star, 0))
-        for star in range(5, 0, -1)
-    ]
-
 
     # -----------------------------
     # User specific flags
@@ -337,7 +218,7 @@ def product_detail(product_id):
 
     if current_user.is_authenticated:
         user_review = ProductReview.query.filter(
-            ProductReview.product_id == product.id,
+            ProductReview.product_id == product_id,
             ProductReview.user_id == current_user.id,
             ProductReview.is_deleted == False
         ).first()
@@ -347,13 +228,14 @@ def product_detail(product_id):
         product=product,
         avg_rating=round(avg_rating, 1),
         rating_count=rating_count,
-        related_products=related_products,
+        related_products=fragment["related_products"],
         is_wishlisted=is_wishlisted,
-        reviews=reviews,
+        reviews=fragment["reviews"],
+        reviews_next_cursor=fragment["reviews_next_cursor"],
         user_review=user_review,
         is_out_of_stock=is_out_of_stock,
         user_has_purchased=user_has_purchased,
-        rating_breakdown=rating_breakdown
+        rating_breakdown=fragment["rating_breakdown"]
     )
 
 
@@ -429,13 +311,9 @@ def add_review(product_id):
 
         flash("Review Submitted Successfully ✅ (Awaiting approval)", "success")
 
+    # ⭐ rating aggregates follow by delta (ProductReview events)
     db.session.commit()
-
-    # 🔁 Recalculate rating immediately after edit
-    product = Product.query.get(product_id)
-    if product:
-        product.update_avg_rating()
-        db.session.commit()
+    product_cache.invalidate_product(product_id)
 
     return redirect(url_for("main.product_detail", product_id=product_id))
 
@@ -492,12 +370,9 @@ def rate_product(product_id):
         )
         db.session.add(review)
 
+    # ⭐ rating aggregates follow by delta (ProductReview events)
     db.session.commit()
-
-    product = Product.query.get(product_id)
-    if product:
-        product.update_avg_rating()
-    db.session.commit()
+    product_cache.invalidate_product(product_id)
 
     flash("Rating Submitted Successfully ⭐", "success")
     return redirect(url_for("main.product_detail", product_id=product_id))
@@ -553,11 +428,8 @@ def delete_review(review_id):
     review.is_deleted = True
     review.is_active = False
 
-    product = Product.query.get(review.product_id)
-    if product:
-        product.update_avg_rating()
-
     db.session.commit()
+    product_cache.invalidate_product(review.product_id)
 
     flash("Review Deleted Successfully ❌", "success")
     return redirect(url_for("main.product_detail", product_id=review.product_id))
@@ -633,7 +505,7 @@ def api_add_to_cart():
     if quantity <= 0:
         return jsonify(success=False, message="Invalid quantity")
 
-    if product.stock < quantity:
+    if available_quantity(product, current_user.id) < quantity:
         return jsonify(success=False, message="Insufficient stock")
 
     existing = CartItem.query.filter_by(
@@ -641,12 +513,14 @@ def api_add_to_cart():
         product_id=product_id
     ).first()
 
-    if existing:
-        new_qty = existing.quantity + quantity
+    new_qty = existing.quantity + quantity if existing else quantity
 
-        if new_qty > product.stock:
-            return jsonify(success=False, message="Stock limit exceeded")
+    # ⏳ HOLD THE UNITS
+    if not reserve(current_user.id, product, new_qty):
+        db.session.rollback()
+        return jsonify(success=False, message="Stock limit exceeded")
 
+    if existing:
         existing.quantity = new_qty
 
     else:
@@ -660,26 +534,3 @@ def api_add_to_cart():
     db.session.commit()
 
     return jsonify(success=True)
-
-
-# -------------------------------------------------------
-#  GET CART DATA (FOR BADGE & UI)
-# -------------------------------------------------------
-@main_bp.route("/api/cart")
-@login_required
-def api_get_cart():
-
-    items = CartItem.query.filter_by(
-        user_id=current_user.id
-    ).all()
-
-    cart_data = []
-
-    for item in items:
-        cart_data.append({
-            "product_id": item.product_id,
-            "quantity": item.quantity,
-            "price": float(item.price_at_add)
-        })
-
-    return jsonify(success=True, cart=cart_data)
\ No newline at end of file
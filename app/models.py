@@ -6,6 +6,7 @@ from sqlalchemy.sql import func
 import uuid
 from sqlalchemy import event
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import column_property
 from sqlalchemy.orm.attributes import get_history
 from app.utils.time_utils import utc_now
 from werkzeug.security import generate_password_hash, check_password_hash
@@ -409,6 +410,9 @@ class Product(db.Model):
         db.Index("idx_category_status", "category_id", "status"),
         db.Index("idx_products_name", "name"),
         db.Index("idx_products_search", "name", "status"),
+
+        # ⚡ MySQL FULLTEXT (search_index service)
+        db.Index("ft_products_name", "name", mysql_prefix="FULLTEXT"),
     )
 
 
@@ -471,6 +475,10 @@ class Product(db.Model):
 
     stock = db.Column(db.Integer, nullable=False, default=0)
 
+    # ⚡ HOT SKU: stock lives in product_stock_shards,
+    # `stock` is only the last consolidated total (see stock_shards service)
+    stock_sharded = db.Column(db.Boolean, nullable=False, default=False)
+
     # --------------------------------------------------
     # 💰 PRICE ACCESSORS (PDP SOURCE OF TRUTH)
     # --------------------------------------------------
@@ -482,9 +490,21 @@ class Product(db.Model):
         """
         return float(self.price or 0)
 
+    @property
+    def live_stock(self):
+        """
+        Current units. Sharded products read through the shard counters
+        (products.stock lags until the next consolidation).
+        """
+        if not self.stock_sharded:
+            return self.stock or 0
+
+        from app.services.stock_shards import shard_total
+        return shard_total(self.id)
+
     @property
     def is_in_stock(self):
-        return self.stock > 0
+        return self.live_stock > 0
 
 
     # --------------------------------------------------
@@ -507,7 +527,7 @@ class Product(db.Model):
     def can_fulfill_quantity(self, qty: int) -> bool:
         if qty <= 0:
             return False
-        return self.stock >= qty
+        return self.live_stock >= qty
 
 
 
@@ -528,6 +548,16 @@ class Product(db.Model):
 
     rating_count = db.Column(db.Integer, default=0)
 
+    # ⭐ RUNNING RATING AGGREGATES (delta-maintained, see ProductReview events)
+    rating_sum = db.Column(db.Integer, default=0, nullable=False)
+
+    # per-star histogram (1★ … 5★)
+    rating_1_count = db.Column(db.Integer, default=0, nullable=False)
+    rating_2_count = db.Column(db.Integer, default=0, nullable=False)
+    rating_3_count = db.Column(db.Integer, default=0, nullable=False)
+    rating_4_count = db.Column(db.Integer, default=0, nullable=False)
+    rating_5_count = db.Column(db.Integer, default=0, nullable=False)
+
     created_at = db.Column(
         db.DateTime,
         default=utc_now,
@@ -573,41 +603,92 @@ class Product(db.Model):
     # --------------------------------------------------
     # RATING AGGREGATION (TRUSTED SOURCE)
     # --------------------------------------------------
-    def update_avg_rating(self):
+    @property
+    def rating_histogram(self):
         """
-        Updates product avg_rating and rating_count
-        using ONLY admin-approved & non-deleted reviews.
+        [(5, n), (4, n), ... (1, n)] for the PDP breakdown bars
         """
+        return [
+            (star, getattr(self, f"rating_{star}_count") or 0)
+            for star in range(5, 0, -1)
+        ]
 
-        avg = (
-            db.session.query(func.avg(ProductReview.rating))
-            .filter(
-                ProductReview.product_id == self.id,
-                ProductReview.is_active == True,
-                ProductReview.is_deleted == False,
-                ProductReview.rating.isnot(None)
-            )
-            .scalar()
+    @staticmethod
+    def rating_aggregates(star_counts):
+        """
+        {star: count} → column values for every rating field
+        """
+        counts = {star: int(star_counts.get(star, 0)) for star in range(1, 6)}
+
+        total = sum(counts.values())
+        rating_sum = sum(star * n for star, n in counts.items())
+
+        values = {
+            f"rating_{star}_count": n for star, n in counts.items()
+        }
+        values.update(
+            rating_sum=rating_sum,
+            rating_count=total,
+            avg_rating=round(rating_sum / total, 1) if total else 0.0
         )
+        return values
+
+    def update_avg_rating(self):
+        """
+        Full recompute (reconciliation) of the rating aggregates
+        using ONLY admin-approved & non-deleted reviews.
+
+        Normal review changes are applied by delta
+        (see ProductReview events) → no need to call this.
+        """
 
-        count = (
-            db.session.query(func.count(ProductReview.id))
+        rows = (
+            db.session.query(ProductReview.rating, func.count(ProductReview.id))
             .filter(
                 ProductReview.product_id == self.id,
                 ProductReview.is_active == True,
                 ProductReview.is_deleted == False,
                 ProductReview.rating.isnot(None)
             )
-            .scalar()
+            .group_by(ProductReview.rating)
+            .all()
         )
 
-        self.avg_rating = round(float(avg or 0), 1)
-        self.rating_count = int(count or 0)
+        for field, value in Product.rating_aggregates(dict(rows)).items():
+            setattr(self, field, value)
 
         db.session.flush()  # IMPORTANT
 
 
 
+# --------------------------------------------------
+# PRODUCT STOCK SHARDS (HOT SKU COUNTERS)
+# total stock = SUM(stock) over the product's shards
+# --------------------------------------------------
+class ProductStockShard(db.Model):
+    __tablename__ = "product_stock_shards"
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    product_id = db.Column(
+        db.Integer,
+        db.ForeignKey("products.id", ondelete="CASCADE"),
+        nullable=False
+    )
+
+    shard = db.Column(db.Integer, nullable=False)
+
+    stock = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.UniqueConstraint(
+            "product_id",
+            "shard",
+            name="uq_product_stock_shard"
+        ),
+    )
+
+
 # --------------------------------------------------
 # ATTRIBUTE TYPES (FILTER GROUPS)
 # --------------------------------------------------
@@ -732,10 +813,15 @@ class ProductReview(db.Model):
 
     id = db.Column(db.Integer, primary_key=True)
 
-    product_id = db.Column(
-        db.Integer,
-        db.ForeignKey("products.id", ondelete="CASCADE"),
-        nullable=False
+    # ⭐ active_history → old values are loaded before a change so the
+    # rating delta events always know which bucket a review left
+    product_id = column_property(
+        db.Column(
+            db.Integer,
+            db.ForeignKey("products.id", ondelete="CASCADE"),
+            nullable=False
+        ),
+        active_history=True
     )
 
     user_id = db.Column(
@@ -753,15 +839,24 @@ class ProductReview(db.Model):
 
     review_text = db.Column(db.Text, nullable=True)
 
-    rating = db.Column(db.Integer, nullable=True, default=None)
+    rating = column_property(
+        db.Column(db.Integer, nullable=True, default=None),
+        active_history=True
+    )
 
     # ---------------- MODERATION FLAGS ----------------
-    is_active = db.Column(db.Boolean, default=False)
+    is_active = column_property(
+        db.Column(db.Boolean, default=False),
+        active_history=True
+    )
     is_reported = db.Column(db.Boolean, default=False)
     report_reason = db.Column(db.String(255))
 
     # ---------------- SOFT DELETE ----------------
-    is_deleted = db.Column(db.Boolean, default=False, nullable=False)
+    is_deleted = column_property(
+        db.Column(db.Boolean, default=False, nullable=False),
+        active_history=True
+    )
 
     # ---------------- MODERATION AUDIT ----------------
     action_reason = db.Column(db.String(255))
@@ -772,6 +867,9 @@ class ProductReview(db.Model):
     )
     action_at = db.Column(db.DateTime)
 
+    # 👍 "Most helpful" sort (ReviewHelpfulVote keeps it one vote per user)
+    helpful_count = db.Column(db.Integer, default=0, nullable=False)
+
     created_at = db.Column(db.DateTime, default=utc_now)
 
     # relationships
@@ -795,6 +893,41 @@ class ProductReview(db.Model):
         db.Index("idx_review_deleted", "is_deleted"),
         db.Index("idx_review_product_rating", "product_id", "rating"),
 
+        # PDP review pages (newest → idx_review_product_active + PK)
+        db.Index("idx_review_product_helpful", "product_id", "is_active", "helpful_count"),
+        db.Index("idx_review_product_active_rating", "product_id", "is_active", "rating"),
+
+    )
+
+
+# ----------------------------------------------------------
+#   REVIEW HELPFUL VOTE (ONE PER USER PER REVIEW)
+# ----------------------------------------------------------
+class ReviewHelpfulVote(db.Model):
+    __tablename__ = "review_helpful_votes"
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    review_id = db.Column(
+        db.Integer,
+        db.ForeignKey("product_reviews.id", ondelete="CASCADE"),
+        nullable=False
+    )
+
+    user_id = db.Column(
+        db.Integer,
+        db.ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True
+    )
+
+    created_at = db.Column(db.DateTime, default=utc_now)
+
+    __table_args__ = (
+        db.UniqueConstraint(
+            "review_id", "user_id",
+            name="uq_review_helpful_vote"
+        ),
     )
 
 
@@ -844,6 +977,13 @@ class Order(db.Model):
             "refund_status IN ('none','initiated','processed','failed')",
             name="ck_refund_status_valid"
         ),
+
+        # 🔁 checkout retries (same key → same order)
+        db.UniqueConstraint(
+            "user_id",
+            "idempotency_key",
+            name="uq_orders_user_idempotency_key"
+        ),
     )
 
     id = db.Column(db.Integer, primary_key=True)
@@ -899,6 +1039,9 @@ class Order(db.Model):
 
     created_at = db.Column(db.DateTime, default=utc_now, nullable=False)
 
+    # client supplied (Idempotency-Key header) → retried checkout never double orders
+    idempotency_key = db.Column(db.String(64), nullable=True)
+
 
     # ADMIN CREATION
     created_by_admin = db.Column(db.Integer, db.ForeignKey("admins.id"), nullable=True)
@@ -1191,7 +1334,66 @@ class SavedForLater(db.Model):
 
 
 
-    
+# --------------------------------------------------
+# STOCK RESERVATIONS (TIME-LIMITED CART HOLDS)
+# available = stock − active holds of other users
+# --------------------------------------------------
+class StockReservation(db.Model):
+    __tablename__ = "stock_reservations"
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    user_id = db.Column(
+        db.Integer,
+        db.ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False
+    )
+
+    product_id = db.Column(
+        db.Integer,
+        db.ForeignKey("products.id", ondelete="CASCADE"),
+        nullable=False
+    )
+
+    # absolute (= cart quantity), not a delta
+    quantity = db.Column(db.Integer, nullable=False)
+
+    expires_at = db.Column(db.DateTime, nullable=False)
+
+    created_at = db.Column(
+        db.DateTime,
+        nullable=False,
+        default=utc_now
+    )
+
+    updated_at = db.Column(
+        db.DateTime,
+        nullable=False,
+        default=utc_now,
+        onupdate=utc_now
+    )
+
+    __table_args__ = (
+        # one hold per user & product
+        db.UniqueConstraint(
+            "user_id",
+            "product_id",
+            name="uq_stock_reservation_user_product"
+        ),
+
+        # SUM(active holds) per product (covering)
+        db.Index(
+            "ix_stock_reservations_product_active",
+            "product_id",
+            "expires_at",
+            "quantity"
+        ),
+
+        # sweeper
+        db.Index("ix_stock_reservations_expires", "expires_at"),
+    )
+
+
 # --------------------------------------------------
 # LOGIN ACTIVITY (AUDIT / SECURITY)
 # --------------------------------------------------
@@ -1359,7 +1561,11 @@ class AdminActivityLog(db.Model):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         if not self.log_ref:
-            self.log_ref = f"AL-{uuid.uuid4().hex[:10].upper()}"
+            self.log_ref = AdminActivityLog.new_log_ref()
+
+    @staticmethod
+    def new_log_ref():
+        return f"AL-{uuid.uuid4().hex[:10].upper()}"
 
 
 
@@ -1380,6 +1586,9 @@ class AuditInsight(db.Model):
 
     message = db.Column(db.Text, nullable=False)
 
+    # sha256(message) → dedupe without comparing TEXT
+    content_hash = db.Column(db.String(64), nullable=False)
+
     recommendation = db.Column(db.Text, nullable=True)
 
     confidence = db.Column(db.Float, default=0.0)
@@ -1395,11 +1604,203 @@ class AuditInsight(db.Model):
         nullable=False
     )
 
+    __table_args__ = (
+        db.UniqueConstraint("content_hash", name="uq_audit_insights_content_hash"),
+        db.Index("ix_audit_insights_active", "is_archived", "generated_at"),
+    )
+
     def __repr__(self):
         return f"<AuditInsight {self.severity} {self.insight_type}>"
 
 
 
+# --------------------------------------------------
+#   AUDIT ROLLUPS (HOURLY COUNTERS FOR ANALYTICS)
+# --------------------------------------------------
+class AuditRollup(db.Model):
+    __tablename__ = "audit_rollups"
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    # UTC hour bucket (created_at truncated to the hour)
+    hour = db.Column(db.DateTime, nullable=False)
+
+    actor_type = db.Column(db.String(20), nullable=False)
+    severity = db.Column(db.String(20), nullable=False)
+    action = db.Column(db.String(255), nullable=False)
+    is_bulk = db.Column(db.Boolean, nullable=False, default=False)
+
+    # all events in the bucket (hot table + cold storage)
+    events = db.Column(db.BigInteger, nullable=False, default=0)
+
+    # of which archived
+    archived_events = db.Column(db.BigInteger, nullable=False, default=0)
+
+    __table_args__ = (
+        db.UniqueConstraint(
+            "hour", "actor_type", "severity", "action", "is_bulk",
+            name="uq_audit_rollup_bucket"
+        ),
+    )
+
+    def __repr__(self):
+        return f"<AuditRollup {self.hour} {self.action} {self.events}>"
+
+
+
+# --------------------------------------------------
+#   DASHBOARD SNAPSHOT (MATERIALIZED ADMIN METRICS)
+# --------------------------------------------------
+class DashboardSnapshot(db.Model):
+    __tablename__ = "dashboard_snapshots"
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    # one row per dashboard ("admin")
+    name = db.Column(db.String(50), unique=True, nullable=False)
+
+    # users / orders / revenue / products / reviews counters
+    data = db.Column(db.JSON, nullable=False)
+
+    # time spent computing the counters
+    duration_ms = db.Column(db.Integer, nullable=False, default=0)
+
+    computed_at = db.Column(
+        db.DateTime,
+        default=utc_now,
+        nullable=False
+    )
+
+    def __repr__(self):
+        return f"<DashboardSnapshot {self.name} {self.computed_at}>"
+
+
+# --------------------------------------------------
+# BATCH JOB CHECKPOINT (RESUMABLE MAINTENANCE JOBS)
+# --------------------------------------------------
+class JobCheckpoint(db.Model):
+    __tablename__ = "job_checkpoints"
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    # one row per job ("audit_archive", "audit_cleanup")
+    name = db.Column(db.String(50), unique=True, nullable=False)
+
+    # run cutoff (kept so a resumed run applies the same rule)
+    cutoff = db.Column(db.DateTime, nullable=True)
+
+    # highest id already processed in the current run
+    last_id = db.Column(db.BigInteger, nullable=False, default=0)
+
+    # progress metrics
+    processed = db.Column(db.BigInteger, nullable=False, default=0)
+    batches = db.Column(db.Integer, nullable=False, default=0)
+
+    started_at = db.Column(db.DateTime, nullable=True)
+    updated_at = db.Column(db.DateTime, nullable=True)
+
+    # NULL while a run is in progress (or was interrupted)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<JobCheckpoint {self.name} last_id={self.last_id}>"
+
+
+
+# --------------------------------------------------
+#   EXPORT JOBS (BACKGROUND CSV EXPORTS)
+# --------------------------------------------------
+class ExportJob(db.Model):
+    __tablename__ = "export_jobs"
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    # opaque id used in status / download URLs
+    public_id = db.Column(db.String(32), unique=True, nullable=False)
+
+    admin_id = db.Column(
+        db.Integer,
+        db.ForeignKey("admins.id", ondelete="SET NULL"),
+        nullable=True,
+        index=True
+    )
+
+    # users | login_history | audit_logs
+    kind = db.Column(db.String(30), nullable=False)
+
+    # on-screen filters at request time (+ user_id / is_super_admin)
+    params = db.Column(db.JSON, nullable=False)
+
+    # queued | running | done | failed
+    status = db.Column(db.String(20), nullable=False, default="queued", index=True)
+
+    # set per claim; every worker write requires it → a restarted job
+    # fences off the attempt it replaced
+    lease_token = db.Column(db.String(32), nullable=True)
+
+    # progress
+    rows_written = db.Column(db.BigInteger, nullable=False, default=0)
+    total_rows = db.Column(db.BigInteger, nullable=True)
+
+    # artifact (EXPORT_DIR/<public_id>.csv.gz)
+    file_name = db.Column(db.String(255), nullable=True)
+    file_size = db.Column(db.BigInteger, nullable=True)
+
+    error = db.Column(db.Text, nullable=True)
+
+    created_at = db.Column(db.DateTime, nullable=False, default=utc_now)
+    started_at = db.Column(db.DateTime, nullable=True)
+    updated_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    # artifact + row removed by the sweeper after this
+    expires_at = db.Column(db.DateTime, nullable=True, index=True)
+
+    admin = db.relationship("Admin")
+
+    def __repr__(self):
+        return f"<ExportJob {self.public_id} {self.kind} {self.status}>"
+
+
+
+# --------------------------------------------------
+#   EMAIL OUTBOX (DURABLE ASYNC DELIVERY)
+# --------------------------------------------------
+class EmailOutbox(db.Model):
+    __tablename__ = "email_outbox"
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    to_email = db.Column(db.String(255), nullable=False)
+    sender = db.Column(db.String(255), nullable=True)
+    subject = db.Column(db.String(255), nullable=False)
+
+    body = db.Column(db.Text, nullable=True)
+    html = db.Column(db.Text, nullable=True)
+
+    # queued | sent | dead
+    status = db.Column(db.String(20), nullable=False, default="queued")
+
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=utc_now)
+    last_error = db.Column(db.Text, nullable=True)
+
+    # claim lease of the worker currently sending it
+    locked_by = db.Column(db.String(64), nullable=True, index=True)
+    locked_until = db.Column(db.DateTime, nullable=True)
+
+    created_at = db.Column(db.DateTime, nullable=False, default=utc_now)
+    sent_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        db.Index("ix_email_outbox_due", "status", "next_attempt_at"),
+    )
+
+    def __repr__(self):
+        return f"<EmailOutbox {self.id} {self.to_email} {self.status}>"
+
+
+
 # ==================================================
 # 🔒 IMMUTABLE AUDIT LOG PROTECTION (ENTERPRISE)
 # ==================================================
@@ -1434,3 +1835,126 @@ def prevent_admin_activity_log_delete(mapper, connection, target):
         orig=None
     )
 
+
+
+# ==================================================
+# ⭐ INCREMENTAL RATING AGGREGATES (DELTA UPDATES)
+# ==================================================
+RATING_FIELDS = [
+    "avg_rating", "rating_count", "rating_sum",
+    "rating_1_count", "rating_2_count", "rating_3_count",
+    "rating_4_count", "rating_5_count",
+]
+
+
+def _counted_rating(is_active, is_deleted, rating):
+    """
+    Rating value that counts towards the product aggregates, else None.
+    Same rule as Product.update_avg_rating.
+    """
+    if is_active and not is_deleted and rating is not None:
+        return rating
+    return None
+
+
+def _previous_value(target, key):
+    history = get_history(target, key)
+    if history.deleted:
+        return history.deleted[0]
+    return getattr(target, key)
+
+
+def _apply_rating_delta(connection, target, product_id, old, new):
+    """
+    Moves one review between histogram buckets with in-place
+    `col = col ± 1` updates (safe under concurrent writers).
+    """
+    if old == new:
+        return
+
+    products = Product.__table__
+    values = {}
+    count_delta = 0
+    sum_delta = 0
+
+    if old is not None:
+        column = products.c[f"rating_{old}_count"]
+        values[column.key] = column - 1
+        count_delta -= 1
+        sum_delta -= old
+
+    if new is not None:
+        column = products.c[f"rating_{new}_count"]
+        values[column.key] = column + 1
+        count_delta += 1
+        sum_delta += new
+
+    if count_delta:
+        values["rating_count"] = func.coalesce(products.c.rating_count, 0) + count_delta
+
+    values["rating_sum"] = products.c.rating_sum + sum_delta
+
+    connection.execute(
+        products.update()
+        .where(products.c.id == product_id)
+        .values(**values)
+    )
+
+    # second statement → reads the new totals on every dialect
+    connection.execute(
+        products.update()
+        .where(products.c.id == product_id)
+        .values(
+            avg_rating=db.case(
+                (
+                    products.c.rating_count > 0,
+                    func.round(products.c.rating_sum * 1.0 / products.c.rating_count, 1)
+                ),
+                else_=0.0
+            )
+        )
+    )
+
+    # keep an already-loaded Product in this session in sync
+    session = db.inspect(target).session
+    if session is not None:
+        product = session.identity_map.get(session.identity_key(Product, product_id))
+        if product is not None:
+            session.expire(product, RATING_FIELDS)
+
+
+@event.listens_for(ProductReview, "after_insert")
+def review_inserted(mapper, connection, target):
+    _apply_rating_delta(
+        connection, target, target.product_id,
+        None,
+        _counted_rating(target.is_active, target.is_deleted, target.rating)
+    )
+
+
+@event.listens_for(ProductReview, "after_update")
+def review_updated(mapper, connection, target):
+    old = _counted_rating(
+        _previous_value(target, "is_active"),
+        _previous_value(target, "is_deleted"),
+        _previous_value(target, "rating")
+    )
+    new = _counted_rating(target.is_active, target.is_deleted, target.rating)
+
+    old_product_id = _previous_value(target, "product_id")
+
+    if old_product_id != target.product_id:
+        _apply_rating_delta(connection, target, old_product_id, old, None)
+        _apply_rating_delta(connection, target, target.product_id, None, new)
+    else:
+        _apply_rating_delta(connection, target, target.product_id, old, new)
+
+
+@event.listens_for(ProductReview, "after_delete")
+def review_deleted(mapper, connection, target):
+    old = _counted_rating(
+        _previous_value(target, "is_active"),
+        _previous_value(target, "is_deleted"),
+        _previous_value(target, "rating")
+    )
+    _apply_rating_delta(connection, target, _previous_value(target, "product_id"), old, None)
@@ -1,42 +1,81 @@
 from datetime import datetime, timedelta, timezone
-from app.extensions import db
+
+from flask import current_app
+
+from app.extensions import db, scheduler
 from app.models import AdminActivityLog
+from app.services.audit_cold_storage import prune_cold_storage
+from app.services.audit_rollup_service import delete_logs
+from app.services.batch_jobs import run_id_range_job
 from app.utils.activity_logger import log_admin_action
 
+JOB_NAME = "audit_cleanup"
+
+
+def _delete_range(lo, hi, cutoff):
+    """
+    One id range of archived logs deleted (+ audit_rollups decremented).
+    Archived-only in SQL → same rule the before_delete listener
+    enforces (active logs can never be removed).
+    """
+    return delete_logs(
+        AdminActivityLog.id > lo,
+        AdminActivityLog.id <= hi,
+        AdminActivityLog.created_at < cutoff
+    )
+
 
-def cleanup_old_archived_audit_logs(days=180):
+def cleanup_old_archived_audit_logs(days=180, batch_size=None, sleep_seconds=None, restart=False):
     """
-    Deletes archived audit logs older than `days`.
+    Deletes archived audit logs older than `days`, in cold storage
+    (segments past the cutoff) and in the hot table.
     Runs via scheduler (system task).
+    Hot table chunked by id range, resumable (job_checkpoints "audit_cleanup").
     """
+    config = current_app.config
 
     cutoff_date = datetime.now(timezone.utc) - timedelta(days=days)
 
-    old_logs = (
-        AdminActivityLog.query
-        .filter(
-            AdminActivityLog.is_archived == 1,
-            AdminActivityLog.created_at < cutoff_date
-        )
-        .all()
-    )
+    # ❄️ COLD FIRST → rows still in both tiers are counted by the hot delete
+    cold_deleted = prune_cold_storage(days=days)
 
-    if not old_logs:
-        return 0
-
-    deleted_count = len(old_logs)
+    result = run_id_range_job(
+        JOB_NAME,
+        AdminActivityLog,
+        cutoff_date,
+        _delete_range,
+        where=(AdminActivityLog.is_archived.is_(True),),
+        batch_size=batch_size or config.get("AUDIT_JOB_BATCH_SIZE", 5000),
+        sleep_seconds=config.get("AUDIT_JOB_SLEEP_SECONDS", 0.1) if sleep_seconds is None else sleep_seconds,
+        restart=restart
+    )
 
-    for log in old_logs:
-        db.session.delete(log)
+    deleted_count = result["processed"] + cold_deleted
 
-    db.session.commit()
+    if not deleted_count:
+        return 0
 
     # ✅ SYSTEM AUDIT ENTRY
     log_admin_action(
         action="Auto cleanup archived audit logs",
         actor_type="system",
         is_bulk=True,
-        reason=f"Deleted {deleted_count} archived logs older than {days} days"
+        reason=(
+            f"Deleted {deleted_count} archived logs older than {days} days "
+            f"({result['processed']} in {result['batches']} batches, "
+            f"{cold_deleted} from cold storage)"
+        )
     )
 
     return deleted_count
+
+
+def cleanup_archived_job(days=180):
+    """
+    Runs via scheduler (outside any request)
+    """
+    with scheduler.app.app_context():
+        try:
+            cleanup_old_archived_audit_logs(days=days)
+        finally:
+            db.session.remove()
@@ -0,0 +1,487 @@
+"""
+Audit Log Cold Storage
+======================
+Archived audit logs older than AUDIT_COLD_STORAGE_DAYS are moved out of
+`admin_activity_logs` into append-only monthly segment files, so the hot
+table (and its indexes) only holds recent history.
+
+Layout (AUDIT_ARCHIVE_DIR):
+
+    audit-2026-01.jsonl.gz     one JSON row per line, gzip members
+                               appended per move batch (append-only)
+    audit-2026-01.idx.json     small min/max index for pruning:
+                               rows, id / created_at / admin_id /
+                               target_user_id min-max, severities,
+                               actor types
+
+- rows are appended + fsync'ed BEFORE they are deleted from the table;
+  a crash in between only leaves duplicates (in a segment, or in both
+  tiers until the next mover run), which readers drop by id
+- the mover is a chunked id-range job (job_checkpoints
+  "audit_cold_storage") → resumable, bounded memory
+- readers prune whole segments with the index, then decode one month
+  at a time (months are disjoint in created_at → newest-first scans
+  stop as soon as a page is full)
+- retention (the 180-day cleanup) drops whole months past the cutoff
+  and rewrites the month straddling it; the matching audit_rollups are
+  decremented in the same transaction, before the files change
+"""
+
+import gzip
+import json
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+from flask import current_app
+from sqlalchemy import select, delete
+
+from app.extensions import db, scheduler
+from app.models import AdminActivityLog
+from app.services.audit_rollup_service import apply_deltas, deltas_for_rows
+from app.services.batch_jobs import run_id_range_job
+
+try:
+    import fcntl  # POSIX only → single mover across workers
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+
+JOB_NAME = "audit_cold_storage"
+
+SEGMENT_COLUMNS = (
+    "id", "log_ref", "admin_id", "target_user_id", "action",
+    "ip_address", "user_agent", "severity", "reason",
+    "actor_type", "is_bulk", "created_at",
+)
+
+RANGE_FIELDS = ("id", "created_at", "admin_id", "target_user_id")
+SET_FIELDS = ("severity", "actor_type")
+
+DECODED_CACHE_SIZE = 4
+
+
+# --------------------------------------------------
+# ROW (TEMPLATE-COMPATIBLE WITH AdminActivityLog)
+# --------------------------------------------------
+class ArchivedLog:
+    """
+    Read-only audit row from a segment file.
+    `admin` / `user` are attached by the caller (bulk loaded per page).
+    """
+
+    is_archived = True
+    is_cold = True
+
+    __slots__ = SEGMENT_COLUMNS + ("admin", "user", "ist_time")
+
+    def __init__(self, data):
+        for column in SEGMENT_COLUMNS:
+            setattr(self, column, data.get(column))
+
+        self.admin = None
+        self.user = None
+        self.ist_time = None
+
+
+def _encode_row(row):
+    data = {}
+    for column in SEGMENT_COLUMNS:
+        value = row[column]
+        if isinstance(value, datetime):
+            value = value.replace(tzinfo=None).isoformat()
+        elif column == "is_bulk":
+            value = bool(value)
+        data[column] = value
+    return data
+
+
+def _decode_row(data):
+    data["created_at"] = datetime.fromisoformat(data["created_at"])
+    return ArchivedLog(data)
+
+
+def _row_dict(log):
+    return {column: getattr(log, column) for column in SEGMENT_COLUMNS}
+
+
+# --------------------------------------------------
+# SEGMENT STORE
+# --------------------------------------------------
+class SegmentStore:
+    def __init__(self, directory):
+        self.directory = directory
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    # ---------- paths ----------
+    def _data_path(self, month):
+        return os.path.join(self.directory, f"audit-{month}.jsonl.gz")
+
+    def _index_path(self, month):
+        return os.path.join(self.directory, f"audit-{month}.idx.json")
+
+    def months(self):
+        """
+        Months with a segment, newest first ("YYYY-MM").
+        """
+        if not os.path.isdir(self.directory):
+            return []
+
+        months = [
+            name[len("audit-"):-len(".idx.json")]
+            for name in os.listdir(self.directory)
+            if name.startswith("audit-") and name.endswith(".idx.json")
+        ]
+        return sorted(months, reverse=True)
+
+    # ---------- index ----------
+    def read_index(self, month):
+        try:
+            with open(self._index_path(month)) as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        for bound in ("min", "max"):
+            value = index[bound].get("created_at")
+            if value:
+                index[bound]["created_at"] = datetime.fromisoformat(value)
+
+        return index
+
+    def _write_index(self, month, index):
+        data = {
+            "rows": index["rows"],
+            "min": dict(index["min"]),
+            "max": dict(index["max"]),
+            "severity": sorted(index["severity"]),
+            "actor_type": sorted(index["actor_type"]),
+        }
+        for bound in ("min", "max"):
+            value = data[bound].get("created_at")
+            if isinstance(value, datetime):
+                data[bound]["created_at"] = value.isoformat()
+
+        tmp = self._index_path(month) + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(data, f, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self._index_path(month))
+
+    @staticmethod
+    def _merge_index(index, rows):
+        if index is None:
+            index = {"rows": 0, "min": {}, "max": {}, "severity": [], "actor_type": []}
+
+        index["severity"] = set(index["severity"])
+        index["actor_type"] = set(index["actor_type"])
+
+        for row in rows:
+            index["rows"] += 1
+
+            for field in RANGE_FIELDS:
+                value = row[field]
+                if value is None:
+                    continue
+                if isinstance(value, datetime):
+                    value = value.replace(tzinfo=None)
+
+                low = index["min"].get(field)
+                high = index["max"].get(field)
+                index["min"][field] = value if low is None else min(low, value)
+                index["max"][field] = value if high is None else max(high, value)
+
+            for field in SET_FIELDS:
+                if row[field] is not None:
+                    index[field].add(row[field])
+
+        return index
+
+    # ---------- write (append-only) ----------
+    def append(self, rows):
+        """
+        Appends DB rows (mappings) to their month segments.
+        Durable (fsync) before returning.
+        """
+        by_month = {}
+        for row in rows:
+            by_month.setdefault(row["created_at"].strftime("%Y-%m"), []).append(row)
+
+        os.makedirs(self.directory, exist_ok=True)
+
+        for month, month_rows in by_month.items():
+            payload = "".join(
+                json.dumps(_encode_row(r), separators=(",", ":")) + "\n"
+                for r in month_rows
+            ).encode()
+
+            # each append is one gzip member; readers see one stream
+            with open(self._data_path(month), "ab") as f:
+                f.write(gzip.compress(payload))
+                f.flush()
+                os.fsync(f.fileno())
+
+            self._write_index(month, self._merge_index(self.read_index(month), month_rows))
+
+            with self._cache_lock:
+                self._cache.pop(month, None)
+
+        return len(rows)
+
+    # ---------- retention ----------
+    def remove(self, month):
+        """
+        Drops a whole month (index first: data without an index is
+        invisible to readers, the reverse would not be).
+        """
+        for path in (self._index_path(month), self._data_path(month)):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+        with self._cache_lock:
+            self._cache.pop(month, None)
+
+    def rewrite(self, month, rows):
+        """
+        Replaces a month with `rows` (dicts), compacted into one gzip
+        member. tmp + fsync + rename → readers see old or new, never half.
+        """
+        payload = "".join(
+            json.dumps(_encode_row(r), separators=(",", ":")) + "\n"
+            for r in rows
+        ).encode()
+
+        tmp = self._data_path(month) + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(gzip.compress(payload))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self._data_path(month))
+
+        self._write_index(month, self._merge_index(None, rows))
+
+        with self._cache_lock:
+            self._cache.pop(month, None)
+
+    # ---------- read ----------
+    def load(self, month):
+        """
+        Decoded rows of one month, sorted newest first, deduped by id.
+        Small LRU keyed by file size (segments only grow).
+        """
+        path = self._data_path(month)
+
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return []
+
+        with self._cache_lock:
+            cached = self._cache.get(month)
+            if cached is not None and cached[0] == size:
+                self._cache.move_to_end(month)
+                return cached[1]
+
+        rows = {}
+        with gzip.open(path, "rt") as f:
+            for line in f:
+                if line.strip():
+                    row = _decode_row(json.loads(line))
+                    rows[row.id] = row
+
+        ordered = sorted(rows.values(), key=lambda r: (r.created_at, r.id), reverse=True)
+
+        with self._cache_lock:
+            self._cache[month] = (size, ordered)
+            while len(self._cache) > DECODED_CACHE_SIZE:
+                self._cache.popitem(last=False)
+
+        return ordered
+
+
+def get_store():
+    store = current_app.extensions.get("audit_cold_storage")
+
+    if store is None:
+        store = SegmentStore(current_app.config["AUDIT_ARCHIVE_DIR"])
+        current_app.extensions["audit_cold_storage"] = store
+
+    return store
+
+
+# --------------------------------------------------
+# MOVER (HOT TABLE → SEGMENTS)
+# --------------------------------------------------
+def hot_duplicate_ids(ids, chunk_size=1000):
+    """
+    Ids of cold rows still present in the hot table (segment appended,
+    then the DELETE never committed). The hot copy is the one that
+    counts; the next mover run removes it.
+    """
+    ids = list(ids)
+    found = set()
+
+    for start in range(0, len(ids), chunk_size):
+        found.update(db.session.execute(
+            select(AdminActivityLog.id)
+            .where(AdminActivityLog.id.in_(ids[start:start + chunk_size]))
+        ).scalars())
+
+    return found
+
+
+def _move_range(lo, hi, cutoff):
+    table = AdminActivityLog.__table__
+
+    rows = db.session.execute(
+        select(*[table.c[column] for column in SEGMENT_COLUMNS])
+        .where(
+            table.c.id > lo,
+            table.c.id <= hi,
+            table.c.is_archived == 1,
+            table.c.created_at < cutoff
+        )
+        .order_by(table.c.id)
+    ).mappings().all()
+
+    if not rows:
+        return 0
+
+    get_store().append(rows)
+
+    # archived-only delete → same rule as the before_delete listener
+    db.session.execute(
+        delete(table).where(
+            table.c.id.in_([r["id"] for r in rows]),
+            table.c.is_archived == 1
+        )
+    )
+
+    return len(rows)
+
+
+@contextmanager
+def _mover_lock(store):
+    """
+    Exclusive segment writer across workers → yields False if another
+    process holds it (mover and retention never interleave on a month).
+    """
+    os.makedirs(store.directory, exist_ok=True)
+    lock_file = open(os.path.join(store.directory, ".mover.lock"), "w")
+
+    try:
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                yield False
+                return
+
+        yield True
+
+    finally:
+        lock_file.close()
+
+
+def move_archived_to_cold_storage(days=None, batch_size=None, sleep_seconds=None, restart=False):
+    """
+    Moves archived logs older than `days` into monthly segments.
+    Returns rows moved (or 0 if another process holds the mover lock).
+    """
+    config = current_app.config
+    store = get_store()
+
+    days = days or config.get("AUDIT_COLD_STORAGE_DAYS", 120)
+    cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+
+    with _mover_lock(store) as locked:
+        if not locked:
+            print("⏭️ audit cold storage: mover already running")
+            return 0
+
+        result = run_id_range_job(
+            JOB_NAME,
+            AdminActivityLog,
+            cutoff,
+            _move_range,
+            where=(AdminActivityLog.is_archived.is_(True),),
+            batch_size=batch_size or config.get("AUDIT_JOB_BATCH_SIZE", 5000),
+            sleep_seconds=config.get("AUDIT_JOB_SLEEP_SECONDS", 0.1) if sleep_seconds is None else sleep_seconds,
+            restart=restart
+        )
+        return result["processed"]
+
+
+# --------------------------------------------------
+# RETENTION (SEGMENTS PAST THE CLEANUP CUTOFF)
+# --------------------------------------------------
+def prune_cold_storage(days=180):
+    """
+    Deletes cold rows older than `days` (same retention as the hot
+    table) + decrements audit_rollups for them. One month at a time:
+
+    - whole month before the cutoff → both files removed
+    - month straddling the cutoff   → rewritten with the newer rows
+
+    Run BEFORE the hot cleanup (rows in both tiers are decremented by
+    their hot delete). The rollup decrement commits only once the files
+    have changed; if the commit itself fails the rollups over-count
+    until backfill().
+    Returns events deleted, rows still in the hot table not included
+    (0 if the mover holds the lock → next run).
+    """
+    store = get_store()
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=days)).replace(tzinfo=None)
+
+    deleted = 0
+
+    with _mover_lock(store) as locked:
+        if not locked:
+            print("⏭️ audit cold storage: pruning skipped, mover running")
+            return 0
+
+        for month in store.months():
+            index = store.read_index(month)
+            if index is None or not index["min"].get("created_at"):
+                continue
+
+            if index["min"]["created_at"] >= cutoff:
+                continue
+
+            rows = [_row_dict(r) for r in store.load(month)]
+            expired = [r for r in rows if r["created_at"] < cutoff]
+            kept = [r for r in rows if r["created_at"] >= cutoff]
+
+            # still in the hot table too → its hot delete decrements it
+            hot = hot_duplicate_ids([r["id"] for r in expired])
+            counted = [r for r in expired if r["id"] not in hot]
+
+            with db.engine.begin() as conn:
+                apply_deltas(conn, deltas_for_rows(counted, events=-1, archived=-1))
+
+                if kept:
+                    store.rewrite(month, kept[::-1])
+                else:
+                    store.remove(month)
+
+            # hot duplicates are deleted (and counted) by the hot cleanup
+            deleted += len(counted)
+
+    return deleted
+
+
+def cold_storage_job():
+    """
+    Runs via scheduler (outside any request)
+    """
+    with scheduler.app.app_context():
+        try:
+            move_archived_to_cold_storage()
+        finally:
+            db.session.remove()
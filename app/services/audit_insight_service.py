@@ -0,0 +1,347 @@
+"""
+Audit Insights (Scheduled)
+==========================
+Rule based insights over the last N days of audit activity, compared
+with the N days before (audit_rollups → one grouped query).
+
+- generated by the scheduler every AUDIT_INSIGHTS_MINUTES, never on a
+  page view → /admin/audit-analytics only reads stored insights
+- deduped by `content_hash` (sha256 of the message, UNIQUE) with one
+  multi-row INSERT that skips existing hashes → no per-insight lookups
+  on the TEXT column
+"""
+
+import hashlib
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, case
+from sqlalchemy.dialects import mysql, sqlite, postgresql
+
+from app.extensions import db, scheduler
+from app.models import AuditInsight, AuditRollup
+from app.services.audit_rollup_service import hour_bucket, rollup_query
+from app.utils.audit_recommendations_engine import generate_recommendations
+from app.utils.time_utils import utc_now
+
+
+# newest active insights shown on the analytics page
+ACTIVE_INSIGHTS_LIMIT = 50
+
+
+# --------------------------------------------------
+# AI STYLE AUDIT INSIGHTS (RULE BASED)
+# --------------------------------------------------
+def generate_audit_insights(query, days=7):
+    """
+    query → AuditRollup query (RBAC applied, see rollup_query).
+    Both periods come from ONE grouped rollup query; every count
+    below is computed from those few rows in Python.
+    """
+
+    now = datetime.now(timezone.utc)
+    start = hour_bucket(now - timedelta(days=days))
+    prev_start = start - timedelta(days=days)
+
+    insights = []
+
+    is_current = case((AuditRollup.hour >= start, 1), else_=0).label("is_current")
+
+    rows = (
+        query.with_entities(
+            is_current,
+            AuditRollup.actor_type,
+            AuditRollup.severity,
+            AuditRollup.action,
+            AuditRollup.is_bulk,
+            func.sum(AuditRollup.events).label("events")
+        )
+        .filter(AuditRollup.hour >= prev_start)
+        .group_by(
+            is_current,
+            AuditRollup.actor_type,
+            AuditRollup.severity,
+            AuditRollup.action,
+            AuditRollup.is_bulk
+        )
+        .all()
+    )
+
+    current = [r for r in rows if r.is_current]
+    previous = [r for r in rows if not r.is_current]
+
+    def total(rows, **match):
+        return sum(
+            int(r.events) for r in rows
+            if all(getattr(r, k) == v for k, v in match.items())
+        )
+
+    # -------------------------------
+    # TOTAL COUNTS
+    # -------------------------------
+    total_actions = total(current)
+    high_count = total(current, severity="HIGH")
+    admin_count = total(current, actor_type="admin")
+    system_count = total(current, actor_type="system")
+
+    # -------------------------------
+    # SAFE PERCENTAGE CALCULATION
+    # -------------------------------
+    if total_actions > 0:
+        high_pct = round((high_count / total_actions) * 100)
+        admin_pct = round((admin_count / total_actions) * 100)
+        system_pct = round((system_count / total_actions) * 100)
+    else:
+        high_pct = admin_pct = system_pct = 0
+
+    # -------------------------------
+    # GROWTH % HELPER
+    # -------------------------------
+    def growth_pct(current, previous):
+        """
+        Dashboard-safe growth percentage
+        Always stays between 0–100
+        """
+        if previous <= 0:
+            return 0
+
+        ratio = current / previous
+
+        # Convert to growth %
+        growth = (ratio - 1) * 100
+
+        # HARD CAP
+        if growth < 0:
+            return 0
+        if growth > 100:
+            return 100
+
+        return round(growth)
+
+    # -------------------------------
+    # HIGH SEVERITY TREND (REACTIVE + PREDICTIVE)
+    # -------------------------------
+    previous_high = total(previous, severity="HIGH")
+
+    if previous_high > 0:
+        change = growth_pct(high_count, previous_high)
+
+        if change >= 30:
+            insights.append({
+                "level": "danger",
+                "icon": "alert-triangle",
+                "text": (
+                    f"High severity actions increased by {change}% in last {days} days. "
+                    "If this trend continues, security risk may increase."
+                )
+            })
+        elif change <= -25:
+            insights.append({
+                "level": "success",
+                "icon": "check-circle",
+                "text": "High severity actions reduced compared to previous period"
+            })
+
+    # -------------------------------
+    # BULK ACTION CHECK (GENERIC)
+    # -------------------------------
+    bulk_count = total(current, is_bulk=True)
+
+    if bulk_count >= 3:
+        insights.append({
+            "level": "warning",
+            "icon": "layers",
+            "text": f"{bulk_count} bulk admin actions detected recently"
+        })
+
+    # -------------------------------
+    # SYSTEM AUTOMATION HEALTH
+    # -------------------------------
+    previous_system = total(previous, actor_type="system")
+
+    system_growth = growth_pct(system_count, previous_system)
+
+    if system_count == 0:
+        insights.append({
+            "level": "info",
+            "icon": "info",
+            "text": "No automated system activity detected in current period"
+        })
+    elif system_growth <= 5:
+        insights.append({
+            "level": "success",
+            "icon": "cpu",
+            "text": (
+                f"System automation operating normally "
+                f"({system_pct}% of total activity, {system_growth}% change)"
+            )
+        })
+    else:
+        insights.append({
+            "level": "warning",
+            "icon": "cpu",
+            "text": (
+                f"System automation activity changed by {system_growth}%. "
+                "Monitor automation stability."
+            )
+        })
+
+    # -------------------------------
+    # ADMIN BEHAVIOR GROWTH
+    # -------------------------------
+    previous_admin = total(previous, actor_type="admin")
+
+    admin_growth = growth_pct(admin_count, previous_admin)
+
+    if admin_growth >= 35:
+        insights.append({
+            "level": "warning",
+            "icon": "shield",
+            "text": (
+                f"Admin activity increased by {admin_growth}%. "
+                "Unusual admin behavior may require review."
+            )
+        })
+
+    # -------------------------------
+    # ACTIVITY SPIKE (PAST)
+    # -------------------------------
+    previous_total = total(previous)
+
+    if previous_total > 0:
+        spike = growth_pct(total_actions, previous_total)
+        if spike >= 40:
+            insights.append({
+                "level": "danger",
+                "icon": "trending-up",
+                "text": f"Audit activity spiked by {spike}% compared to previous period"
+            })
+
+
+    # -------------------------------
+    # PERCENTAGE BASED EXPLANATIONS
+    # -------------------------------
+    if high_pct >= 15:
+        insights.append({
+            "level": "danger",
+            "icon": "percent",
+            "text": f"High severity actions form {high_pct}% of total audit activity"
+        })
+
+    if admin_pct >= 70:
+        insights.append({
+            "level": "warning",
+            "icon": "user",
+            "text": f"Admin actions account for {admin_pct}% of total activity"
+        })
+
+    # =================================================
+    #  PRIORITY-3 STEP-3 : ENTITY-AWARE INSIGHTS
+    # =================================================
+
+    # -------------------------------
+    # ADMIN-WISE HIGH SEVERITY DOMINANCE
+    # -------------------------------
+    actor_rows = Counter()
+    for r in current:
+        if r.severity == "HIGH":
+            actor_rows[r.actor_type] += int(r.events)
+
+    for actor_type, count in actor_rows.items():
+        pct = round((count / high_count) * 100) if high_count else 0
+        if pct >= 60:
+            insights.append({
+                "level": "danger",
+                "icon": "users",
+                "text": (
+                    f"{actor_type.capitalize()} actions account for {pct}% of HIGH severity events "
+                    f"({count} out of {high_count})"
+                )
+            })
+
+    # -------------------------------
+    # ACTION-WISE BULK DETECTION
+    # -------------------------------
+    action_rows = Counter()
+    for r in current:
+        action_rows[r.action] += int(r.events)
+
+    for action, count in action_rows.items():
+        if count >= 10:
+            insights.append({
+                "level": "warning",
+                "icon": "repeat",
+                "text": f"Bulk '{action}' actions detected ({count} times)"
+            })
+
+
+
+    return insights
+
+
+# --------------------------------------------------
+# STORE (HASH DEDUPE, ONE INSERT)
+# --------------------------------------------------
+def insight_hash(message):
+    return hashlib.sha256(message.strip().encode("utf-8")).hexdigest()
+
+
+def _insert_ignore(rows):
+    table = AuditInsight.__table__
+    name = db.session.get_bind().dialect.name
+
+    if name == "mysql":
+        return mysql.insert(table).values(rows).prefix_with("IGNORE")
+
+    dialect = postgresql if name == "postgresql" else sqlite
+    return dialect.insert(table).values(rows).on_conflict_do_nothing(
+        index_elements=[table.c.content_hash]
+    )
+
+
+def store_insights(insights):
+    """
+    Inserts insights whose content_hash is new. Returns rows inserted.
+    """
+    rows = {}
+    now = utc_now()
+
+    for i in insights:
+        content_hash = insight_hash(i["text"])
+        rows[content_hash] = {
+            "content_hash": content_hash,
+            "insight_type": i.get("type", "OPERATIONAL"),
+            "severity": i.get("level", "info").upper(),
+            "message": i["text"],
+            "recommendation": i.get("recommendation"),
+            "confidence": i.get("confidence", 0.0),
+            "is_seen": False,
+            "is_archived": False,
+            "generated_at": now,
+        }
+
+    if not rows:
+        return 0
+
+    result = db.session.execute(_insert_ignore(list(rows.values())))
+    db.session.commit()
+
+    return max(result.rowcount or 0, 0)
+
+
+def refresh_audit_insights(days=7):
+    insights = generate_recommendations(
+        generate_audit_insights(rollup_query(), days=days)
+    )
+    return store_insights(insights)
+
+
+def generate_insights_job():
+    """
+    Runs via scheduler (outside any request)
+    """
+    with scheduler.app.app_context():
+        try:
+            refresh_audit_insights()
+        finally:
+            db.session.remove()
@@ -0,0 +1,362 @@
+"""
+Audit Log Queries (Hot Table + Cold Segments)
+=============================================
+One filter spec parsed from the request, applied two ways:
+
+- `apply_filters(query, filters)` → SQL on admin_activity_logs
+- `row_matches(row, filters)`     → Python on cold segment rows
+
+Archived listings / exports read both tiers and merge them on
+(created_at DESC, id DESC), so callers never see where a row lives.
+A row can briefly be in both (segment appended, hot DELETE not
+committed): the merge keeps one copy per id, the hot one.
+"""
+
+import heapq
+from datetime import datetime, timedelta
+
+from app.models import AdminActivityLog, Admin, User
+from app.services.audit_cold_storage import get_store
+from app.utils.pagination import (
+    KeysetColumn, decode_cursor, seek_rows, build_keyset_page
+)
+from app.utils.time_utils import ist_date_to_utc, to_ist
+
+
+AUDIT_LOG_KEYS = [
+    KeysetColumn(AdminActivityLog.created_at, descending=True),
+    KeysetColumn(AdminActivityLog.id, descending=True),
+]
+
+
+def _naive(dt):
+    return dt.replace(tzinfo=None) if dt is not None and dt.tzinfo else dt
+
+
+# --------------------------------------------------
+# FILTER SPEC (FROM REQUEST ARGS)
+# --------------------------------------------------
+def parse_filters(args, is_super_admin=False):
+    q = (args.get("q") or "").strip()
+
+    filters = {
+        # 🔒 RBAC: normal admins never see system / bulk logs
+        "restricted": not is_super_admin,
+        "party_id": int(q) if q.isdigit() else None,
+        "admin_email": q if q and not q.isdigit() else None,
+        "action": args.get("action") or None,
+        "severity": args.get("severity") or None,
+        "archived": args.get("archived") == "1",
+        "start": None,
+        "end": None,
+    }
+
+    # 📅 IST DAY RANGE → UTC (1 second buffer at the start, audit safe)
+    from_date = args.get("from_date")
+    to_date = args.get("to_date")
+
+    if from_date:
+        ist_start = datetime.strptime(from_date, "%Y-%m-%d")
+        filters["start"] = ist_date_to_utc(ist_start) - timedelta(seconds=1)
+
+    if to_date:
+        ist_end = datetime.strptime(to_date, "%Y-%m-%d") + timedelta(days=1)
+        filters["end"] = ist_date_to_utc(ist_end)
+
+    return filters
+
+
+def apply_filters(query, filters):
+    if filters["restricted"]:
+        query = query.filter(
+            AdminActivityLog.actor_type == "admin",
+            AdminActivityLog.is_bulk == 0
+        )
+
+    if filters["party_id"] is not None:
+        query = query.filter(
+            (AdminActivityLog.admin_id == filters["party_id"]) |
+            (AdminActivityLog.target_user_id == filters["party_id"])
+        )
+    elif filters["admin_email"]:
+        query = query.join(AdminActivityLog.admin).filter(
+            AdminActivityLog.admin.has(email=filters["admin_email"])
+        )
+
+    if filters["action"]:
+        query = query.filter(AdminActivityLog.action.ilike(f"%{filters['action']}%"))
+
+    if filters["severity"]:
+        query = query.filter(AdminActivityLog.severity == filters["severity"])
+
+    query = query.filter(AdminActivityLog.is_archived.is_(filters["archived"]))
+
+    if filters["start"]:
+        query = query.filter(AdminActivityLog.created_at >= filters["start"])
+
+    if filters["end"]:
+        query = query.filter(AdminActivityLog.created_at < filters["end"])
+
+    return query
+
+
+# --------------------------------------------------
+# COLD TIER MATCHING
+# --------------------------------------------------
+def _cold_filters(filters):
+    """
+    Naive datetimes + admin email resolved to an id (None → no match).
+    """
+    cold = dict(filters)
+    cold["start"] = _naive(filters["start"])
+    cold["end"] = _naive(filters["end"])
+    cold["action"] = filters["action"].lower() if filters["action"] else None
+    cold["admin_id"] = None
+
+    if filters["admin_email"]:
+        admin = Admin.query.filter_by(email=filters["admin_email"]).first()
+        cold["admin_id"] = admin.id if admin else -1
+
+    return cold
+
+
+def segment_may_match(index, cold):
+    """
+    Min/max index pruning → skip months that cannot contain a match.
+    """
+    if index is None or not index["rows"]:
+        return False
+
+    low, high = index["min"], index["max"]
+
+    if cold["start"] and high.get("created_at") and high["created_at"] < cold["start"]:
+        return False
+
+    if cold["end"] and low.get("created_at") and low["created_at"] >= cold["end"]:
+        return False
+
+    if cold["severity"] and cold["severity"] not in index["severity"]:
+        return False
+
+    if cold["restricted"] and "admin" not in index["actor_type"]:
+        return False
+
+    if cold["admin_id"] is not None:
+        if not low.get("admin_id") or not (low["admin_id"] <= cold["admin_id"] <= high["admin_id"]):
+            return False
+
+    party = cold["party_id"]
+    if party is not None:
+        in_admins = low.get("admin_id") is not None and low["admin_id"] <= party <= high["admin_id"]
+        in_users = low.get("target_user_id") is not None and low["target_user_id"] <= party <= high["target_user_id"]
+        if not (in_admins or in_users):
+            return False
+
+    return True
+
+
+def row_matches(row, cold):
+    if cold["restricted"] and (row.actor_type != "admin" or row.is_bulk):
+        return False
+
+    if cold["party_id"] is not None and cold["party_id"] not in (row.admin_id, row.target_user_id):
+        return False
+
+    if cold["admin_id"] is not None and row.admin_id != cold["admin_id"]:
+        return False
+
+    if cold["action"] and cold["action"] not in (row.action or "").lower():
+        return False
+
+    if cold["severity"] and row.severity != cold["severity"]:
+        return False
+
+    if cold["start"] and row.created_at < cold["start"]:
+        return False
+
+    if cold["end"] and row.created_at >= cold["end"]:
+        return False
+
+    return True
+
+
+def _unique(rows):
+    """
+    Drops the second copy of a row. Both copies share (created_at, id)
+    → duplicates are adjacent in a merged stream; hot comes first.
+    """
+    last_id = None
+
+    for row in rows:
+        if row.id == last_id:
+            continue
+
+        last_id = row.id
+        yield row
+
+
+def _after(row, values, backwards):
+    key = (row.created_at, row.id)
+    return key > values if backwards else key < values
+
+
+def cold_row_estimate(filters):
+    """
+    Upper bound of the matching segment rows from the month indexes
+    only (no segment is read) → progress totals.
+    """
+    store = get_store()
+    cold = _cold_filters(filters)
+
+    total = 0
+    for month in store.months():
+        index = store.read_index(month)
+        if segment_may_match(index, cold):
+            total += index["rows"]
+
+    return total
+
+
+def cold_rows(filters, values=None, backwards=False, limit=None):
+    """
+    Matching segment rows in seek order (newest first, or oldest first
+    when walking backwards), after the cursor position.
+    """
+    store = get_store()
+    cold = _cold_filters(filters)
+
+    if values is not None:
+        values = (_naive(values[0]), values[1])
+
+    months = store.months()
+    if backwards:
+        months = list(reversed(months))
+
+    found = 0
+
+    for month in months:
+        index = store.read_index(month)
+
+        if not segment_may_match(index, cold):
+            continue
+
+        if values is not None:
+            # whole month on the wrong side of the cursor
+            if not backwards and index["min"]["created_at"] > values[0]:
+                continue
+            if backwards and index["max"]["created_at"] < values[0]:
+                continue
+
+        rows = store.load(month)
+        if backwards:
+            rows = reversed(rows)
+
+        for row in rows:
+            if values is not None and not _after(row, values, backwards):
+                continue
+            if not row_matches(row, cold):
+                continue
+
+            yield row
+
+            found += 1
+            if limit is not None and found >= limit:
+                return
+
+
+def attach_people(rows):
+    """
+    admin / user objects for cold rows (2 IN queries per page).
+    """
+    cold = [r for r in rows if getattr(r, "is_cold", False)]
+    if not cold:
+        return
+
+    admin_ids = {r.admin_id for r in cold if r.admin_id}
+    user_ids = {r.target_user_id for r in cold if r.target_user_id}
+
+    admins = {a.id: a for a in Admin.query.filter(Admin.id.in_(admin_ids))} if admin_ids else {}
+    users = {u.id: u for u in User.query.filter(User.id.in_(user_ids))} if user_ids else {}
+
+    for row in cold:
+        row.admin = admins.get(row.admin_id)
+        row.user = users.get(row.target_user_id)
+
+
+# --------------------------------------------------
+# ARCHIVED LISTING (HOT ARCHIVED ROWS + COLD SEGMENTS)
+# --------------------------------------------------
+def archived_page(query, filters, cursor=None, per_page=20):
+    """
+    Keyset page over both tiers. `query` is the filtered hot query.
+    """
+    values, direction = decode_cursor(cursor, AUDIT_LOG_KEYS)
+    backwards = values is not None and direction == "prev"
+
+    limit = per_page + 1
+
+    hot = seek_rows(query, AUDIT_LOG_KEYS, values, backwards, limit=limit)
+    cold = list(cold_rows(filters, values, backwards, limit=limit))
+
+    # stable sort → a hot row stays ahead of its cold copy
+    merged = list(_unique(sorted(
+        hot + cold,
+        key=lambda r: (_naive(r.created_at), r.id),
+        reverse=not backwards
+    )))[:limit]
+
+    page = build_keyset_page(
+        merged,
+        AUDIT_LOG_KEYS,
+        per_page,
+        values=values,
+        backwards=backwards
+    )
+
+    attach_people(page.items)
+
+    return page
+
+
+def iter_export_rows(query, filters):
+    """
+    Hot rows + (archived only) cold rows, newest first, streamed.
+    """
+    hot = query.order_by(
+        AdminActivityLog.created_at.desc(),
+        AdminActivityLog.id.desc()
+    ).yield_per(1000)
+
+    if not filters["archived"]:
+        yield from hot
+        return
+
+    yield from _unique(heapq.merge(
+        hot,
+        cold_rows(filters),
+        key=lambda r: (_naive(r.created_at), r.id),
+        reverse=True
+    ))
+
+
+def with_ist_time(rows):
+    for row in rows:
+        row.ist_time = to_ist(row.created_at)
+    return rows
+
+
+# --------------------------------------------------
+# CSV ROWS
+# --------------------------------------------------
+AUDIT_CSV_HEADER = ["Date", "Time", "Admin ID", "Action", "Target User ID"]
+
+
+def audit_log_csv_row(log):
+    ist_time = to_ist(log.created_at)
+    return [
+        ist_time.strftime("%d %b %Y"),
+        ist_time.strftime("%I:%M %p"),
+        log.admin_id,
+        log.action,
+        log.target_user_id
+    ]
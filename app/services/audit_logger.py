@@ -1,5 +1,4 @@
-from app.extensions import db
-from app.models import AdminActivityLog
+from app.services.audit_writer import enqueue_audit_log
 
 
 def log_system_action(
@@ -11,17 +10,15 @@ def log_system_action(
     """
     System-level audit logger
     No admin involved
+    Queued for the batched audit writer (no commit here)
     """
 
-    log = AdminActivityLog(
+    enqueue_audit_log(
+        action,
         admin_id=None,
         target_user_id=None,
-        action=action,
         severity=severity,
         reason=reason,
         actor_type="system",
         is_bulk=is_bulk
     )
-
-    db.session.add(log)
-    db.session.commit()
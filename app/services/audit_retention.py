@@ -1,43 +1,84 @@
 from datetime import datetime, timedelta, timezone
+
+from flask import current_app
+
 from app.models import AdminActivityLog
-from app.extensions import db
+from app.extensions import db, scheduler
+from app.services.audit_rollup_service import set_archived
+from app.services.batch_jobs import run_id_range_job
 from app.utils.activity_logger import log_admin_action
 
 RETENTION_DAYS = 90
+JOB_NAME = "audit_archive"
+
+
+# rows the archive job touches (besides id range / cutoff)
+ARCHIVABLE = (
+    AdminActivityLog.severity != "HIGH",
+    AdminActivityLog.actor_type != "system",
+    AdminActivityLog.is_archived.is_(False),
+)
+
+
+def _archive_range(lo, hi, cutoff):
+    """
+    One id range → archived (+ audit_rollups archived counters).
+    Only `is_archived` changes → same rule the immutability listener enforces.
+    """
+    return set_archived(
+        AdminActivityLog.id > lo,
+        AdminActivityLog.id <= hi,
+        AdminActivityLog.created_at < cutoff,
+        *ARCHIVABLE,
+        archived=True
+    )
+
 
-def auto_archive_old_audit_logs():
+def auto_archive_old_audit_logs(batch_size=None, sleep_seconds=None, restart=False):
     """
     Auto archive old audit logs (Retention Policy)
+    Chunked by id range, resumable (job_checkpoints "audit_archive").
+    Returns number of logs archived.
     """
+    config = current_app.config
 
     cutoff = datetime.now(timezone.utc) - timedelta(days=RETENTION_DAYS)
 
-    logs = (
-        AdminActivityLog.query
-        .filter(
-            AdminActivityLog.created_at < cutoff,
-            AdminActivityLog.is_archived == 0,
-            AdminActivityLog.severity != "HIGH",
-            AdminActivityLog.actor_type != "system"
-        )
-        .all()
+    result = run_id_range_job(
+        JOB_NAME,
+        AdminActivityLog,
+        cutoff,
+        _archive_range,
+        where=ARCHIVABLE,
+        batch_size=batch_size or config.get("AUDIT_JOB_BATCH_SIZE", 5000),
+        sleep_seconds=config.get("AUDIT_JOB_SLEEP_SECONDS", 0.1) if sleep_seconds is None else sleep_seconds,
+        restart=restart
     )
 
-    if not logs:
+    if not result["processed"]:
         return 0
 
-    for log in logs:
-        log.is_archived = 1
-
-    db.session.commit()
-
     # System audit entry
     log_admin_action(
         action="Auto archived audit logs (retention policy)",
-        reason=f"Archived {len(logs)} logs older than {RETENTION_DAYS} days",
+        reason=(
+            f"Archived {result['processed']} logs older than {RETENTION_DAYS} days "
+            f"in {result['batches']} batches"
+        ),
         actor_type="system",
         is_bulk=True,
         severity="LOW"
     )
 
-    return len(logs)
+    return result["processed"]
+
+
+def auto_archive_job():
+    """
+    Runs via scheduler (outside any request)
+    """
+    with scheduler.app.app_context():
+        try:
+            auto_archive_old_audit_logs()
+        finally:
+            db.session.remove()
@@ -0,0 +1,281 @@
+"""
+Audit Rollups
+=============
+Hourly counters keyed by (hour, actor_type, severity, action, is_bulk)
+so audit analytics / trends / security health never scan the raw log.
+
+Maintained incrementally, in the same transaction as the change:
+
+- new events      → audit writer batch (`apply_deltas` on insert)
+- archive/restore → `set_archived(...)`  (archived_events ±1)
+- hard delete     → `delete_logs(...)`   (events −1, archived −1)
+- cold retention  → `prune_cold_storage(...)` (events −1, archived −1
+                    for the segment rows past the cleanup cutoff)
+
+Moving rows to cold storage does not touch the rollups: those events
+still exist (and are still archived) until retention drops them.
+
+`backfill()` rebuilds everything from the hot table + the cold segments
+that are left (a row in both tiers is counted once, as its hot copy).
+"""
+
+from collections import defaultdict
+
+from sqlalchemy import select, update, delete, func, case, and_
+from sqlalchemy.dialects import mysql, sqlite, postgresql
+
+from app.extensions import db
+from app.models import AdminActivityLog, AuditRollup
+
+
+KEY_FIELDS = ("hour", "actor_type", "severity", "action", "is_bulk")
+
+
+def hour_bucket(dt):
+    return dt.replace(minute=0, second=0, microsecond=0, tzinfo=None)
+
+
+def rollup_key(created_at, actor_type, severity, action, is_bulk):
+    return (
+        hour_bucket(created_at),
+        actor_type or "admin",
+        severity or "LOW",
+        (action or "")[:255],
+        bool(is_bulk),
+    )
+
+
+# --------------------------------------------------
+# DELTA UPSERT (ONE STATEMENT PER KEY, NO READ)
+# --------------------------------------------------
+def apply_deltas(connection, deltas):
+    """
+    deltas: {key: [events_delta, archived_delta]}
+    Upserts run in key order → concurrent writers lock the rollup rows
+    in the same order (no deadlock between two batches).
+    """
+    rows = [
+        dict(zip(KEY_FIELDS, key), events=d[0], archived_events=d[1])
+        for key, d in sorted(deltas.items(), key=lambda item: item[0])
+        if d[0] or d[1]
+    ]
+
+    if not rows:
+        return 0
+
+    table = AuditRollup.__table__
+    name = connection.dialect.name
+
+    for row in rows:
+        if name == "mysql":
+            stmt = mysql.insert(table).values(**row)
+            stmt = stmt.on_duplicate_key_update(
+                events=table.c.events + stmt.inserted.events,
+                archived_events=table.c.archived_events + stmt.inserted.archived_events
+            )
+        else:
+            dialect = postgresql if name == "postgresql" else sqlite
+            stmt = dialect.insert(table).values(**row)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c[f] for f in KEY_FIELDS],
+                set_={
+                    "events": table.c.events + stmt.excluded.events,
+                    "archived_events": table.c.archived_events + stmt.excluded.archived_events,
+                }
+            )
+
+        connection.execute(stmt)
+
+    return len(rows)
+
+
+def deltas_for_rows(rows, events=1, archived=None):
+    """
+    Row dicts / Row objects → deltas (same sign for every row).
+    archived=None → counted from each row's own is_archived.
+    """
+    deltas = defaultdict(lambda: [0, 0])
+
+    for row in rows:
+        get = row.get if isinstance(row, dict) else row._mapping.get
+        key = rollup_key(
+            get("created_at"), get("actor_type"), get("severity"),
+            get("action"), get("is_bulk")
+        )
+        deltas[key][0] += events
+
+        if archived is None:
+            deltas[key][1] += events if get("is_archived") else 0
+        else:
+            deltas[key][1] += archived
+
+    return deltas
+
+
+# --------------------------------------------------
+# STATE CHANGES ON THE HOT TABLE
+# --------------------------------------------------
+_KEY_COLUMNS = (
+    AdminActivityLog.id,
+    AdminActivityLog.created_at,
+    AdminActivityLog.actor_type,
+    AdminActivityLog.severity,
+    AdminActivityLog.action,
+    AdminActivityLog.is_bulk,
+    AdminActivityLog.is_archived,
+)
+
+
+def _locked_rows(criteria):
+    return db.session.execute(
+        select(*_KEY_COLUMNS).where(*criteria).with_for_update()
+    ).all()
+
+
+def set_archived(*criteria, archived=True):
+    """
+    Archive / restore matching logs + adjust rollups (caller commits).
+    Only `is_archived` changes → allowed by the immutability listener.
+    Returns rows changed.
+    """
+    rows = _locked_rows(
+        list(criteria) + [AdminActivityLog.is_archived.is_(not archived)]
+    )
+
+    if not rows:
+        return 0
+
+    db.session.execute(
+        update(AdminActivityLog)
+        .where(
+            AdminActivityLog.id.in_([r.id for r in rows]),
+            AdminActivityLog.is_archived.is_(not archived)
+        )
+        .values(is_archived=archived)
+        .execution_options(synchronize_session=False)
+    )
+
+    apply_deltas(
+        db.session.connection(),
+        deltas_for_rows(rows, events=0, archived=1 if archived else -1)
+    )
+
+    return len(rows)
+
+
+def delete_logs(*criteria):
+    """
+    Hard delete of ARCHIVED logs + rollup decrement (caller commits).
+    """
+    rows = _locked_rows(
+        list(criteria) + [AdminActivityLog.is_archived.is_(True)]
+    )
+
+    if not rows:
+        return 0
+
+    db.session.execute(
+        delete(AdminActivityLog)
+        .where(
+            AdminActivityLog.id.in_([r.id for r in rows]),
+            AdminActivityLog.is_archived.is_(True)
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+    apply_deltas(
+        db.session.connection(),
+        deltas_for_rows(rows, events=-1, archived=-1)
+    )
+
+    return len(rows)
+
+
+# --------------------------------------------------
+# BACKFILL (HOT TABLE + COLD SEGMENTS)
+# --------------------------------------------------
+def backfill(batch_size=5000):
+    """
+    Rebuilds audit_rollups from scratch. Returns events counted.
+    Run while audit writes are quiet (deploy / maintenance window):
+    events written during the scan are not part of the rebuild.
+    Pruned segments are gone → retention is reflected as is.
+    """
+    from app.services.audit_cold_storage import get_store, hot_duplicate_ids
+
+    deltas = defaultdict(lambda: [0, 0])
+    counted = 0
+    last_id = 0
+
+    # hot table in id batches (bounded memory)
+    while True:
+        rows = db.session.execute(
+            select(*_KEY_COLUMNS)
+            .where(AdminActivityLog.id > last_id)
+            .order_by(AdminActivityLog.id)
+            .limit(batch_size)
+        ).all()
+
+        if not rows:
+            break
+
+        for key, d in deltas_for_rows(rows).items():
+            deltas[key][0] += d[0]
+            deltas[key][1] += d[1]
+
+        counted += len(rows)
+        last_id = rows[-1].id
+
+    # cold storage (always archived; rows still in the hot table were
+    # counted above)
+    store = get_store()
+    for month in store.months():
+        rows = store.load(month)
+        hot = hot_duplicate_ids(row.id for row in rows)
+
+        for row in rows:
+            if row.id in hot:
+                continue
+
+            key = rollup_key(row.created_at, row.actor_type, row.severity, row.action, row.is_bulk)
+            deltas[key][0] += 1
+            deltas[key][1] += 1
+            counted += 1
+
+    db.session.execute(delete(AuditRollup))
+    apply_deltas(db.session.connection(), deltas)
+    db.session.commit()
+
+    return counted
+
+
+# --------------------------------------------------
+# READ HELPERS
+# --------------------------------------------------
+def rollup_query(is_super_admin=True):
+    """
+    AuditRollup query with the audit RBAC applied
+    (normal admins never see system / bulk events).
+    """
+    query = AuditRollup.query
+
+    if not is_super_admin:
+        query = query.filter(
+            AuditRollup.actor_type == "admin",
+            AuditRollup.is_bulk.is_(False)
+        )
+
+    return query
+
+
+def events_where(*conditions, column=None):
+    """
+    SUM(events) over the rows matching `conditions` → one column of a
+    single aggregate query (several counters per round trip).
+    """
+    column = AuditRollup.events if column is None else column
+
+    if conditions:
+        column = case((and_(*conditions), column), else_=0)
+
+    return func.coalesce(func.sum(column), 0)
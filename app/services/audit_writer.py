@@ -0,0 +1,348 @@
+"""
+Audit Log Writer (Batched, Async)
+=================================
+`log_admin_action` / `log_system_action` used to add + commit one
+AdminActivityLog per event on the caller's session, which also committed
+whatever else the caller had pending and made every admin click pay a
+synchronous INSERT.
+
+Now events are plain row dicts put on an in-memory queue:
+
+- a background thread flushes them as ONE multi-row
+  `INSERT ... VALUES (...), (...)` per batch, when AUDIT_LOG_BATCH_SIZE
+  rows are waiting or every AUDIT_LOG_FLUSH_SECONDS
+- writes use their own connection → the caller's session is untouched
+- the queue is drained on shutdown (atexit)
+- a failed batch never blocks the queue:
+  - DB unreachable / deadlock → the whole batch is retried next flush
+  - row-level error (DataError, IntegrityError, ...) → the batch is
+    split and written one row at a time; a row still failing after
+    AUDIT_LOG_MAX_ATTEMPTS goes to the dead-letter file
+    (AUDIT_DEAD_LETTER_PATH, one JSON row per line)
+- queue full → the row is written inline; if that fails too it is
+  dead-lettered (never lost silently)
+- audit_rollups counters are bumped in the same transaction
+
+Immutability: the writer only ever INSERTs. Updates / deletes of
+audit rows still go through the ORM, where the `before_update` /
+`before_delete` listeners on AdminActivityLog keep guarding them.
+
+AUDIT_LOG_ASYNC = False (or app.testing) writes each event immediately,
+still on its own connection.
+"""
+
+import atexit
+import json
+import os
+import queue
+import threading
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import insert
+from sqlalchemy.exc import (
+    SQLAlchemyError, StatementError, DBAPIError, DataError, IntegrityError
+)
+
+from app.extensions import db
+from app.models import AdminActivityLog
+from app.services.audit_rollup_service import apply_deltas, deltas_for_rows
+from app.utils.time_utils import utc_now
+
+
+# --------------------------------------------------
+# ROW BUILDER (same columns for every row → one VALUES list)
+# --------------------------------------------------
+def build_audit_row(
+    action,
+    *,
+    admin_id=None,
+    target_user_id=None,
+    actor_type="admin",
+    is_bulk=False,
+    severity="LOW",
+    reason=None,
+    ip_address=None,
+    user_agent=None
+):
+    return {
+        "log_ref": AdminActivityLog.new_log_ref(),
+        "admin_id": admin_id,
+        "target_user_id": target_user_id,
+        "action": action,
+        "actor_type": actor_type,
+        "is_bulk": bool(is_bulk),
+        "is_archived": False,
+        "severity": severity,
+        "reason": reason,
+        "ip_address": ip_address,
+        "user_agent": user_agent,
+        # event time, not flush time
+        "created_at": utc_now(),
+    }
+
+
+def is_row_error(error):
+    """
+    Fails again for the same row whatever the DB state (bad value,
+    constraint) — as opposed to a dead connection / lock timeout.
+    """
+    if isinstance(error, (DataError, IntegrityError)):
+        return True
+
+    # bind processing failed before reaching the DB
+    return isinstance(error, StatementError) and not isinstance(error, DBAPIError)
+
+
+class AuditLogWriter:
+    """
+    One per app (and per process — restarted after fork).
+    Pending rows travel as [row, attempts] entries.
+    """
+
+    def __init__(self, app, batch_size=200, flush_seconds=2.0,
+                 max_pending=10000, async_mode=True, max_attempts=3,
+                 dead_letter_path=None):
+        self.app = app
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.async_mode = async_mode
+        self.max_attempts = max_attempts
+        self.dead_letter_path = dead_letter_path
+
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._retry = []
+        self._dead_letter_lock = threading.Lock()
+
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._start_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+        self._thread = None
+        self._pid = None
+        self._atexit_registered = False
+
+        self.written = 0
+        self.failed_batches = 0
+        self.dead_lettered = 0
+
+    # --------------------------------------------------
+    # PRODUCER SIDE (REQUEST / JOB THREADS)
+    # --------------------------------------------------
+    def enqueue(self, row):
+        if not self.async_mode:
+            self.write_inline(row)
+            return
+
+        self._ensure_started()
+
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            self.write_inline(row)
+            return
+
+        if self._queue.qsize() >= self.batch_size:
+            self._wake.set()
+
+    def _ensure_started(self):
+        pid = os.getpid()
+
+        if self._thread is not None and self._thread.is_alive() and self._pid == pid:
+            return
+
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == pid:
+                return
+
+            self._pid = pid
+            self._stopping.clear()
+            self._thread = threading.Thread(
+                target=self._run,
+                name="audit-log-writer",
+                daemon=True
+            )
+            self._thread.start()
+
+            if not self._atexit_registered:
+                atexit.register(self.stop)
+                self._atexit_registered = True
+
+    # --------------------------------------------------
+    # CONSUMER SIDE (BACKGROUND THREAD)
+    # --------------------------------------------------
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            self.flush()
+
+        self.flush()
+
+    def _take_batch(self):
+        if self._retry:
+            entries, self._retry = self._retry, []
+            return entries
+
+        entries = []
+        while len(entries) < self.batch_size:
+            try:
+                entries.append([self._queue.get_nowait(), 0])
+            except queue.Empty:
+                break
+
+        return entries
+
+    def flush(self):
+        """
+        Writes everything queued so far. Returns rows written.
+        """
+        written = 0
+
+        with self._flush_lock:
+            while True:
+                entries = self._take_batch()
+                if not entries:
+                    return written
+
+                done, retry = self._write_entries(entries)
+                written += done
+
+                if retry:
+                    # keep for the next tick, don't spin on a failing DB
+                    self._retry = retry
+                    return written
+
+    def _write_entries(self, entries):
+        """
+        → (rows written, entries to retry next tick)
+        """
+        error = self.write_batch([row for row, _ in entries])
+        if error is None:
+            return len(entries), []
+
+        if not is_row_error(error):
+            return 0, entries
+
+        # one bad row must not hold back the others → row by row
+        written = 0
+        retry = []
+
+        for row, attempts in entries:
+            error = self.write_batch([row])
+            if error is None:
+                written += 1
+                continue
+
+            attempts += 1
+            if is_row_error(error) and attempts >= self.max_attempts:
+                self.dead_letter(row, error)
+            else:
+                retry.append([row, attempts])
+
+        return written, retry
+
+    def write_batch(self, rows):
+        """
+        One multi-row INSERT (+ rollup upserts) on its own connection.
+        Returns None, or the error of the failed (rolled back) attempt.
+        """
+        try:
+            with self.app.app_context():
+                with db.engine.begin() as conn:
+                    conn.execute(insert(AdminActivityLog.__table__).values(rows))
+                    apply_deltas(conn, deltas_for_rows(rows))
+
+            self.written += len(rows)
+            return None
+
+        except SQLAlchemyError as e:
+            self.failed_batches += 1
+            print(f"⚠️ Audit log write failed ({len(rows)} rows):", str(e).splitlines()[0])
+            return e
+
+    def write_inline(self, row):
+        """
+        Sync mode / queue full: no later tick to retry on.
+        """
+        error = self.write_batch([row])
+        if error is not None:
+            self.dead_letter(row, error)
+
+    # --------------------------------------------------
+    # DEAD LETTERS (APPEND-ONLY JSON LINES)
+    # --------------------------------------------------
+    def dead_letter(self, row, error):
+        self.dead_lettered += 1
+
+        record = {
+            "row": {
+                key: value.isoformat() if isinstance(value, datetime) else value
+                for key, value in row.items()
+            },
+            "error": str(error).splitlines()[0][:500],
+            "failed_at": datetime.utcnow().isoformat(),
+        }
+
+        try:
+            with self._dead_letter_lock:
+                os.makedirs(os.path.dirname(self.dead_letter_path), exist_ok=True)
+                with open(self.dead_letter_path, "a") as f:
+                    f.write(json.dumps(record, default=str) + "\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+
+            print("☠️ Audit log row dead-lettered:", row.get("log_ref"), record["error"])
+
+        except (OSError, TypeError) as e:
+            # last resort: the row itself goes to the process log
+            print("☠️ Audit log row LOST (dead-letter write failed):", e, record)
+
+    def stop(self, timeout=10):
+        """
+        Drain on shutdown; whatever still cannot be written is
+        dead-lettered instead of dying with the process.
+        """
+        self._stopping.set()
+        self._wake.set()
+
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout)
+
+        self.flush()
+
+        with self._flush_lock:
+            retry, self._retry = self._retry, []
+            for row, _ in retry:
+                self.dead_letter(row, "not written before shutdown")
+
+    def pending(self):
+        return self._queue.qsize() + len(self._retry)
+
+
+# --------------------------------------------------
+# PER-APP WRITER
+# --------------------------------------------------
+def get_audit_writer():
+    writer = current_app.extensions.get("audit_writer")
+
+    if writer is None:
+        config = current_app.config
+
+        writer = AuditLogWriter(
+            current_app._get_current_object(),
+            batch_size=config.get("AUDIT_LOG_BATCH_SIZE", 200),
+            flush_seconds=config.get("AUDIT_LOG_FLUSH_SECONDS", 2.0),
+            max_pending=config.get("AUDIT_LOG_MAX_PENDING", 10000),
+            async_mode=config.get("AUDIT_LOG_ASYNC", True) and not current_app.testing,
+            max_attempts=config.get("AUDIT_LOG_MAX_ATTEMPTS", 3),
+            dead_letter_path=config["AUDIT_DEAD_LETTER_PATH"]
+        )
+        current_app.extensions["audit_writer"] = writer
+
+    return writer
+
+
+def enqueue_audit_log(action, **fields):
+    get_audit_writer().enqueue(build_audit_row(action, **fields))
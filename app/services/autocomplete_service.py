@@ -0,0 +1,271 @@
+"""
+Live Search Autocomplete Cache
+==============================
+Edge n-gram map over ACTIVE product names for /api/search.
+
+- Suggestions are answered from memory (no DB, no url_for)
+- Admin product create / update / toggle refresh it incrementally
+- Cold index → DB fallback + background warm-up
+- Periodic full rebuild keeps other workers eventually consistent
+"""
+
+import threading
+import time
+
+from flask import current_app
+
+from app.extensions import db
+from app.models import Product
+from app.services.search_index import tokenize
+
+
+MIN_GRAM = 2
+MAX_GRAM = 15
+
+
+# --------------------------------------------------
+# EDGE N-GRAM INDEX
+# --------------------------------------------------
+class AutocompleteIndex:
+    """
+    "galaxy s24" → ga, gal, gala, ... s2, s24
+    Each gram points at the set of product ids containing it.
+    """
+
+    def __init__(self, rebuild_seconds=300):
+        self.rebuild_seconds = rebuild_seconds
+
+        self._grams = {}
+        self._entries = {}
+        self._lock = threading.RLock()
+
+        self._loaded_at = None
+
+        # held for the whole warm-up (released by whichever thread ran it)
+        self._warm_lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    # ---------------- STATE ----------------
+    @property
+    def is_warm(self):
+        return self._loaded_at is not None
+
+    @property
+    def is_stale(self):
+        if not self.is_warm:
+            return True
+        return time.monotonic() - self._loaded_at > self.rebuild_seconds
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "warm": self.is_warm,
+            "products": len(self._entries),
+            "grams": len(self._grams),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+    # ---------------- WRITE PATH ----------------
+    @staticmethod
+    def _edge_grams(name):
+        grams = set()
+        for token in tokenize(name):
+            for size in range(MIN_GRAM, min(len(token), MAX_GRAM) + 1):
+                grams.add(token[:size])
+        return grams
+
+    @staticmethod
+    def build_entry(product, static_url):
+        image = None
+        if product.image_list:
+            image = f"{static_url}/{product.image_list[0]}"
+
+        return {
+            "id": product.id,
+            "name": product.name,
+            "price": float(product.price),
+            "image": image,
+            "_created": product.created_at.timestamp() if product.created_at else 0,
+            "_name": (product.name or "").lower(),
+            "_grams": AutocompleteIndex._edge_grams(product.name),
+        }
+
+    def load(self, entries):
+        grams = {}
+        by_id = {}
+
+        for entry in entries:
+            by_id[entry["id"]] = entry
+            for gram in entry["_grams"]:
+                grams.setdefault(gram, set()).add(entry["id"])
+
+        with self._lock:
+            self._grams = grams
+            self._entries = by_id
+            self._loaded_at = time.monotonic()
+
+    def upsert(self, entry):
+        with self._lock:
+            self._discard(entry["id"])
+            self._entries[entry["id"]] = entry
+            for gram in entry["_grams"]:
+                self._grams.setdefault(gram, set()).add(entry["id"])
+
+    def remove(self, product_id):
+        with self._lock:
+            self._discard(product_id)
+
+    def _discard(self, product_id):
+        entry = self._entries.pop(product_id, None)
+        if not entry:
+            return
+
+        for gram in entry["_grams"]:
+            ids = self._grams.get(gram)
+            if ids is None:
+                continue
+            ids.discard(product_id)
+            if not ids:
+                del self._grams[gram]
+
+    # ---------------- READ PATH ----------------
+    def suggest(self, q, limit=6):
+        """
+        Returns suggestion dicts, or None when the index is cold.
+        """
+        if not self.is_warm:
+            self.misses += 1
+            return None
+
+        tokens = [t[:MAX_GRAM] for t in tokenize(q)]
+
+        with self._lock:
+            self.hits += 1
+
+            if not tokens or any(len(t) < MIN_GRAM for t in tokens):
+                return []
+
+            postings = [self._grams.get(t) for t in tokens]
+            if not all(postings):
+                return []
+
+            postings.sort(key=len)
+            ids = set(postings[0]).intersection(*postings[1:])
+
+            entries = [self._entries[pid] for pid in ids]
+
+        phrase = q.strip().lower()
+
+        # name starts with query first, then newest (same as legacy ordering)
+        entries.sort(
+            key=lambda e: (e["_name"].startswith(phrase), e["_created"], e["id"]),
+            reverse=True
+        )
+
+        return [
+            {k: v for k, v in e.items() if not k.startswith("_")}
+            for e in entries[:limit]
+        ]
+
+
+# --------------------------------------------------
+# LOADING / WARM-UP
+# --------------------------------------------------
+def _load_active_products(index):
+    static_url = current_app.static_url_path
+
+    products = (
+        Product.query
+        .filter(Product.status == "ACTIVE")
+        .yield_per(1000)
+    )
+
+    index.load(
+        AutocompleteIndex.build_entry(p, static_url)
+        for p in products
+    )
+
+
+def _warm_in_background(app, index):
+    def run():
+        try:
+            with app.app_context():
+                _load_active_products(index)
+                db.session.remove()
+        except Exception as e:
+            print("⚠️ Autocomplete warm-up failed:", e)
+        finally:
+            index._warm_lock.release()
+
+    try:
+        threading.Thread(target=run, daemon=True).start()
+    except Exception:
+        index._warm_lock.release()
+        raise
+
+
+def get_autocomplete_index():
+    index = current_app.extensions.get("autocomplete")
+
+    if index is None:
+        index = AutocompleteIndex(
+            rebuild_seconds=current_app.config.get("AUTOCOMPLETE_REBUILD_SECONDS", 300)
+        )
+        current_app.extensions["autocomplete"] = index
+
+    return index
+
+
+def warm(background=True):
+    index = get_autocomplete_index()
+
+    # one warm-up at a time; everybody else keeps the current answers
+    if not index._warm_lock.acquire(blocking=False):
+        return index
+
+    if background:
+        _warm_in_background(current_app._get_current_object(), index)
+    else:
+        try:
+            _load_active_products(index)
+        finally:
+            index._warm_lock.release()
+
+    return index
+
+
+# --------------------------------------------------
+# PUBLIC API
+# --------------------------------------------------
+def suggest(q, limit=6):
+    """
+    Suggestions from memory, or None if the caller must hit the DB.
+    """
+    index = get_autocomplete_index()
+
+    if index.is_stale:
+        warm()
+
+    return index.suggest(q, limit=limit)
+
+
+def refresh_product(product):
+    index = get_autocomplete_index()
+
+    if not index.is_warm:
+        return  # picked up by the first full load
+
+    if product.status == "ACTIVE":
+        index.upsert(
+            AutocompleteIndex.build_entry(product, current_app.static_url_path)
+        )
+    else:
+        index.remove(product.id)
+
+
+def stats():
+    return get_autocomplete_index().stats()
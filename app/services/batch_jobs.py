@@ -0,0 +1,186 @@
+"""
+Chunked Maintenance Jobs
+========================
+Set-based UPDATE / DELETE over bounded primary-key ranges, for nightly
+jobs on large append-only tables (audit logs):
+
+- each batch is ONE statement on `id > lo AND id <= lo + batch_size`
+  (plus the job's own filter) → short locks, constant memory, no ORM
+  objects loaded
+- sleeps `sleep_seconds` between batches so OLTP traffic gets the locks
+- a new run starts at the first id the job's own filter (`where`)
+  matches, not at MIN(id) → rows handled by earlier runs are not walked
+  again
+- walks ids upward and stops at the first row newer than the cutoff
+  (ids are issued in created_at order); gaps are skipped by seeking
+  to the next existing id
+- progress is committed in the same transaction as the batch to a
+  `job_checkpoints` row → an interrupted run resumes where it stopped,
+  with the cutoff it started with
+"""
+
+import time
+from datetime import datetime
+
+from sqlalchemy import select
+
+from app.extensions import db
+from app.models import JobCheckpoint
+
+
+def _naive(dt):
+    return dt.replace(tzinfo=None) if dt is not None and dt.tzinfo else dt
+
+
+def _now():
+    return datetime.utcnow()
+
+
+def get_checkpoint(name):
+    checkpoint = JobCheckpoint.query.filter_by(name=name).first()
+
+    if checkpoint is None:
+        checkpoint = JobCheckpoint(name=name, last_id=0, processed=0, batches=0)
+        db.session.add(checkpoint)
+        db.session.flush()
+
+    return checkpoint
+
+
+def _first_id(model, cutoff, where):
+    """
+    Lowest id older than the cutoff that matches `where`, or None.
+    Bounded by the first newer id → never walks past the old rows.
+    """
+    id_col = model.id
+
+    newest = db.session.execute(
+        select(id_col)
+        .where(model.created_at >= cutoff)
+        .order_by(id_col)
+        .limit(1)
+    ).scalar()
+
+    query = (
+        select(id_col)
+        .where(model.created_at < cutoff, *where)
+        .order_by(id_col)
+        .limit(1)
+    )
+    if newest is not None:
+        query = query.where(id_col < newest)
+
+    return db.session.execute(query).scalar()
+
+
+def run_id_range_job(
+    name,
+    model,
+    cutoff,
+    apply_range,
+    *,
+    where=(),
+    batch_size=5000,
+    sleep_seconds=0.1,
+    restart=False,
+    max_batches=None
+):
+    """
+    apply_range(lo, hi, cutoff) → executes one set-based statement for
+    ids in (lo, hi] and returns the affected row count.
+    where → the job's filter besides id / cutoff (same as apply_range's),
+    used to find where a new run starts.
+
+    Returns a metrics dict:
+    {"processed", "batches", "last_id", "seconds", "resumed", "finished"}
+    """
+    id_col = model.id
+    created_col = model.created_at
+
+    checkpoint = get_checkpoint(name)
+    resumed = (
+        not restart
+        and checkpoint.started_at is not None
+        and checkpoint.finished_at is None
+    )
+
+    # new run with nothing to do → finishes without a batch
+    idle = False
+
+    if resumed:
+        cutoff = checkpoint.cutoff
+        lo = checkpoint.last_id
+    else:
+        cutoff = _naive(cutoff)
+        first_id = _first_id(model, cutoff, where)
+        idle = first_id is None
+        lo = (first_id - 1) if first_id else 0
+
+        checkpoint.cutoff = cutoff
+        checkpoint.last_id = lo
+        checkpoint.processed = 0
+        checkpoint.batches = 0
+        checkpoint.started_at = _now()
+        checkpoint.finished_at = None
+
+    db.session.commit()
+
+    started = time.perf_counter()
+    run_batches = run_processed = 0
+    finished = False
+
+    while not idle:
+        # nothing left older than the cutoff → done
+        next_row = db.session.execute(
+            select(id_col, created_col)
+            .where(id_col > lo)
+            .order_by(id_col)
+            .limit(1)
+        ).first()
+
+        if next_row is None or _naive(next_row.created_at) >= cutoff:
+            finished = True
+            break
+
+        if max_batches is not None and run_batches >= max_batches:
+            break
+
+        if run_batches:
+            time.sleep(sleep_seconds)
+
+        # skip id gaps (deleted ranges)
+        lo = max(lo, next_row.id - 1)
+        hi = lo + batch_size
+
+        affected = apply_range(lo, hi, cutoff) or 0
+
+        checkpoint.last_id = hi
+        checkpoint.processed += affected
+        checkpoint.batches += 1
+        checkpoint.updated_at = _now()
+        db.session.commit()
+
+        run_batches += 1
+        run_processed += affected
+        lo = hi
+
+        elapsed = time.perf_counter() - started
+        print(
+            f"🧹 {name}: batch {checkpoint.batches} | ids ≤ {hi} | "
+            f"{affected} rows (total {checkpoint.processed}) | "
+            f"{run_processed / elapsed if elapsed else 0:.0f} rows/s"
+        )
+
+    if finished or idle:
+        finished = True
+        checkpoint.finished_at = _now()
+        db.session.commit()
+
+    return {
+        "processed": checkpoint.processed,
+        "batches": checkpoint.batches,
+        "last_id": checkpoint.last_id,
+        "seconds": round(time.perf_counter() - started, 2),
+        "resumed": resumed,
+        "finished": finished,
+    }
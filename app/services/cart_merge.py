@@ -0,0 +1,186 @@
+"""
+Cart Merge (Guest Cart → User Cart, Bulk)
+=========================================
+Login used to merge the session cart one product at a time
+(Product.query.get + CartItem lookup per line → 60+ queries for a
+30-item guest cart) and inserted rows without `price_at_add`.
+
+`merge_cart(user_id, entries)` costs a fixed number of statements:
+
+1. products: ONE `IN` query, rows locked FOR UPDATE in id order (the
+   same lock reserve() takes → holds stay consistent); sharded products
+   also take reserve()'s home-shard lock (stock_shards.reserve_room)
+2. existing cart rows: ONE `IN` query
+3. available stock for all lines (other users' holds, one GROUP BY)
+4. ONE multi-row upsert into cart_items (+ one into stock_reservations,
+   so merged lines are held like any other cart line)
+
+Quantities are clamped to the available stock and MAX_QTY_PER_ITEM;
+merged lines snapshot the current price (what the guest just saw).
+mode="replace" (login: the guest quantity wins) or "add" (an import
+adds to what is already in the cart).
+
+Returns a report dict; the caller commits.
+"""
+
+from sqlalchemy import select
+from sqlalchemy.dialects import mysql, sqlite, postgresql
+
+from app.extensions import db
+from app.models import CartItem, Product, StockReservation
+from app.services.cart_service import MAX_QTY_PER_ITEM
+from app.services.stock_shards import reserve_room
+from app.services.stock_reservations import available_quantities, reservation_ttl
+from app.utils.time_utils import utc_now
+
+
+MERGE_MODES = ("replace", "add")
+
+
+def _normalise(entries):
+    """
+    {product_id: qty} / [(product_id, qty), ...] (session cart keys are
+    strings) → {int product_id: int qty}, invalid lines dropped,
+    duplicates summed. → (wanted, skipped ids)
+    """
+    if hasattr(entries, "items"):
+        entries = entries.items()
+
+    wanted = {}
+    skipped = []
+
+    for product_id, qty in entries:
+        try:
+            product_id, qty = int(product_id), int(qty)
+        except (TypeError, ValueError):
+            skipped.append(product_id)
+            continue
+
+        if qty < 1:
+            skipped.append(product_id)
+            continue
+
+        wanted[product_id] = wanted.get(product_id, 0) + qty
+
+    return wanted, skipped
+
+
+def _upsert(table, rows, index_elements, update_columns):
+    """
+    ONE multi-row INSERT ... ON DUPLICATE KEY / ON CONFLICT UPDATE.
+    """
+    name = db.session.get_bind().dialect.name
+
+    if name == "mysql":
+        stmt = mysql.insert(table).values(rows)
+        stmt = stmt.on_duplicate_key_update(
+            {column: stmt.inserted[column] for column in update_columns}
+        )
+    else:
+        dialect = postgresql if name == "postgresql" else sqlite
+        stmt = dialect.insert(table).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c[column] for column in index_elements],
+            set_={column: stmt.excluded[column] for column in update_columns}
+        )
+
+    db.session.execute(stmt)
+
+
+# --------------------------------------------------
+# MERGE
+# --------------------------------------------------
+def merge_cart(user_id, entries, mode="replace"):
+    """
+    → {"added": n, "updated": n, "adjusted": [product ids clamped],
+       "skipped": [product ids unavailable / invalid]}
+    """
+    if mode not in MERGE_MODES:
+        raise ValueError(f"Unknown merge mode: {mode}")
+
+    wanted, skipped = _normalise(entries)
+    report = {"added": 0, "updated": 0, "adjusted": [], "skipped": skipped}
+
+    if not wanted:
+        return report
+
+    # 1️⃣ PRODUCTS (locked, id order)
+    products = db.session.execute(
+        select(Product)
+        .where(Product.id.in_(wanted))
+        .order_by(Product.id)
+        .with_for_update()
+    ).scalars().all()
+
+    # 2️⃣ EXISTING CART ROWS
+    existing = dict(db.session.execute(
+        select(CartItem.product_id, CartItem.quantity)
+        .where(CartItem.user_id == user_id, CartItem.product_id.in_(wanted))
+    ).all())
+
+    # 3️⃣ AVAILABLE STOCK
+    available = available_quantities(products, user_id)
+
+    found = {p.id for p in products}
+    report["skipped"] += [product_id for product_id in wanted if product_id not in found]
+
+    now = utc_now()
+    expires_at = now.replace(tzinfo=None) + reservation_ttl()
+    cart_rows = []
+    hold_rows = []
+
+    for product in products:
+        if not product.is_active_product or available[product.id] <= 0:
+            report["skipped"].append(product.id)
+            continue
+
+        qty = wanted[product.id]
+        if mode == "add":
+            qty += existing.get(product.id, 0)
+
+        limit = min(available[product.id], MAX_QTY_PER_ITEM)
+        if product.stock_sharded:
+            # the hold must fit the user's shard partition
+            limit = min(limit, reserve_room(product.id, user_id, min(qty, limit)))
+            if limit <= 0:
+                report["skipped"].append(product.id)
+                continue
+
+        if qty > limit:
+            qty = limit
+            report["adjusted"].append(product.id)
+
+        report["updated" if product.id in existing else "added"] += 1
+
+        cart_rows.append({
+            "user_id": user_id,
+            "product_id": product.id,
+            "quantity": qty,
+            "price_at_add": product.price,
+            "created_at": now
+        })
+        hold_rows.append({
+            "user_id": user_id,
+            "product_id": product.id,
+            "quantity": qty,
+            "expires_at": expires_at,
+            "created_at": now,
+            "updated_at": now
+        })
+
+    if not cart_rows:
+        return report
+
+    # 4️⃣ BULK UPSERT (cart lines + their stock holds)
+    _upsert(
+        CartItem.__table__, cart_rows,
+        index_elements=("user_id", "product_id"),
+        update_columns=("quantity", "price_at_add")
+    )
+    _upsert(
+        StockReservation.__table__, hold_rows,
+        index_elements=("user_id", "product_id"),
+        update_columns=("quantity", "expires_at", "updated_at")
+    )
+
+    return report
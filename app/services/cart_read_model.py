@@ -0,0 +1,189 @@
+"""
+Cart Read Model (GET /api/cart)
+===============================
+The cart page used to load CartItems, then lazy-load every product
+(N+1), delete / adjust stale rows one ORM object at a time during a GET
+and build each image URL with its own url_for() call.
+
+`load_cart(user_id)` now costs a fixed number of queries, whatever the
+cart size:
+
+1. ONE joined SELECT: cart line columns + the product columns the page
+   needs (name, images, status, stock) — no ORM entities, no lazy loads
+2. available stock for all lines at once (other users' holds, one
+   GROUP BY; sharded hot SKUs add one more)
+3. corrections in bulk, only when something changed:
+   - inactive / sold-out lines → ONE DELETE (+ their holds released)
+   - lines above the available stock → ONE UPDATE ... CASE (+ holds
+     trimmed the same way)
+4. pricing in one Decimal pass (PriceService.line_totals / summary)
+"""
+
+import json
+
+from flask import url_for
+from sqlalchemy import select, update, delete, case
+
+from app.extensions import db
+from app.models import CartItem, Product, StockReservation
+from app.services.price_service import PriceService
+from app.services.stock_reservations import held_quantities, release
+from app.services.stock_shards import shard_totals
+
+
+PLACEHOLDER_IMAGE = "img/placeholders/product.png"
+
+
+def _first_image(images):
+    # JSON column may come back as a string (see Product.image_list)
+    if isinstance(images, str):
+        try:
+            images = json.loads(images)
+        except ValueError:
+            return None
+
+    return images[0] if images else None
+
+
+# --------------------------------------------------
+# 1️⃣ ONE JOINED QUERY
+# --------------------------------------------------
+def _cart_rows(user_id):
+    return db.session.execute(
+        select(
+            CartItem.id,
+            CartItem.product_id,
+            CartItem.quantity,
+            CartItem.price_at_add,
+            Product.name,
+            Product.images,
+            Product.status,
+            Product.stock,
+            Product.stock_sharded
+        )
+        .join(Product, Product.id == CartItem.product_id)
+        .where(CartItem.user_id == user_id)
+        .order_by(CartItem.id)
+    ).all()
+
+
+# --------------------------------------------------
+# 2️⃣ AVAILABLE STOCK (ALL LINES AT ONCE)
+# --------------------------------------------------
+def _available(rows, user_id):
+    product_ids = [row.product_id for row in rows]
+
+    held = held_quantities(product_ids, exclude_user_id=user_id)
+    sharded = shard_totals(row.product_id for row in rows if row.stock_sharded)
+
+    return {
+        row.product_id: max(
+            0,
+            (sharded.get(row.product_id, 0) if row.stock_sharded else (row.stock or 0))
+            - held.get(row.product_id, 0)
+        )
+        for row in rows
+    }
+
+
+# --------------------------------------------------
+# 3️⃣ BULK CORRECTIONS (COMMITS)
+# --------------------------------------------------
+def _apply_corrections(user_id, removed, clamped):
+    """
+    removed: {cart_id: product_id}, clamped: {cart_id: (product_id, qty)}
+    """
+    if removed:
+        db.session.execute(
+            delete(CartItem)
+            .where(CartItem.user_id == user_id, CartItem.id.in_(removed))
+            .execution_options(synchronize_session=False)
+        )
+        release(user_id, removed.values())
+
+    if clamped:
+        db.session.execute(
+            update(CartItem)
+            .where(CartItem.user_id == user_id, CartItem.id.in_(clamped))
+            .values(quantity=case(
+                {cart_id: qty for cart_id, (_, qty) in clamped.items()},
+                value=CartItem.id
+            ))
+            .execution_options(synchronize_session=False)
+        )
+
+        limits = {product_id: qty for product_id, qty in clamped.values()}
+        db.session.execute(
+            update(StockReservation)
+            .where(
+                StockReservation.user_id == user_id,
+                StockReservation.product_id.in_(limits)
+            )
+            .values(quantity=case(
+                limits,
+                value=StockReservation.product_id
+            ))
+            .execution_options(synchronize_session=False)
+        )
+
+    db.session.commit()
+
+
+# --------------------------------------------------
+# LOAD CART
+# --------------------------------------------------
+def load_cart(user_id):
+    """
+    → (lines, pricing, adjusted). Stale lines are fixed in the DB first;
+    `adjusted` is True if anything was removed or reduced.
+    """
+    rows = _cart_rows(user_id)
+    available = _available(rows, user_id) if rows else {}
+
+    removed = {}
+    clamped = {}
+    kept = []
+
+    for row in rows:
+        units = available[row.product_id]
+
+        if row.status != "ACTIVE" or units <= 0:
+            removed[row.id] = row.product_id
+            continue
+
+        quantity = row.quantity
+        if quantity > units:
+            quantity = units
+            clamped[row.id] = (row.product_id, quantity)
+
+        kept.append((row, quantity))
+
+    if removed or clamped:
+        _apply_corrections(user_id, removed, clamped)
+
+    # 4️⃣ PRICING (ONE DECIMAL PASS)
+    totals, subtotal = PriceService.line_totals(
+        (row.price_at_add for row, _ in kept),
+        (quantity for _, quantity in kept)
+    )
+
+    # one url_for() per request, not per line
+    static_root = url_for("static", filename="")
+    placeholder = static_root + PLACEHOLDER_IMAGE
+
+    lines = []
+    for (row, quantity), line_total in zip(kept, totals):
+        image = _first_image(row.images)
+
+        lines.append({
+            "id": row.id,
+            "product_id": row.product_id,
+            "name": row.name,
+            "price": float(row.price_at_add),
+            "quantity": quantity,
+            "stock": available[row.product_id],
+            "image": static_root + image if image else placeholder,
+            "subtotal": float(line_total)
+        })
+
+    return lines, PriceService.summary(subtotal), bool(removed or clamped)
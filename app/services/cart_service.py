@@ -1,6 +1,12 @@
 from sqlalchemy.exc import IntegrityError
 from app.extensions import db
 from app.models import CartItem, Product, SavedForLater
+from app.services.stock_reservations import available_quantity, reserve, release
+
+
+# max units of one product per cart line
+MAX_QTY_PER_ITEM = 10
+
 
 class CartValidationError(ValueError):
     """Raised when cart validation fails"""
@@ -17,9 +23,10 @@ class CartService:
     # PHASE 5 — CART VALIDATION ENGINE
     # --------------------------------------------------
     @staticmethod
-    def validate_product(product, quantity, price_snapshot=None):
+    def validate_product(product, quantity, price_snapshot=None, user_id=None):
         """
         Central validation for cart operations
+        (stock = available: other users' holds excluded)
         """
 
         # PRODUCT ACTIVE CHECK
@@ -27,15 +34,16 @@ class CartService:
             raise CartValidationError("Product is not available")
 
         # MAX QUANTITY RULE
-        MAX_QTY = 10
-        if quantity > MAX_QTY:
-            raise CartValidationError(f"Maximum {MAX_QTY} items allowed")
+        if quantity > MAX_QTY_PER_ITEM:
+            raise CartValidationError(f"Maximum {MAX_QTY_PER_ITEM} items allowed")
 
         # STOCK AVAILABILITY
-        if product.stock <= 0:
+        available = available_quantity(product, user_id)
+
+        if available <= 0:
             raise CartValidationError("Product is out of stock")
 
-        if quantity > product.stock:
+        if quantity > available:
             raise CartValidationError("Requested quantity exceeds stock")
 
         # PRICE MISMATCH CHECK
@@ -46,6 +54,18 @@ class CartService:
                 )
 
 
+    # --------------------------------------------------
+    # STOCK HOLD (TIME-LIMITED RESERVATION)
+    # --------------------------------------------------
+    @staticmethod
+    def hold(user_id: int, product, quantity: int):
+        """
+        Holds the cart quantity for the user (caller commits).
+        """
+        if not reserve(user_id, product, quantity):
+            db.session.rollback()
+            raise CartValidationError("Requested quantity exceeds stock")
+
     # --------------------------------------------------
     # ADD TO CART
     # --------------------------------------------------
@@ -63,7 +83,7 @@ class CartService:
         if not product:
             raise CartValidationError("Product not found")
 
-        CartService.validate_product(product, quantity)
+        CartService.validate_product(product, quantity, user_id=user_id)
 
         cart_item = CartItem.query.filter_by(
             user_id=user_id,
@@ -76,7 +96,7 @@ class CartService:
         if cart_item:
             new_qty = cart_item.quantity + quantity
 
-            CartService.validate_product(product, new_qty)
+            CartService.validate_product(product, new_qty, user_id=user_id)
 
             cart_item.quantity = new_qty
 
@@ -90,6 +110,8 @@ class CartService:
 
             db.session.add(cart_item)
 
+        CartService.hold(user_id, product, cart_item.quantity)
+
         db.session.commit()
 
         return cart_item
@@ -108,6 +130,7 @@ class CartService:
             return False
 
         db.session.delete(cart_item)
+        release(user_id, [product_id])
         db.session.commit()
 
         return True
@@ -134,10 +157,12 @@ class CartService:
         CartService.validate_product(
             product,
             quantity,
-            cart_item.price_at_add
+            cart_item.price_at_add,
+            user_id=user_id
         )
 
         cart_item.quantity = quantity
+        CartService.hold(user_id, product, quantity)
 
         db.session.commit()
 
@@ -157,6 +182,7 @@ class CartService:
     def clear_cart(user_id: int):
 
         CartItem.query.filter_by(user_id=user_id).delete()
+        release(user_id)
 
         db.session.commit()
 
@@ -183,6 +209,7 @@ class CartService:
 
         db.session.add(saved)
         db.session.delete(cart_item)
+        release(user_id, [cart_item.product_id])
 
         db.session.commit()
 
@@ -205,7 +232,7 @@ class CartService:
 
         product = saved_item.product
 
-        CartService.validate_product(product, 1)
+        CartService.validate_product(product, 1, user_id=user_id)
 
         existing = CartItem.query.filter_by(
             user_id=user_id,
@@ -223,9 +250,10 @@ class CartService:
             )
             db.session.add(existing)
 
-        db.session.add(cart_item)
+        CartService.hold(user_id, product, existing.quantity)
+
         db.session.delete(saved_item)
 
         db.session.commit()
 
-        return cart_item
\ No newline at end of file
+        return existing
\ No newline at end of file
@@ -0,0 +1,284 @@
+"""
+Checkout (Cart → Order, One Transaction)
+========================================
+`place_order()` turns the user's cart into an Order in ONE transaction:
+
+1. cart rows are read FOR UPDATE (a second checkout of the same cart
+   waits, then finds it empty)
+2. prices / totals are computed BEFORE any stock row is touched → the
+   hot product rows stay locked only for the short tail below
+3. stock is decremented with conditional
+   `UPDATE products SET stock = stock - :qty WHERE id = :id AND stock >= :qty`
+   in product-id order → every checkout locks rows in the same order
+   (no deadlocks), and a row that would go negative updates 0 rows →
+   whole checkout rolls back (no overselling, no SELECT-then-UPDATE race).
+   Units held by OTHER users' active stock reservations are subtracted
+   in the same WHERE. Sharded hot SKUs decrement one random shard row
+   instead (see stock_shards).
+4. order → order items (one multi-row INSERT) → first timeline row →
+   cart rows + the buyer's reservations deleted → COMMIT
+
+Idempotency: an optional client key (Idempotency-Key header) is stored
+on the order (unique per user). A retried request returns the order the
+first one created instead of ordering twice — also when both requests
+race (the loser hits the unique constraint and rolls back).
+"""
+
+import secrets
+from decimal import Decimal
+
+from sqlalchemy import select, update, insert, delete
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db
+from app.models import (
+    CartItem, Product, Order, OrderItem, OrderTimeline, UserAddress,
+    OrderStatus, PaymentStatus
+)
+from app.services.price_service import PriceService
+from app.services import product_cache
+from app.services import stock_shards
+from app.services.stock_reservations import others_held_subquery, release
+from app.utils.time_utils import utc_now
+
+
+MAX_IDEMPOTENCY_KEY_LENGTH = 64
+
+
+class CheckoutError(ValueError):
+    """
+    Checkout refused — nothing was written.
+    """
+
+    def __init__(self, message, status=400, product_ids=None):
+        super().__init__(message)
+        self.status = status
+        self.product_ids = product_ids or []
+
+
+def generate_order_number(now=None):
+    now = now or utc_now()
+    return f"ZN{now:%Y%m%d}{secrets.token_hex(5).upper()}"
+
+
+def _existing_order(user_id, idempotency_key):
+    if not idempotency_key:
+        return None
+
+    return Order.query.filter_by(
+        user_id=user_id,
+        idempotency_key=idempotency_key
+    ).first()
+
+
+def _delivery_address(user_id, address_id):
+    query = UserAddress.query.filter_by(user_id=user_id)
+
+    if address_id:
+        address = query.filter_by(id=address_id).first()
+        if not address:
+            raise CheckoutError("Delivery address not found", status=404)
+        return address
+
+    address = query.order_by(
+        UserAddress.is_default.desc(),
+        UserAddress.id
+    ).first()
+
+    if not address:
+        raise CheckoutError("Please add a delivery address")
+
+    return address
+
+
+def _address_snapshot(address):
+    parts = [
+        address.house_no,
+        address.area,
+        address.landmark,
+        address.city,
+        f"{address.state} - {address.pincode}"
+    ]
+    return ", ".join(p for p in parts if p)
+
+
+# --------------------------------------------------
+# PLACE ORDER
+# --------------------------------------------------
+def place_order(user_id, *, address_id=None, idempotency_key=None, payment_method="COD"):
+    """
+    → (order, created). created is False for an idempotent replay.
+    Raises CheckoutError (nothing written) on empty cart / stock / price
+    problems.
+    """
+    if idempotency_key and len(idempotency_key) > MAX_IDEMPOTENCY_KEY_LENGTH:
+        raise CheckoutError("Idempotency key too long")
+
+    existing = _existing_order(user_id, idempotency_key)
+    if existing:
+        return existing, False
+
+    try:
+        order, product_ids = _place_order(user_id, address_id, idempotency_key, payment_method)
+
+    except IntegrityError:
+        db.session.rollback()
+
+        # same key committed by a concurrent request → that order wins
+        existing = _existing_order(user_id, idempotency_key)
+        if existing:
+            return existing, False
+        raise
+
+    except Exception:
+        db.session.rollback()
+        raise
+
+    # stock changed → PDP cache
+    for product_id in product_ids:
+        product_cache.invalidate_product(product_id)
+
+    return order, True
+
+
+def _place_order(user_id, address_id, idempotency_key, payment_method):
+    now = utc_now()
+
+    # 1️⃣ LOCK THE CART (+ product snapshot, one query)
+    rows = db.session.execute(
+        select(CartItem, Product)
+        .join(Product, Product.id == CartItem.product_id)
+        .where(CartItem.user_id == user_id)
+        .order_by(CartItem.product_id)
+        .with_for_update(of=CartItem)
+    ).all()
+
+    if not rows:
+        raise CheckoutError("Your cart is empty")
+
+    # 2️⃣ VALIDATE + PRICE (no stock rows locked yet)
+    unavailable = [p.id for item, p in rows if not p.is_active_product]
+    if unavailable:
+        raise CheckoutError(
+            "Some products are no longer available",
+            status=409,
+            product_ids=unavailable
+        )
+
+    repriced = [p.id for item, p in rows if Decimal(p.price) != Decimal(item.price_at_add)]
+    if repriced:
+        raise CheckoutError(
+            "Product price changed. Please refresh cart.",
+            status=409,
+            product_ids=repriced
+        )
+
+    items = [item for item, _ in rows]
+
+    if any(item.quantity < 1 for item in items):
+        raise CheckoutError("Invalid quantity in cart")
+
+    address = _delivery_address(user_id, address_id)
+
+    subtotal = PriceService.calculate_subtotal(items)
+    discount = PriceService.calculate_discount(subtotal)
+    platform_fee = PriceService.calculate_platform_fee(subtotal)
+
+    # 3️⃣ DECREMENT STOCK (product-id order, conditional)
+    products = {p.id: p for _, p in rows}
+    short = []
+    for item in items:
+        if products[item.product_id].stock_sharded:
+            if not _decrement_sharded(item, user_id):
+                short.append(item.product_id)
+            continue
+
+        decremented = db.session.execute(
+            update(Product)
+            .where(
+                Product.id == item.product_id,
+                Product.status == "ACTIVE",
+                Product.stock - others_held_subquery(Product.id, user_id, now) >= item.quantity
+            )
+            .values(stock=Product.stock - item.quantity)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+
+        if decremented != 1:
+            short.append(item.product_id)
+
+    if short:
+        # nothing partial survives: the decrements above roll back too
+        raise CheckoutError(
+            "Some items are out of stock or exceed available quantity",
+            status=409,
+            product_ids=short
+        )
+
+    # 4️⃣ ORDER + ITEMS + TIMELINE
+    order = Order(
+        order_number=generate_order_number(now),
+        user_id=user_id,
+        total_amount=subtotal - discount + platform_fee,
+        status=OrderStatus.CONFIRMED.value,
+        payment_method=payment_method,
+        payment_status=PaymentStatus.PENDING.value,
+        delivery_full_name=address.full_name,
+        delivery_phone=address.phone,
+        delivery_address=_address_snapshot(address),
+        idempotency_key=idempotency_key or None,
+        created_at=now,
+        updated_at=now
+    )
+    db.session.add(order)
+    db.session.flush()
+
+    db.session.execute(
+        insert(OrderItem),
+        [
+            {
+                "order_id": order.id,
+                "product_id": item.product_id,
+                "quantity": item.quantity,
+                "price_at_purchase": item.price_at_add
+            }
+            for item in items
+        ]
+    )
+
+    db.session.execute(
+        insert(OrderTimeline),
+        [{
+            "order_id": order.id,
+            "status": OrderStatus.CONFIRMED.value,
+            "note": f"Order placed ({payment_method})",
+            "created_at": now
+        }]
+    )
+
+    # 5️⃣ CLEAR THE CART (exactly the rows we locked)
+    cleared = db.session.execute(
+        delete(CartItem)
+        .where(CartItem.id.in_([item.id for item in items]))
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+    if cleared != len(items):
+        raise CheckoutError("Cart changed during checkout. Please retry.", status=409)
+
+    product_ids = [item.product_id for item in items]
+
+    # held units are now sold units
+    release(user_id, product_ids)
+    for item in items:
+        db.session.expunge(item)
+
+    db.session.commit()
+
+    return order, product_ids
+
+
+def _decrement_sharded(item, user_id):
+    # hot SKU: the products row is never locked; other users' holds are
+    # re-checked under the one shard row the decrement locks
+    return stock_shards.decrement(item.product_id, item.quantity, user_id=user_id)
@@ -0,0 +1,243 @@
+"""
+Admin Dashboard Metrics
+=======================
+Counters for the admin dashboard KPI cards.
+
+- ONE conditional-aggregation query per table
+  (users / orders + revenue / products / product_reviews)
+- Result is materialized into `dashboard_snapshots` by the scheduler,
+  so a normal page load reads a single row
+- ?live=1 on the dashboard recomputes (and re-stores) on demand
+"""
+
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import func, case
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db, scheduler
+from app.models import (
+    User, Order, Product, ProductReview, OrderStatus, DashboardSnapshot
+)
+from app.utils.time_utils import utc_now
+
+
+SNAPSHOT_NAME = "admin"
+
+
+def _count_if(condition):
+    return func.count(case((condition, 1)))
+
+
+def _sum_if(condition, column):
+    return func.coalesce(func.sum(case((condition, column), else_=0)), 0)
+
+
+class DashboardMetricsService:
+    """
+    users / orders / revenue / products / reviews counters
+    Used by admin dashboard + snapshot job
+    """
+
+    # --------------------------------------------------
+    # PER-TABLE AGGREGATES
+    # --------------------------------------------------
+    @staticmethod
+    def user_counts(now, today_start):
+        total, active, locked, new_today = db.session.query(
+            func.count(User.id),
+            _count_if(User.is_active == True),
+            _count_if(User.lock_until > now),
+            _count_if(User.created_at >= today_start)
+        ).one()
+
+        return {
+            "total": total,
+            "active": active,
+            "locked": locked,
+            "new_today": new_today
+        }
+
+    @staticmethod
+    def order_counts(today_start, month_start):
+        paid = Order.payment_status == "paid"
+
+        row = db.session.query(
+            func.count(Order.id),
+            _count_if(Order.created_at >= today_start),
+            _count_if(Order.status == OrderStatus.CONFIRMED.value),
+            _count_if(Order.status == OrderStatus.SHIPPED.value),
+            _count_if(Order.status == OrderStatus.DELIVERED.value),
+            _count_if(Order.status == OrderStatus.CANCELLED.value),
+            _sum_if(paid, Order.total_amount),
+            _sum_if(paid & (Order.created_at >= today_start), Order.total_amount),
+            _sum_if(paid & (Order.created_at >= month_start), Order.total_amount)
+        ).one()
+
+        orders = {
+            "total": row[0],
+            "today": row[1],
+            "pending": row[2],
+            "shipped": row[3],
+            "delivered": row[4],
+            "cancelled": row[5]
+        }
+
+        revenue = {
+            "total": row[6],
+            "today": row[7],
+            "this_month": row[8]
+        }
+
+        return orders, revenue
+
+    @staticmethod
+    def product_counts():
+        total, active, inactive = db.session.query(
+            func.count(Product.id),
+            _count_if(Product.status == "ACTIVE"),
+            _count_if(Product.status == "INACTIVE")
+        ).one()
+
+        return {
+            "total": total,
+            "active": active,
+            "inactive": inactive
+        }
+
+    @staticmethod
+    def review_counts():
+        pending, reported = (
+            db.session.query(
+                _count_if(
+                    (ProductReview.is_active == False) &
+                    (ProductReview.is_reported == False)
+                ),
+                _count_if(ProductReview.is_reported == True)
+            )
+            .filter(
+                ProductReview.is_deleted == False,
+                ProductReview.review_text.isnot(None)
+            )
+            .one()
+        )
+
+        return {
+            "pending": pending,
+            "reported": reported
+        }
+
+    # --------------------------------------------------
+    # ALL COUNTERS (4 QUERIES)
+    # --------------------------------------------------
+    @staticmethod
+    def compute(now=None):
+        now = now or datetime.utcnow()
+        today_start = datetime(now.year, now.month, now.day)
+        month_start = datetime(now.year, now.month, 1)
+
+        orders, revenue = DashboardMetricsService.order_counts(
+            today_start, month_start
+        )
+
+        return {
+            "users": DashboardMetricsService.user_counts(now, today_start),
+            "orders": orders,
+            "revenue": revenue,
+            "products": DashboardMetricsService.product_counts(),
+            "reviews": DashboardMetricsService.review_counts()
+        }
+
+    # --------------------------------------------------
+    # SNAPSHOT (MATERIALIZED ROW)
+    # --------------------------------------------------
+    @staticmethod
+    def _to_json(metrics):
+        """
+        Decimal revenue → string (JSON column safe, no float rounding)
+        """
+        return {
+            group: {
+                key: str(value) if isinstance(value, Decimal) else value
+                for key, value in values.items()
+            }
+            for group, values in metrics.items()
+        }
+
+    @staticmethod
+    def _from_json(data):
+        revenue = {
+            key: Decimal(value)
+            for key, value in data.get("revenue", {}).items()
+        }
+        return {**data, "revenue": revenue}
+
+    @staticmethod
+    def refresh_snapshot():
+        """
+        Recompute counters and upsert the snapshot row.
+        Returns (metrics, computed_at)
+        """
+        started = time.perf_counter()
+        metrics = DashboardMetricsService.compute()
+        duration_ms = int((time.perf_counter() - started) * 1000)
+
+        computed_at = utc_now()
+
+        snapshot = DashboardSnapshot.query.filter_by(name=SNAPSHOT_NAME).first()
+        if snapshot is None:
+            snapshot = DashboardSnapshot(name=SNAPSHOT_NAME)
+            db.session.add(snapshot)
+
+        snapshot.data = DashboardMetricsService._to_json(metrics)
+        snapshot.duration_ms = duration_ms
+        snapshot.computed_at = computed_at
+
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # another worker inserted the row first → theirs is just as fresh
+            db.session.rollback()
+
+        return metrics, computed_at
+
+    @staticmethod
+    def get_metrics(live=False, max_age_seconds=None):
+        """
+        Returns (metrics, computed_at, is_live)
+
+        Snapshot missing or older than max_age_seconds
+        (scheduler not running in this process) → recompute.
+        """
+        if not live:
+            snapshot = DashboardSnapshot.query.filter_by(name=SNAPSHOT_NAME).first()
+
+            if snapshot is not None:
+                computed_at = snapshot.computed_at
+                age = utc_now().replace(tzinfo=None) - computed_at.replace(tzinfo=None)
+
+                if max_age_seconds is None or age <= timedelta(seconds=max_age_seconds):
+                    return (
+                        DashboardMetricsService._from_json(snapshot.data),
+                        computed_at,
+                        False
+                    )
+
+        metrics, computed_at = DashboardMetricsService.refresh_snapshot()
+        return metrics, computed_at, True
+
+
+# --------------------------------------------------
+# SCHEDULER JOB
+# --------------------------------------------------
+def refresh_dashboard_snapshot():
+    """
+    Runs via scheduler (outside any request)
+    """
+    with scheduler.app.app_context():
+        try:
+            DashboardMetricsService.refresh_snapshot()
+        finally:
+            db.session.remove()
@@ -0,0 +1,398 @@
+"""
+Email Outbox (Durable, Async, Pooled SMTP)
+==========================================
+`email_service.send_*` used to call `mail.send` inside the request, so a
+signup or an account lock waited on a Gmail SMTP round trip (and a
+flaky SMTP server turned into a 500).
+
+Now requests only INSERT into `email_outbox` (own connection → the
+caller's session is untouched) and wake the worker pool:
+
+- EMAIL_WORKERS threads per process claim up to EMAIL_BATCH_SIZE due
+  rows with a lease (`locked_by` / `locked_until`, conditional UPDATE →
+  workers in other processes never get the same row)
+- each batch is sent over ONE `mail.connect()` SMTP connection
+- failures are retried with exponential backoff + jitter
+  (EMAIL_RETRY_SECONDS · 2^(attempt-1), capped at EMAIL_RETRY_MAX_SECONDS);
+  after EMAIL_MAX_ATTEMPTS the row is dead-lettered (status "dead")
+- rows of a crashed worker are picked up again when the lease expires
+- workers also poll every EMAIL_POLL_SECONDS → rows queued by other
+  processes / before a restart are delivered too
+
+EMAIL_OUTBOX_ASYNC = False (or app.testing) delivers inline after the
+INSERT, through the same code path.
+
+`flask send-queued-emails` drains the queue (and can requeue dead rows).
+"""
+
+import atexit
+import os
+import random
+import socket
+import threading
+import uuid
+from datetime import timedelta
+
+from flask import current_app
+from flask_mail import Message
+from sqlalchemy import insert, select, update, delete, or_
+
+from app.extensions import db, mail, scheduler
+from app.models import EmailOutbox
+from app.utils.time_utils import utc_now
+
+
+DEFAULT_SENDER = "ZENTRO <no-reply@zentro.test>"
+
+outbox = EmailOutbox.__table__
+
+
+# --------------------------------------------------
+# ENQUEUE (REQUEST SIDE)
+# --------------------------------------------------
+def enqueue_email(to_email, subject, *, html=None, body=None, sender=None):
+    enqueue_emails([{
+        "to_email": to_email,
+        "subject": subject,
+        "html": html,
+        "body": body,
+        "sender": sender
+    }])
+
+
+def enqueue_emails(messages):
+    """
+    Many emails, ONE multi-row INSERT (bulk notifications).
+    messages: dicts with to_email, subject, html, body, sender (optional).
+    """
+    default_sender = current_app.config.get("MAIL_DEFAULT_SENDER") or DEFAULT_SENDER
+    now = utc_now()
+
+    rows = [
+        {
+            "to_email": m["to_email"],
+            "sender": m.get("sender") or default_sender,
+            "subject": m["subject"],
+            "body": m.get("body"),
+            "html": m.get("html"),
+            "status": "queued",
+            "attempts": 0,
+            "next_attempt_at": now,
+            "created_at": now
+        }
+        for m in messages
+    ]
+
+    if not rows:
+        return 0
+
+    with db.engine.begin() as conn:
+        conn.execute(insert(outbox), rows)
+
+    get_email_worker().notify()
+
+    return len(rows)
+
+
+def _message(row):
+    return Message(
+        subject=row["subject"],
+        sender=row["sender"],
+        recipients=[row["to_email"]],
+        body=row["body"],
+        html=row["html"]
+    )
+
+
+class EmailOutboxWorker:
+    """
+    One per app (and per process — restarted after fork).
+    """
+
+    def __init__(self, app, workers=2, batch_size=20, poll_seconds=2.0,
+                 lease_seconds=120, max_attempts=6, retry_seconds=30,
+                 retry_max_seconds=3600, async_mode=True):
+        self.app = app
+        self.workers = workers
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_seconds = retry_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self.async_mode = async_mode
+
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._start_lock = threading.Lock()
+
+        self._threads = []
+        self._pid = None
+        self._atexit_registered = False
+
+        self.sent = 0
+        self.failed = 0
+        self.dead = 0
+        self.connections = 0
+
+    # --------------------------------------------------
+    # PRODUCER SIDE
+    # --------------------------------------------------
+    def notify(self):
+        if not self.async_mode:
+            self.drain()
+            return
+
+        self._ensure_started()
+        self._wake.set()
+
+    def _ensure_started(self):
+        pid = os.getpid()
+
+        if self._pid == pid and all(t.is_alive() for t in self._threads):
+            return
+
+        with self._start_lock:
+            if self._pid == pid and all(t.is_alive() for t in self._threads):
+                return
+
+            self._pid = pid
+            self._stopping.clear()
+            self._threads = [
+                threading.Thread(
+                    target=self._run,
+                    name=f"email-outbox-{n}",
+                    daemon=True
+                )
+                for n in range(self.workers)
+            ]
+            for thread in self._threads:
+                thread.start()
+
+            if not self._atexit_registered:
+                atexit.register(self.stop)
+                self._atexit_registered = True
+
+    # --------------------------------------------------
+    # WORKER THREADS
+    # --------------------------------------------------
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wake.wait(self.poll_seconds)
+            self._wake.clear()
+
+            try:
+                while not self._stopping.is_set() and self.deliver_batch():
+                    pass
+            except Exception as e:
+                # DB down etc. → try again next tick
+                print("⚠️ Email outbox worker error:", e)
+
+    def stop(self, timeout=10):
+        self._stopping.set()
+        self._wake.set()
+
+        for thread in self._threads:
+            if thread.is_alive():
+                thread.join(timeout)
+
+    # --------------------------------------------------
+    # CLAIM → SEND (ONE SMTP CONNECTION) → RECORD
+    # --------------------------------------------------
+    def _claim(self, conn, token):
+        now = utc_now()
+        free = or_(outbox.c.locked_until.is_(None), outbox.c.locked_until < now)
+
+        ids = conn.execute(
+            select(outbox.c.id)
+            .where(
+                outbox.c.status == "queued",
+                outbox.c.next_attempt_at <= now,
+                free
+            )
+            .order_by(outbox.c.next_attempt_at, outbox.c.id)
+            .limit(self.batch_size)
+        ).scalars().all()
+
+        if not ids:
+            return []
+
+        # re-checked in the UPDATE → a row goes to exactly one worker
+        conn.execute(
+            update(outbox)
+            .where(outbox.c.id.in_(ids), outbox.c.status == "queued", free)
+            .values(
+                locked_by=token,
+                locked_until=now + timedelta(seconds=self.lease_seconds)
+            )
+        )
+
+        return conn.execute(
+            select(outbox).where(outbox.c.locked_by == token)
+        ).mappings().all()
+
+    def _retry_at(self, attempts):
+        delay = min(self.retry_max_seconds, self.retry_seconds * 2 ** (attempts - 1))
+        return utc_now() + timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+    def deliver_batch(self):
+        """
+        Sends one claimed batch. Returns rows claimed (0 → queue idle).
+        """
+        token = f"{socket.gethostname()[:40]}:{os.getpid()}:{uuid.uuid4().hex[:12]}"
+
+        with self.app.app_context():
+            with db.engine.begin() as conn:
+                rows = self._claim(conn, token)
+
+            if not rows:
+                return 0
+
+            sent_ids = []
+            failures = []
+
+            try:
+                with mail.connect() as smtp:
+                    self.connections += 1
+
+                    for row in rows:
+                        try:
+                            smtp.send(_message(row))
+                            sent_ids.append(row["id"])
+                        except Exception as e:
+                            failures.append((row, e))
+
+            except Exception as e:
+                # connect / login / quit failed → whatever was not sent retries
+                done = set(sent_ids)
+                failures = [(row, e) for row in rows if row["id"] not in done]
+
+            self._record(token, sent_ids, failures)
+
+        return len(rows)
+
+    def _record(self, token, sent_ids, failures):
+        now = utc_now()
+
+        with db.engine.begin() as conn:
+            if sent_ids:
+                conn.execute(
+                    update(outbox)
+                    .where(outbox.c.id.in_(sent_ids), outbox.c.locked_by == token)
+                    .values(
+                        status="sent",
+                        sent_at=now,
+                        attempts=outbox.c.attempts + 1,
+                        locked_by=None,
+                        locked_until=None
+                    )
+                )
+
+            for row, error in failures:
+                attempts = row["attempts"] + 1
+                dead = attempts >= self.max_attempts
+
+                conn.execute(
+                    update(outbox)
+                    .where(outbox.c.id == row["id"], outbox.c.locked_by == token)
+                    .values(
+                        status="dead" if dead else "queued",
+                        attempts=attempts,
+                        next_attempt_at=now if dead else self._retry_at(attempts),
+                        last_error=f"{type(error).__name__}: {error}"[:1000],
+                        locked_by=None,
+                        locked_until=None
+                    )
+                )
+
+                if dead:
+                    self.dead += 1
+                    print(f"☠️ Email dead-lettered after {attempts} attempts:", row["id"], error)
+
+        self.sent += len(sent_ids)
+        self.failed += len(failures)
+
+    def drain(self, max_batches=None):
+        """
+        Delivers everything due now. Returns rows claimed.
+        """
+        claimed = batches = 0
+
+        while max_batches is None or batches < max_batches:
+            n = self.deliver_batch()
+            if not n:
+                break
+            claimed += n
+            batches += 1
+
+        return claimed
+
+
+# --------------------------------------------------
+# PER-APP WORKER POOL
+# --------------------------------------------------
+def get_email_worker():
+    worker = current_app.extensions.get("email_outbox")
+
+    if worker is None:
+        config = current_app.config
+
+        worker = EmailOutboxWorker(
+            current_app._get_current_object(),
+            workers=config.get("EMAIL_WORKERS", 2),
+            batch_size=config.get("EMAIL_BATCH_SIZE", 20),
+            poll_seconds=config.get("EMAIL_POLL_SECONDS", 2.0),
+            lease_seconds=config.get("EMAIL_LEASE_SECONDS", 120),
+            max_attempts=config.get("EMAIL_MAX_ATTEMPTS", 6),
+            retry_seconds=config.get("EMAIL_RETRY_SECONDS", 30),
+            retry_max_seconds=config.get("EMAIL_RETRY_MAX_SECONDS", 3600),
+            async_mode=config.get("EMAIL_OUTBOX_ASYNC", True) and not current_app.testing
+        )
+        current_app.extensions["email_outbox"] = worker
+
+    return worker
+
+
+def requeue_dead_emails():
+    """
+    Dead letters → queued again with a fresh attempt budget.
+    """
+    with db.engine.begin() as conn:
+        return conn.execute(
+            update(outbox)
+            .where(outbox.c.status == "dead")
+            .values(status="queued", attempts=0, next_attempt_at=utc_now())
+        ).rowcount
+
+
+def purge_sent_emails(days=7):
+    with db.engine.begin() as conn:
+        return conn.execute(
+            delete(outbox).where(
+                outbox.c.status == "sent",
+                outbox.c.sent_at < utc_now() - timedelta(days=days)
+            )
+        ).rowcount
+
+
+def email_outbox_job():
+    """
+    Runs via scheduler: (re)starts this process's workers and wakes
+    them, so rows queued before a restart / by other processes go out.
+    """
+    with scheduler.app.app_context():
+        try:
+            get_email_worker().notify()
+        finally:
+            db.session.remove()
+
+
+def purge_sent_emails_job():
+    """
+    Runs via scheduler (outside any request)
+    """
+    with scheduler.app.app_context():
+        try:
+            purge_sent_emails(scheduler.app.config.get("EMAIL_OUTBOX_KEEP_DAYS", 7))
+        finally:
+            db.session.remove()
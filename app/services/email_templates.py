@@ -0,0 +1,151 @@
+"""
+Email Templates (Precompiled Jinja)
+===================================
+Every email is rendered from `templates/emails/<name>.html` (+ optional
+`<name>.txt` plain-text part), both extending a shared layout
+(`_layout.html` / `_layout.txt`, admin mails `_admin_layout.html`).
+
+Rendering uses its own Jinja environment, not Flask's:
+
+- templates are compiled ONCE per process (`precompile()` on first use)
+  and kept in memory; auto_reload is off outside debug → no stat() or
+  re-parse per email
+- compiled bytecode is cached per template on disk
+  (EMAIL_TEMPLATE_CACHE_DIR) → a new worker / process skips the
+  Jinja parse + compile step entirely
+- HTML is autoescaped, the text part is not
+- `render_batch()` renders one template for many recipients with a
+  single lookup (bulk notifications)
+
+`flask compile-email-templates` warms the bytecode cache (deploys).
+"""
+
+import os
+import threading
+
+from flask import current_app
+from jinja2 import (
+    Environment, FileSystemLoader, FileSystemBytecodeCache,
+    StrictUndefined, TemplateNotFound, select_autoescape
+)
+
+
+EMAIL_TEMPLATE_DIR = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..", "templates", "emails")
+)
+
+
+class EmailTemplates:
+    """
+    One per app (lives in app.extensions["email_templates"]).
+    """
+
+    def __init__(self, template_dir=EMAIL_TEMPLATE_DIR, cache_dir=None, auto_reload=False):
+        bytecode_cache = None
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            bytecode_cache = FileSystemBytecodeCache(cache_dir, "email_%s.cache")
+
+        self.env = Environment(
+            loader=FileSystemLoader(template_dir),
+            autoescape=select_autoescape(["html"], default_for_string=False),
+            bytecode_cache=bytecode_cache,
+            auto_reload=auto_reload,
+            cache_size=-1,
+            trim_blocks=True,
+            lstrip_blocks=True,
+            undefined=StrictUndefined
+        )
+
+        self._pairs = {}
+        self._lock = threading.Lock()
+
+    # --------------------------------------------------
+    # COMPILE
+    # --------------------------------------------------
+    def names(self):
+        """
+        Renderable emails (layouts start with "_").
+        """
+        return sorted({
+            name.rsplit(".", 1)[0]
+            for name in self.env.list_templates(extensions=["html", "txt"])
+            if not name.startswith("_")
+        })
+
+    def precompile(self):
+        """
+        Loads (and bytecode-caches) every template. Returns the count.
+        """
+        templates = self.env.list_templates(extensions=["html", "txt"])
+
+        for name in templates:
+            self.env.get_template(name)
+
+        return len(templates)
+
+    def _pair(self, name):
+        pair = self._pairs.get(name)
+        if pair is not None and not self.env.auto_reload:
+            return pair
+
+        with self._lock:
+            html = self.env.get_template(f"{name}.html")
+
+            try:
+                text = self.env.get_template(f"{name}.txt")
+            except TemplateNotFound:
+                text = None
+
+            pair = self._pairs[name] = (html, text)
+
+        return pair
+
+    # --------------------------------------------------
+    # RENDER
+    # --------------------------------------------------
+    def render(self, name, **context):
+        """
+        → (html, text) — text is None if the email has no .txt part.
+        """
+        html, text = self._pair(name)
+        return html.render(context), text.render(context) if text else None
+
+    def render_batch(self, name, contexts, **shared):
+        """
+        Same email for many recipients: `shared` is merged into every
+        per-recipient context. → [(html, text), ...] in input order.
+        """
+        html, text = self._pair(name)
+        rendered = []
+
+        for context in contexts:
+            variables = {**shared, **context} if shared else context
+            rendered.append((
+                html.render(variables),
+                text.render(variables) if text else None
+            ))
+
+        return rendered
+
+
+def get_email_templates():
+    templates = current_app.extensions.get("email_templates")
+
+    if templates is None:
+        templates = EmailTemplates(
+            cache_dir=current_app.config.get("EMAIL_TEMPLATE_CACHE_DIR"),
+            auto_reload=current_app.debug
+        )
+        templates.precompile()
+        current_app.extensions["email_templates"] = templates
+
+    return templates
+
+
+def render_email(name, **context):
+    return get_email_templates().render(name, **context)
+
+
+def render_email_batch(name, contexts, **shared):
+    return get_email_templates().render_batch(name, contexts, **shared)
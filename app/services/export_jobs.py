@@ -0,0 +1,443 @@
+"""
+Background Export Jobs
+======================
+Exports that may outlive an HTTP request (whole user base, years of
+audit logs) run as jobs:
+
+1. POST from the users / login history / audit logs screen stores an
+   `export_jobs` row with the on-screen filters (same parsers as the
+   listings → same rows) and schedules it on APScheduler right away
+2. the worker claims the row (queued → running + a fresh lease token,
+   one UPDATE → only one worker wins), streams the rows through the
+   CSV / gzip chunk generators of app.utils.csv_export into
+   EXPORT_DIR/<id>.csv.gz.<token>.part and records progress on its own
+   connection every few thousand rows
+3. finished file is fsync'ed + renamed → the UI polls the status URL
+   and downloads with HTTP Range support (resumable)
+
+Every worker write (progress, heartbeat, final status) matches the
+lease token → once the sweeper restarts a job, the old attempt's next
+write fails and it drops its own part file. A heartbeat thread touches
+the row every EXPORT_JOB_HEARTBEAT_SECONDS, so a slow count or query
+is not mistaken for a dead worker.
+
+The sweeper (every minute) hands queued jobs nobody started to the
+scheduler's pool, re-queues jobs whose worker died (no heartbeat for
+EXPORT_JOB_STALE_MINUTES) and deletes expired artifacts
+(EXPORT_JOB_TTL_HOURS).
+"""
+
+import glob
+import os
+import threading
+import time
+import uuid
+from datetime import timedelta
+
+from flask import current_app
+from sqlalchemy import update
+
+from app.extensions import db, scheduler
+from app.models import ExportJob, User, LoginActivity, AdminActivityLog
+from app.services.audit_log_query import (
+    parse_filters, apply_filters, iter_export_rows, cold_row_estimate,
+    AUDIT_CSV_HEADER, audit_log_csv_row
+)
+from app.services.user_query import (
+    filter_users, filter_login_activity, filter_args,
+    USER_FILTER_ARGS, LOGIN_FILTER_ARGS,
+    USER_CSV_HEADER, LOGIN_CSV_HEADER, user_csv_row, login_activity_csv_row
+)
+from app.utils.csv_export import iter_csv, iter_gzip, YIELD_PER
+from app.utils.time_utils import utc_now
+
+
+AUDIT_FILTER_ARGS = ("q", "action", "severity", "archived", "from_date", "to_date")
+
+PROGRESS_EVERY_ROWS = 5000
+PROGRESS_EVERY_SECONDS = 2.0
+
+
+# --------------------------------------------------
+# EXPORT KINDS (SAME FILTERS / COLUMNS AS THE STREAMED CSV ROUTES)
+# --------------------------------------------------
+def _users_query(params):
+    return filter_users(User.query, params["filters"]).order_by(User.created_at.desc())
+
+
+def _login_history_query(params):
+    return filter_login_activity(
+        LoginActivity.query.filter_by(user_id=params["user_id"]),
+        params["filters"]
+    ).order_by(LoginActivity.created_at.desc())
+
+
+def _audit_filters(params):
+    return parse_filters(params["filters"], is_super_admin=params["is_super_admin"])
+
+
+def _audit_count(params):
+    filters = _audit_filters(params)
+    total = apply_filters(AdminActivityLog.query, filters).order_by(None).count()
+
+    if filters["archived"]:
+        # segment indexes only; the final total is the rows written
+        total += cold_row_estimate(filters)
+
+    return total
+
+
+def _audit_rows(params):
+    filters = _audit_filters(params)
+    return iter_export_rows(apply_filters(AdminActivityLog.query, filters), filters)
+
+
+EXPORT_KINDS = {
+    "users": {
+        "filter_args": USER_FILTER_ARGS,
+        "header": USER_CSV_HEADER,
+        "to_row": user_csv_row,
+        "file_name": lambda params: "users.csv.gz",
+        "count": lambda params: _users_query(params).order_by(None).count(),
+        "rows": lambda params: _users_query(params).yield_per(YIELD_PER),
+    },
+    "login_history": {
+        "filter_args": LOGIN_FILTER_ARGS,
+        "header": LOGIN_CSV_HEADER,
+        "to_row": login_activity_csv_row,
+        "file_name": lambda params: f"login_activity_user_{params['user_id']}.csv.gz",
+        "count": lambda params: _login_history_query(params).order_by(None).count(),
+        "rows": lambda params: _login_history_query(params).yield_per(YIELD_PER),
+    },
+    "audit_logs": {
+        "filter_args": AUDIT_FILTER_ARGS,
+        "header": AUDIT_CSV_HEADER,
+        "to_row": audit_log_csv_row,
+        "file_name": lambda params: (
+            "audit_logs_archived.csv.gz"
+            if params["filters"].get("archived") == "1" else "audit_logs.csv.gz"
+        ),
+        "count": _audit_count,
+        "rows": _audit_rows,
+    },
+}
+
+
+def export_dir():
+    return current_app.config["EXPORT_DIR"]
+
+
+def artifact_path(job):
+    return os.path.join(export_dir(), f"{job.public_id}.csv.gz")
+
+
+# --------------------------------------------------
+# CREATE (REQUEST SIDE)
+# --------------------------------------------------
+def create_export_job(kind, args, admin_id, *, user_id=None, is_super_admin=False):
+    spec = EXPORT_KINDS[kind]
+
+    job = ExportJob(
+        public_id=uuid.uuid4().hex,
+        admin_id=admin_id,
+        kind=kind,
+        params={
+            "filters": filter_args(args, spec["filter_args"]),
+            "user_id": user_id,
+            "is_super_admin": bool(is_super_admin),
+        },
+        status="queued",
+        rows_written=0,
+        file_name=spec["file_name"]({"filters": args, "user_id": user_id}),
+    )
+    db.session.add(job)
+    db.session.commit()
+
+    _schedule(job.id)
+
+    return job
+
+
+def _schedule(job_id):
+    """
+    Run now on the scheduler's thread pool; if that fails (scheduler
+    not running in this process) the sweeper picks the job up.
+    """
+    try:
+        scheduler.add_job(
+            id=f"export_job_{job_id}",
+            func=export_job_task,
+            args=[job_id],
+            trigger="date",
+            replace_existing=True
+        )
+    except Exception as e:
+        print("⚠️ Export job not scheduled (sweeper retries it):", e)
+
+
+# --------------------------------------------------
+# WORKER
+# --------------------------------------------------
+class LeaseLost(Exception):
+    """
+    The job was restarted (new lease) → this attempt must stop.
+    """
+
+
+def _set(job_id, token, **values):
+    """
+    Progress / status on its own connection → never touches the
+    session that is streaming the export rows. Raises LeaseLost if the
+    job no longer belongs to this attempt.
+    """
+    table = ExportJob.__table__
+
+    with db.engine.begin() as conn:
+        updated = conn.execute(
+            update(table)
+            .where(table.c.id == job_id, table.c.lease_token == token)
+            .values(updated_at=utc_now(), **values)
+        ).rowcount
+
+    if updated != 1:
+        raise LeaseLost(job_id)
+
+
+def claim_job(job_id):
+    """
+    queued → running. Returns the lease token, None if another worker
+    already has it.
+    """
+    token = uuid.uuid4().hex
+
+    with db.engine.begin() as conn:
+        claimed = conn.execute(
+            update(ExportJob.__table__)
+            .where(
+                ExportJob.__table__.c.id == job_id,
+                ExportJob.__table__.c.status == "queued"
+            )
+            .values(
+                status="running",
+                lease_token=token,
+                rows_written=0,
+                error=None,
+                started_at=utc_now(),
+                updated_at=utc_now()
+            )
+        ).rowcount
+
+    return token if claimed == 1 else None
+
+
+class _Heartbeat:
+    """
+    Touches the job row on its own thread while the export runs,
+    whether or not rows are flowing. `lost` is set once the lease is
+    gone.
+    """
+
+    def __init__(self, job_id, token):
+        self.app = current_app._get_current_object()
+        self.job_id = job_id
+        self.token = token
+        self.lost = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run,
+            name=f"export-job-{job_id}-heartbeat",
+            daemon=True
+        )
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        interval = self.app.config.get("EXPORT_JOB_HEARTBEAT_SECONDS", 30)
+
+        with self.app.app_context():
+            while not self._stop.wait(interval):
+                try:
+                    _set(self.job_id, self.token)
+                except LeaseLost:
+                    self.lost.set()
+                    return
+                except Exception as e:
+                    print("⚠️ Export job heartbeat failed:", self.job_id, e)
+
+
+def _remove(path):
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def run_export_job(job_id):
+    """
+    Writes the artifact for one job. Returns rows written (None if the
+    job was not claimed or was restarted elsewhere meanwhile).
+    """
+    token = claim_job(job_id)
+    if token is None:
+        return None
+
+    job = db.session.get(ExportJob, job_id)
+    spec = EXPORT_KINDS[job.kind]
+    params = job.params
+
+    os.makedirs(export_dir(), exist_ok=True)
+    path = artifact_path(job)
+    part = f"{path}.{token}.part"
+
+    written = 0
+    last_rows = 0
+    last_time = time.monotonic()
+
+    def to_row(row):
+        nonlocal written
+        written += 1
+        return spec["to_row"](row)
+
+    try:
+        with _Heartbeat(job_id, token) as heartbeat:
+            _set(job_id, token, total_rows=spec["count"](params))
+
+            chunks = iter_gzip(iter_csv(spec["header"], spec["rows"](params), to_row))
+
+            with open(part, "wb") as f:
+                for data in chunks:
+                    if heartbeat.lost.is_set():
+                        raise LeaseLost(job_id)
+
+                    f.write(data)
+
+                    if (
+                        written - last_rows >= PROGRESS_EVERY_ROWS
+                        or time.monotonic() - last_time >= PROGRESS_EVERY_SECONDS
+                    ):
+                        _set(job_id, token, rows_written=written)
+                        last_rows = written
+                        last_time = time.monotonic()
+
+                f.flush()
+                os.fsync(f.fileno())
+
+            # still ours right before publishing the file
+            _set(job_id, token, rows_written=written)
+            os.replace(part, path)
+
+        ttl = current_app.config.get("EXPORT_JOB_TTL_HOURS", 24)
+        _set(
+            job_id,
+            token,
+            status="done",
+            rows_written=written,
+            total_rows=written,
+            file_size=os.path.getsize(path),
+            finished_at=utc_now(),
+            expires_at=utc_now() + timedelta(hours=ttl)
+        )
+        return written
+
+    except LeaseLost:
+        db.session.rollback()
+        _remove(part)
+        print("⚠️ Export job restarted elsewhere, attempt dropped:", job_id)
+        return None
+
+    except Exception as e:
+        db.session.rollback()
+        _remove(part)
+
+        try:
+            _set(
+                job_id,
+                token,
+                status="failed",
+                rows_written=written,
+                error=str(e)[:1000],
+                finished_at=utc_now(),
+                expires_at=utc_now() + timedelta(hours=1)
+            )
+        except LeaseLost:
+            return None
+
+        print("❌ Export job failed:", job_id, e)
+        return written
+
+
+def export_job_task(job_id):
+    """
+    Runs via scheduler (outside any request)
+    """
+    with scheduler.app.app_context():
+        try:
+            run_export_job(job_id)
+        finally:
+            db.session.remove()
+
+
+# --------------------------------------------------
+# SWEEPER (PICKUP / RESTART / EXPIRE)
+# --------------------------------------------------
+def sweep_export_jobs():
+    config = current_app.config
+    now = utc_now()
+
+    # no heartbeat → worker died mid-export; the new lease fences it off
+    stale = now - timedelta(minutes=config.get("EXPORT_JOB_STALE_MINUTES", 10))
+    db.session.execute(
+        update(ExportJob)
+        .where(ExportJob.status == "running", ExportJob.updated_at < stale)
+        .values(status="queued", lease_token=None)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+
+    # queued but never started (scheduler down / restart)
+    queued = (
+        db.session.query(ExportJob.id)
+        .filter(
+            ExportJob.status == "queued",
+            ExportJob.created_at < now - timedelta(minutes=1)
+        )
+        .order_by(ExportJob.id)
+        .limit(5)
+        .all()
+    )
+
+    # run on the worker pool, not on the sweeper's own tick
+    for (job_id,) in queued:
+        _schedule(job_id)
+
+    # expired artifacts
+    expired = ExportJob.query.filter(
+        ExportJob.expires_at.isnot(None),
+        ExportJob.expires_at < now
+    ).all()
+
+    for job in expired:
+        path = artifact_path(job)
+        # + part files of attempts whose worker died
+        for leftover in [path] + glob.glob(f"{glob.escape(path)}.*.part"):
+            _remove(leftover)
+        db.session.delete(job)
+
+    db.session.commit()
+
+    return len(expired)
+
+
+def export_sweeper_job():
+    """
+    Runs via scheduler (outside any request)
+    """
+    with scheduler.app.app_context():
+        try:
+            sweep_export_jobs()
+        finally:
+            db.session.remove()
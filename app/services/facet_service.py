@@ -0,0 +1,250 @@
+"""
+Faceted Attribute Filtering
+===========================
+Shared by the search page (HTML) and /api/facets (JSON).
+
+- Facet value counts → ONE grouped query for all attributes
+- Disjunctive counts: each attribute is counted with every filter
+  EXCEPT its own (picking "Red" must not hide the count of "Blue"):
+  unselected attributes share the fully filtered set, each selected
+  attribute gets its own part → UNION ALL, still one round trip
+- Multi-attribute filters → ONE relational-division subquery
+  (GROUP BY product_id HAVING COUNT(DISTINCT attribute_id) = n)
+"""
+
+from sqlalchemy import and_, or_, func
+
+from app.extensions import db
+from app.models import Product, AttributeType, ProductAttribute
+from app.services.search_index import apply_search
+
+
+class FacetService:
+    """
+    Attribute facet engine
+    Used by search page / facets API
+    """
+
+    # --------------------------------------------------
+    # BASE RESULT SET (NON-ATTRIBUTE FILTERS)
+    # --------------------------------------------------
+    @staticmethod
+    def parse_price_range(price_range):
+        """
+        "500-2000" → (500.0, 2000.0)
+        """
+        if not price_range:
+            return None, None
+
+        try:
+            parts = price_range.split("-")
+            return float(parts[0]), float(parts[1])
+        except (ValueError, IndexError):
+            return None, None
+
+    @staticmethod
+    def base_query(args, rank=True):
+        """
+        ACTIVE products narrowed by keyword / price / rating /
+        category / brand / stock (same params as the search page).
+        """
+        q = args.get("q", "").strip()
+        min_price, max_price = FacetService.parse_price_range(args.get("price"))
+        rating = args.get("rating", type=int)
+        category = args.get("category", type=int)
+        brand = args.get("brand", "").strip()
+        in_stock = args.get("stock")
+
+        query = Product.query.filter(Product.status == "ACTIVE")
+
+        if q:
+            query = apply_search(query, q, rank=rank)
+
+        if min_price is not None:
+            query = query.filter(Product.price >= min_price)
+
+        if max_price is not None:
+            query = query.filter(Product.price <= max_price)
+
+        if rating:
+            query = query.filter(Product.avg_rating >= rating)
+
+        if category:
+            query = query.filter(Product.category_id == category)
+
+        if brand:
+            query = query.filter(Product.brand.ilike(f"%{brand}%"))
+
+        if in_stock:
+            query = query.filter(Product.stock > 0)
+
+        return query
+
+    # --------------------------------------------------
+    # ATTRIBUTES + SELECTED VALUES
+    # --------------------------------------------------
+    @staticmethod
+    def attributes_for_category(category_id):
+        if not category_id:
+            return []
+
+        return (
+            AttributeType.query
+            .filter_by(category_id=category_id)
+            .order_by(AttributeType.name)
+            .all()
+        )
+
+    @staticmethod
+    def selected_filters(attributes, args):
+        """
+        {attribute_id: value} for every attribute slug present in args
+        """
+        selected = {}
+
+        for attr in attributes:
+            value = args.get(attr.slug, "").strip()
+            if value:
+                selected[attr.id] = value
+
+        return selected
+
+    # --------------------------------------------------
+    # APPLY FILTERS (SINGLE SUBQUERY)
+    # --------------------------------------------------
+    @staticmethod
+    def apply_filters(query, selected):
+        """
+        Products that match ALL selected (attribute, value) pairs.
+        """
+        if not selected:
+            return query
+
+        pairs = or_(*[
+            and_(
+                ProductAttribute.attribute_id == attr_id,
+                ProductAttribute.value == value
+            )
+            for attr_id, value in selected.items()
+        ])
+
+        matching = (
+            db.session.query(ProductAttribute.product_id)
+            .filter(pairs)
+            .group_by(ProductAttribute.product_id)
+            .having(
+                func.count(func.distinct(ProductAttribute.attribute_id))
+                == len(selected)
+            )
+        )
+
+        return query.filter(Product.id.in_(matching))
+
+    # --------------------------------------------------
+    # FACET COUNTS (SINGLE GROUPED QUERY)
+    # --------------------------------------------------
+    @staticmethod
+    def _count_query(query, attribute_ids):
+        """
+        (attribute_id, value, products) for `attribute_ids` over the
+        given result set (not executed)
+        """
+        product_ids = query.order_by(None).with_entities(Product.id)
+
+        return (
+            db.session.query(
+                ProductAttribute.attribute_id,
+                ProductAttribute.value,
+                func.count(func.distinct(ProductAttribute.product_id))
+            )
+            .filter(
+                ProductAttribute.attribute_id.in_(attribute_ids),
+                ProductAttribute.product_id.in_(product_ids)
+            )
+            .group_by(ProductAttribute.attribute_id, ProductAttribute.value)
+        )
+
+    @staticmethod
+    def compute(base, attributes, selected=None):
+        """
+        {attribute_id: [(value, count), ...]}
+
+        `base` is the result set WITHOUT attribute filters; every
+        attribute is counted with the selected filters except its own.
+        """
+        if not attributes:
+            return {}
+
+        selected = selected or {}
+
+        parts = []
+
+        unselected = [a.id for a in attributes if a.id not in selected]
+        if unselected:
+            parts.append(FacetService._count_query(
+                FacetService.apply_filters(base, selected), unselected
+            ))
+
+        for attr_id in selected:
+            others = {k: v for k, v in selected.items() if k != attr_id}
+            parts.append(FacetService._count_query(
+                FacetService.apply_filters(base, others), [attr_id]
+            ))
+
+        rows = parts[0].union_all(*parts[1:]).all() if len(parts) > 1 else parts[0].all()
+
+        facets = {a.id: [] for a in attributes}
+        for attr_id, value, count in rows:
+            facets[attr_id].append((value, count))
+
+        for values in facets.values():
+            values.sort(key=lambda vc: (-vc[1], vc[0]))
+
+        return facets
+
+    # --------------------------------------------------
+    # ONE CALL FOR ROUTES
+    # --------------------------------------------------
+    @staticmethod
+    def build(args, rank=True):
+        """
+        Returns (filtered_query, attributes, selected)
+
+        attributes get `.values` and `.counts` for the filter UI.
+        """
+        category = args.get("category", type=int)
+
+        attributes = FacetService.attributes_for_category(category)
+        selected = FacetService.selected_filters(attributes, args)
+
+        base = FacetService.base_query(args, rank=rank)
+        query = FacetService.apply_filters(base, selected)
+
+        facets = FacetService.compute(base, attributes, selected)
+
+        for attr in attributes:
+            values = facets.get(attr.id, [])
+            attr.values = [v for v, _ in values]
+            attr.counts = dict(values)
+            attr.selected = selected.get(attr.id)
+
+        return query, attributes, selected
+
+    @staticmethod
+    def serialize(attributes):
+        return [
+            {
+                "id": attr.id,
+                "name": attr.name,
+                "slug": attr.slug,
+                "values": [
+                    {
+                        "value": value,
+                        "count": attr.counts.get(value, 0),
+                        "selected": value == attr.selected
+                    }
+                    for value in attr.values
+                ]
+            }
+            for attr in attributes
+        ]
@@ -0,0 +1,254 @@
+"""
+Identity Cache
+==============
+Short-TTL cache for the identity lookups done on every request:
+
+- `load_user` (Flask-Login)      → User by id + session_version check
+- `admin_required` decorators    → Admin by id + session_version check
+
+Entries are small column snapshots (id, session_version, is_active +
+the display fields the header needs), never ORM objects:
+
+- revocation is checked against the snapshot's session_version /
+  is_active exactly as before
+- password change / reset, lock / disable / unlock, profile edits and
+  admin login / logout call `invalidate_user` / `invalidate_admin`
+- sensitive or volatile columns (password_hash, lockout counters ...)
+  are NOT cached → they load from the DB only if a view touches them
+
+Backends reuse the PDP cache classes: in-process LRU (default) or a
+Redis-protocol server via IDENTITY_CACHE_URL.
+
+With the in-process backend an invalidation only reaches the worker
+that made the change, so every invalidation also bumps a shared
+counter (`identity_revocations`, one row). Each worker reads it at most
+every IDENTITY_REVOCATION_CHECK_SECONDS and drops its whole local
+cache when it moved → revocation / disabling reaches every worker
+within that interval, and a cache hit costs no query in between. The
+shared backend is invalidated for all workers at once and skips it.
+"""
+
+import time
+
+from flask import current_app, g
+from sqlalchemy import select, update, insert
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.extensions import db
+from app.models import User, Admin
+from app.services.product_cache import LRUCache, RedisCache
+
+
+USER_KEY = "ident:user:"
+ADMIN_KEY = "ident:admin:"
+
+USER_FIELDS = (
+    "id", "username", "email", "notification_email", "phone", "gender",
+    "role", "is_active", "session_version", "created_at",
+)
+
+ADMIN_FIELDS = (
+    "id", "email", "is_active", "is_super_admin", "session_version",
+)
+
+REVOCATION_NAME = "identity"
+
+
+# --------------------------------------------------
+# TABLE (cross-worker revocation counter, migrated with the app)
+# --------------------------------------------------
+identity_revocations = db.Table(
+    "identity_revocations",
+    db.Column("name", db.String(20), primary_key=True),
+    db.Column("version", db.BigInteger, nullable=False, default=0),
+)
+
+
+# --------------------------------------------------
+# BACKEND RESOLUTION (PER APP)
+# --------------------------------------------------
+def _create_cache():
+    config = current_app.config
+    ttl = config.get("IDENTITY_CACHE_TTL", 30)
+
+    if config.get("IDENTITY_CACHE_BACKEND") == "redis" and config.get("IDENTITY_CACHE_URL"):
+        try:
+            return RedisCache(config["IDENTITY_CACHE_URL"], ttl=ttl)
+        except ImportError:
+            print("⚠️ redis package not installed → identity cache falls back to memory")
+
+    return LRUCache(maxsize=config.get("IDENTITY_CACHE_MAXSIZE", 10000), ttl=ttl)
+
+
+def get_cache():
+    cache = current_app.extensions.get("identity_cache")
+
+    if cache is None:
+        cache = _create_cache()
+        current_app.extensions["identity_cache"] = cache
+
+    return cache
+
+
+def _snapshot(obj, fields):
+    return {field: getattr(obj, field) for field in fields}
+
+
+def _sync_revocations(cache):
+    """
+    Per-process cache only: clears it when another worker invalidated
+    an identity since the last check (at most one query per interval).
+    """
+    state = current_app.extensions.setdefault(
+        "identity_revocations", {"version": None, "checked_at": 0.0}
+    )
+
+    now = time.monotonic()
+    if now - state["checked_at"] < current_app.config.get("IDENTITY_REVOCATION_CHECK_SECONDS", 5):
+        return
+
+    version = db.session.execute(
+        select(identity_revocations.c.version)
+        .where(identity_revocations.c.name == REVOCATION_NAME)
+    ).scalar() or 0
+
+    if version != state["version"]:
+        cache.clear()
+
+    state["version"] = version
+    state["checked_at"] = now
+
+
+def _publish_revocation():
+    # own short transaction: callers invalidate after their commit
+    try:
+        with db.engine.begin() as conn:
+            bumped = conn.execute(
+                update(identity_revocations)
+                .where(identity_revocations.c.name == REVOCATION_NAME)
+                .values(version=identity_revocations.c.version + 1)
+            ).rowcount
+
+            if not bumped:
+                conn.execute(insert(identity_revocations).values(name=REVOCATION_NAME, version=1))
+
+    except IntegrityError:
+        pass  # first row inserted by another worker → counter moved anyway
+
+    except SQLAlchemyError:
+        current_app.logger.exception("Identity revocation counter not bumped")
+
+
+def _cached_snapshot(model, obj_id, key, fields):
+    """
+    Snapshot dict from the cache or freshly from the DB; None if missing.
+    """
+    cache = get_cache()
+
+    if not isinstance(cache, RedisCache):
+        _sync_revocations(cache)
+
+    data = cache.get(key)
+
+    if data is not None:
+        return data
+
+    obj = db.session.get(model, obj_id, populate_existing=True)
+    if obj is None:
+        return None
+
+    data = _snapshot(obj, fields)
+    cache.set(key, data)
+
+    return data
+
+
+# --------------------------------------------------
+# USERS (Flask-Login)
+# --------------------------------------------------
+def _attach_user(data):
+    """
+    Persistent User built from the snapshot without a SELECT.
+    Columns outside USER_FIELDS stay expired → lazy load on access,
+    so `current_user.x = ...; db.session.commit()` keeps working.
+    """
+    key = db.session.identity_key(User, data["id"])
+    user = db.session.identity_map.get(key)
+
+    if user is not None:
+        return user
+
+    user = User(**data)
+    make_transient_to_detached(user)
+    db.session.add(user)
+
+    return user
+
+
+def get_user_identity(user_id):
+    """
+    Snapshot dict for the user, or None if the user does not exist.
+    """
+    return _cached_snapshot(User, user_id, f"{USER_KEY}{user_id}", USER_FIELDS)
+
+
+def load_identity_user(user_id, session_version):
+    """
+    User for Flask-Login, or None if missing / disabled / revoked.
+    """
+    data = get_user_identity(user_id)
+
+    if data is None or not data["is_active"]:
+        return None
+
+    if session_version is not None and session_version != data["session_version"]:
+        return None
+
+    return _attach_user(data)
+
+
+def _invalidate(key):
+    cache = get_cache()
+    cache.delete(key)
+
+    if not isinstance(cache, RedisCache):
+        _publish_revocation()
+
+
+def invalidate_user(user_id):
+    _invalidate(f"{USER_KEY}{user_id}")
+
+
+# --------------------------------------------------
+# ADMINS (admin_required / super_admin_required)
+# --------------------------------------------------
+def get_admin_identity(admin_id):
+    """
+    Snapshot dict for the admin (memoised on `g` for the request),
+    or None if the admin does not exist.
+    """
+    memo = g.setdefault("_admin_identity", {})
+    if admin_id in memo:
+        return memo[admin_id]
+
+    data = _cached_snapshot(Admin, admin_id, f"{ADMIN_KEY}{admin_id}", ADMIN_FIELDS)
+
+    memo[admin_id] = data
+    return data
+
+
+def admin_session_valid(admin_id, session_version):
+    data = get_admin_identity(admin_id)
+
+    return bool(
+        data
+        and data["is_active"]
+        and data["session_version"] == session_version
+    )
+
+
+def invalidate_admin(admin_id):
+    g.pop("_admin_identity", None)
+    _invalidate(f"{ADMIN_KEY}{admin_id}")
+
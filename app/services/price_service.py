@@ -64,7 +64,35 @@ class PriceService:
         Full cart price calculation
         """
 
-        subtotal = PriceService.calculate_subtotal(cart_items)
+        return PriceService.summary(
+            PriceService.calculate_subtotal(cart_items)
+        )
+
+    # --------------------------------------------------
+    # LINE TOTALS (ONE DECIMAL PASS)
+    # --------------------------------------------------
+    @staticmethod
+    def line_totals(prices, quantities):
+        """
+        [price × qty, ...] + their sum, for plain values
+        (cart read model rows, not ORM objects)
+        """
+
+        totals = [
+            Decimal(price) * quantity
+            for price, quantity in zip(prices, quantities)
+        ]
+
+        return totals, sum(totals, Decimal("0.00"))
+
+    # --------------------------------------------------
+    # SUMMARY (SUBTOTAL → DISCOUNT / FEE / TOTAL)
+    # --------------------------------------------------
+    @staticmethod
+    def summary(subtotal):
+        """
+        Price breakdown for an already computed subtotal
+        """
 
         discount = PriceService.calculate_discount(subtotal)
 
@@ -0,0 +1,270 @@
+"""
+Product Detail Page Cache
+=========================
+Read-through fragment cache for the anonymous part of the PDP:
+product, related products, first page of reviews, rating breakdown.
+
+- Fragments are plain dicts / lists (no ORM objects) → safe to share
+  across requests and to pickle into Redis
+- Backends: in-process LRU with TTL (default) or any Redis-protocol
+  server (Redis / Valkey / KeyDB) via PDP_CACHE_URL
+- Product edits, review moderation and stock changes call
+  `invalidate_product(product_id)` explicitly
+- Per-user bits (wishlist, verified purchase, own review) stay live
+"""
+
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app
+from sqlalchemy.orm import joinedload
+
+from app.models import Product
+from app.services.review_service import ReviewService
+
+
+KEY_PREFIX = "pdp:"
+RELATED_LIMIT = 4
+
+
+# --------------------------------------------------
+# IN-PROCESS LRU + TTL
+# --------------------------------------------------
+class LRUCache:
+    name = "memory"
+
+    def __init__(self, maxsize=1000, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+
+            if item is None:
+                self.misses += 1
+                return None
+
+            value, expires_at = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self.invalidations += 1
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def size(self):
+        return len(self._data)
+
+
+# --------------------------------------------------
+# REDIS-PROTOCOL BACKEND (OPTIONAL)
+# --------------------------------------------------
+class RedisCache:
+    """
+    Shared across workers. Values are pickled fragments with SETEX,
+    so expiry and LRU eviction are left to the server (maxmemory-policy).
+    Connection errors degrade to a miss, never to a 500.
+    """
+    name = "redis"
+
+    def __init__(self, url, ttl=300):
+        import redis  # optional dependency
+
+        self.client = redis.Redis.from_url(url, socket_timeout=0.25)
+        self.ttl = ttl
+        self._errors = (redis.RedisError,)
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        try:
+            raw = self.client.get(key)
+        except self._errors:
+            raw = None
+
+        if raw is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return pickle.loads(raw)
+
+    def set(self, key, value):
+        try:
+            self.client.setex(key, self.ttl, pickle.dumps(value))
+        except self._errors:
+            pass
+
+    def delete(self, key):
+        self.invalidations += 1
+        try:
+            self.client.delete(key)
+        except self._errors:
+            pass
+
+    def clear(self):
+        try:
+            keys = list(self.client.scan_iter(f"{KEY_PREFIX}*"))
+            if keys:
+                self.client.delete(*keys)
+        except self._errors:
+            pass
+
+    def size(self):
+        return None
+
+
+# --------------------------------------------------
+# BACKEND RESOLUTION (PER APP)
+# --------------------------------------------------
+def _create_cache():
+    config = current_app.config
+    ttl = config.get("PDP_CACHE_TTL", 300)
+
+    if config.get("PDP_CACHE_BACKEND") == "redis" and config.get("PDP_CACHE_URL"):
+        try:
+            return RedisCache(config["PDP_CACHE_URL"], ttl=ttl)
+        except ImportError:
+            print("⚠️ redis package not installed → PDP cache falls back to memory")
+
+    return LRUCache(maxsize=config.get("PDP_CACHE_MAXSIZE", 1000), ttl=ttl)
+
+
+def get_cache():
+    cache = current_app.extensions.get("pdp_cache")
+
+    if cache is None:
+        cache = _create_cache()
+        current_app.extensions["pdp_cache"] = cache
+
+    return cache
+
+
+# --------------------------------------------------
+# FRAGMENT BUILDERS (PLAIN DATA FOR TEMPLATES)
+# --------------------------------------------------
+def _product_data(product):
+    category = product.category
+
+    return {
+        "id": product.id,
+        "name": product.name,
+        "sku": product.sku,
+        "brand": product.brand,
+        "price": product.price,
+        "description": product.description,
+        "images": product.image_list,
+        "image_list": product.image_list,
+        "stock": product.stock,
+        "status": product.status,
+        "avg_rating": product.avg_rating or 0,
+        "rating_count": product.rating_count or 0,
+        "category_id": product.category_id,
+        "category": {"id": category.id, "name": category.name} if category else None,
+    }
+
+
+def build_fragment(product):
+    related = (
+        Product.query
+        .options(joinedload(Product.category))
+        .filter(
+            Product.category_id == product.category_id,
+            Product.id != product.id,
+            Product.status == "ACTIVE"
+        )
+        .order_by(Product.created_at.desc())
+        .limit(RELATED_LIMIT)
+        .all()
+    )
+
+    # first page only → the rest is fetched on scroll (/api reviews)
+    reviews = ReviewService.page(product.id)
+
+    return {
+        "product": _product_data(product),
+        "related_products": [_product_data(p) for p in related],
+        "reviews": [ReviewService.serialize(r) for r in reviews.items],
+        "reviews_next_cursor": reviews.next_cursor,
+        "rating_breakdown": product.rating_histogram,
+    }
+
+
+# --------------------------------------------------
+# PUBLIC API
+# --------------------------------------------------
+def get_product_fragment(product_id):
+    """
+    Cached fragment for an ACTIVE product, or None (→ 404).
+    """
+    cache = get_cache()
+    key = f"{KEY_PREFIX}{product_id}"
+
+    fragment = cache.get(key)
+    if fragment is not None:
+        return fragment
+
+    product = (
+        Product.query
+        .options(joinedload(Product.category))
+        .filter_by(id=product_id, status="ACTIVE")
+        .first()
+    )
+
+    if product is None:
+        return None
+
+    fragment = build_fragment(product)
+    cache.set(key, fragment)
+
+    return fragment
+
+
+def invalidate_product(product_id):
+    get_cache().delete(f"{KEY_PREFIX}{product_id}")
+
+
+def stats():
+    cache = get_cache()
+    total = cache.hits + cache.misses
+
+    return {
+        "backend": cache.name,
+        "entries": cache.size(),
+        "ttl": cache.ttl,
+        "hits": cache.hits,
+        "misses": cache.misses,
+        "invalidations": cache.invalidations,
+        "hit_rate": round(cache.hits / total, 4) if total else 0.0,
+    }
@@ -0,0 +1,119 @@
+"""
+Product Rating Aggregates
+=========================
+Reviews keep `rating_sum` / `rating_count` / `rating_N_count` on
+products up to date by delta (ProductReview mapper events).
+
+This module only does the bulk reconciliation that repairs drift
+left by writes that bypass the ORM (raw SQL, bulk query.update()).
+"""
+
+from sqlalchemy import func, update
+
+from app.extensions import db, scheduler
+from app.models import Product, ProductReview, RATING_FIELDS
+
+
+RECONCILE_BATCH_SIZE = 500
+
+
+class RatingService:
+    """
+    Bulk recompute of product rating aggregates
+    Used by scheduler job / CLI
+    """
+
+    @staticmethod
+    def star_counts(product_ids):
+        """
+        {product_id: {star: count}} over approved, non-deleted ratings
+        (ONE grouped query for the whole batch)
+        """
+        rows = (
+            db.session.query(
+                ProductReview.product_id,
+                ProductReview.rating,
+                func.count(ProductReview.id)
+            )
+            .filter(
+                ProductReview.product_id.in_(product_ids),
+                ProductReview.is_active == True,
+                ProductReview.is_deleted == False,
+                ProductReview.rating.isnot(None)
+            )
+            .group_by(ProductReview.product_id, ProductReview.rating)
+            .all()
+        )
+
+        counts = {pid: {} for pid in product_ids}
+        for product_id, rating, count in rows:
+            counts[product_id][rating] = count
+
+        return counts
+
+    @staticmethod
+    def reconcile_batch(products):
+        """
+        products → (id, *RATING_FIELDS) rows
+        Returns number of products that had drifted.
+        """
+        counts = RatingService.star_counts([p.id for p in products])
+        fixes = []
+
+        for product in products:
+            expected = Product.rating_aggregates(counts[product.id])
+
+            stored = {field: getattr(product, field) for field in RATING_FIELDS}
+
+            if stored != expected:
+                fixes.append({"id": product.id, **expected})
+
+        if fixes:
+            db.session.execute(update(Product), fixes)
+
+        return len(fixes)
+
+    @staticmethod
+    def reconcile(batch_size=RECONCILE_BATCH_SIZE):
+        """
+        Walks all products in id order (keyset batches).
+        Returns {"checked": n, "fixed": n}
+        """
+        columns = [Product.id] + [getattr(Product, f) for f in RATING_FIELDS]
+
+        checked = fixed = 0
+        last_id = 0
+
+        while True:
+            batch = (
+                db.session.query(*columns)
+                .filter(Product.id > last_id)
+                .order_by(Product.id)
+                .limit(batch_size)
+                .all()
+            )
+
+            if not batch:
+                break
+
+            fixed += RatingService.reconcile_batch(batch)
+            db.session.commit()
+
+            checked += len(batch)
+            last_id = batch[-1].id
+
+        return {"checked": checked, "fixed": fixed}
+
+
+# --------------------------------------------------
+# SCHEDULER JOB
+# --------------------------------------------------
+def reconcile_rating_aggregates():
+    """
+    Runs via scheduler (outside any request)
+    """
+    with scheduler.app.app_context():
+        try:
+            RatingService.reconcile()
+        finally:
+            db.session.remove()
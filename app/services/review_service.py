@@ -0,0 +1,115 @@
+"""
+Product Review Pages
+====================
+Cursor-paginated approved reviews for the PDP and /api reviews.
+
+Sorts (all seek on the product's approved-review index range):
+- newest  → id DESC (ids are issued in created_at order, so this is
+            served by idx_review_product_active + the primary key)
+- helpful → helpful_count DESC, id DESC
+- rating  → rating DESC, id DESC
+"""
+
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
+
+from app.extensions import db
+from app.models import ProductReview, ReviewHelpfulVote
+from app.utils.pagination import KeysetColumn, keyset_paginate
+
+
+REVIEWS_PER_PAGE = 10
+MAX_REVIEWS_PER_PAGE = 50
+
+REVIEW_SORTS = {
+    "newest": [
+        KeysetColumn(ProductReview.id, descending=True),
+    ],
+    "helpful": [
+        KeysetColumn(ProductReview.helpful_count, descending=True),
+        KeysetColumn(ProductReview.id, descending=True),
+    ],
+    "rating": [
+        KeysetColumn(ProductReview.rating, descending=True, null_as=0),
+        KeysetColumn(ProductReview.id, descending=True),
+    ],
+}
+
+DEFAULT_SORT = "newest"
+
+
+class ReviewService:
+    """
+    Approved review listing + helpful votes
+    Used by PDP (first page) / reviews API (next pages)
+    """
+
+    @staticmethod
+    def approved_query(product_id):
+        return (
+            ProductReview.query
+            .options(joinedload(ProductReview.user))
+            .filter(
+                ProductReview.product_id == product_id,
+                ProductReview.is_active == True,
+                ProductReview.is_deleted == False,
+                ProductReview.review_text.isnot(None)
+            )
+        )
+
+    @staticmethod
+    def page(product_id, sort=DEFAULT_SORT, cursor=None, per_page=REVIEWS_PER_PAGE):
+        """
+        KeysetPagination of approved reviews (no COUNT query)
+        """
+        keys = REVIEW_SORTS.get(sort, REVIEW_SORTS[DEFAULT_SORT])
+        per_page = max(1, min(per_page, MAX_REVIEWS_PER_PAGE))
+
+        return keyset_paginate(
+            ReviewService.approved_query(product_id),
+            keys,
+            cursor=cursor,
+            per_page=per_page,
+            total="none"
+        )
+
+    @staticmethod
+    def serialize(review):
+        """
+        Plain dict for the PDP cache / review card template
+        """
+        return {
+            "id": review.id,
+            "user_id": review.user_id,
+            "review_text": review.review_text,
+            "rating": review.rating,
+            "helpful_count": review.helpful_count or 0,
+            "created_at": review.created_at,
+            "user": {"username": review.user.username if review.user else "—"},
+        }
+
+    # --------------------------------------------------
+    # HELPFUL VOTES
+    # --------------------------------------------------
+    @staticmethod
+    def mark_helpful(review, user_id):
+        """
+        Returns True if the vote counted, False if already voted.
+        """
+        try:
+            db.session.add(ReviewHelpfulVote(review_id=review.id, user_id=user_id))
+            db.session.flush()
+        except IntegrityError:
+            db.session.rollback()
+            return False
+
+        db.session.execute(
+            update(ProductReview)
+            .where(ProductReview.id == review.id)
+            .values(helpful_count=ProductReview.helpful_count + 1)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+
+        return True
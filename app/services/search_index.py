@@ -0,0 +1,449 @@
+"""
+Product Search Index
+====================
+Pluggable full-text search for the product catalogue.
+
+Backends:
+- mysql  → native FULLTEXT index (MATCH ... AGAINST, boolean mode)
+- memory → in-process inverted index (SQLite / dev / tests); rebuilt
+           every SEARCH_INDEX_REBUILD_SECONDS so edits made by other
+           workers show up; keeps the best SEARCH_MAX_CANDIDATES ids
+           and reports a cut through `search_truncated()`
+- like   → legacy ILIKE '%q%' scan (fallback only)
+
+All callers go through `apply_search(query, q)` so the
+routes never care which backend is active.
+"""
+
+import heapq
+import math
+import re
+import threading
+import time
+from bisect import bisect_left
+
+from flask import current_app, g
+from sqlalchemy import case, false
+from sqlalchemy.dialects.mysql import match
+
+from app.extensions import db
+from app.models import Product
+
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# MySQL ignores FULLTEXT tokens shorter than innodb_ft_min_token_size (3)
+MYSQL_MIN_TOKEN_SIZE = 3
+
+LIKE_ESCAPE = "\\"
+
+
+# --------------------------------------------------
+# TOKENIZER (SHARED BY ALL BACKENDS)
+# --------------------------------------------------
+def tokenize(text):
+    """
+    Lowercase alpha-numeric tokens.
+    "Galaxy S24-Ultra" → ["galaxy", "s24", "ultra"]
+    """
+    if not text:
+        return []
+    return TOKEN_RE.findall(text.lower())
+
+
+def escape_like(text):
+    """
+    User text as a LIKE literal: "50%_off" → "50\\%\\_off"
+    (use with escape=LIKE_ESCAPE).
+    """
+    return (
+        text.replace(LIKE_ESCAPE, LIKE_ESCAPE * 2)
+        .replace("%", LIKE_ESCAPE + "%")
+        .replace("_", LIKE_ESCAPE + "_")
+    )
+
+
+# --------------------------------------------------
+# BASE BACKEND
+# --------------------------------------------------
+class SearchBackend:
+    name = "base"
+
+    def apply(self, query, q, rank=True):
+        """
+        Restrict a Product query to rows matching `q`.
+        If rank=True, results are ordered by relevance first.
+        """
+        raise NotImplementedError
+
+    # incremental hooks (no-op for DB backed engines)
+    def index_product(self, product):
+        pass
+
+    def remove_product(self, product_id):
+        pass
+
+
+# --------------------------------------------------
+# LEGACY LIKE BACKEND (FALLBACK)
+# --------------------------------------------------
+class LikeBackend(SearchBackend):
+    name = "like"
+
+    def apply(self, query, q, rank=True):
+        return query.filter(
+            Product.name.ilike(f"%{escape_like(q)}%", escape=LIKE_ESCAPE)
+        )
+
+
+# --------------------------------------------------
+# MYSQL FULLTEXT BACKEND
+# --------------------------------------------------
+class MySQLFulltextBackend(SearchBackend):
+    """
+    Uses the `ft_products_name` FULLTEXT index.
+    Every token is required and prefix-matched:
+        "galaxy ph" → +galaxy* +ph*
+    """
+    name = "mysql"
+
+    def apply(self, query, q, rank=True):
+        tokens = tokenize(q)
+
+        if not tokens:
+            return query.filter(false())
+
+        # Short tokens never reach the FULLTEXT index → anchored prefix LIKE
+        # (still served by idx_products_name, no leading wildcard)
+        if all(len(t) < MYSQL_MIN_TOKEN_SIZE for t in tokens):
+            return query.filter(
+                Product.name.like(f"{escape_like(q)}%", escape=LIKE_ESCAPE)
+            )
+
+        against = " ".join(
+            f"+{t}*" for t in tokens if len(t) >= MYSQL_MIN_TOKEN_SIZE
+        )
+
+        score = match(Product.name, against=against).in_boolean_mode()
+
+        query = query.filter(score > 0)
+
+        if rank:
+            query = query.order_by(score.desc())
+
+        return query
+
+
+# --------------------------------------------------
+# IN-PROCESS INVERTED INDEX
+# --------------------------------------------------
+class InvertedIndex:
+    """
+    token → {product_id} postings with prefix expansion.
+
+    Ranking (per query token, AND semantics):
+        exact token hit  → idf
+        prefix token hit → idf * PREFIX_WEIGHT
+        name starts with full query → START_BONUS
+    """
+
+    PREFIX_WEIGHT = 0.6
+    START_BONUS = 0.5
+
+    def __init__(self):
+        self._postings = {}
+        self._doc_tokens = {}
+        self._doc_names = {}
+        self._vocab = []
+        self._vocab_dirty = False
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._doc_tokens)
+
+    # ---------------- WRITE PATH ----------------
+    def build(self, rows):
+        """
+        Full rebuild from (product_id, name) pairs.
+        Built aside, then swapped in → searches keep using the old
+        postings meanwhile.
+        """
+        fresh = InvertedIndex()
+        for product_id, name in rows:
+            fresh._add(product_id, name)
+
+        vocab = sorted(fresh._postings)
+
+        with self._lock:
+            self._postings = fresh._postings
+            self._doc_tokens = fresh._doc_tokens
+            self._doc_names = fresh._doc_names
+            self._vocab = vocab
+            self._vocab_dirty = False
+
+    def add(self, product_id, name):
+        with self._lock:
+            self._remove(product_id)
+            self._add(product_id, name)
+            self._vocab_dirty = True
+
+    def remove(self, product_id):
+        with self._lock:
+            if self._remove(product_id):
+                self._vocab_dirty = True
+
+    def _add(self, product_id, name):
+        tokens = set(tokenize(name))
+
+        for token in tokens:
+            self._postings.setdefault(token, set()).add(product_id)
+
+        self._doc_tokens[product_id] = tokens
+        self._doc_names[product_id] = (name or "").lower()
+
+    def _remove(self, product_id):
+        tokens = self._doc_tokens.pop(product_id, None)
+        self._doc_names.pop(product_id, None)
+
+        if tokens is None:
+            return False
+
+        for token in tokens:
+            ids = self._postings.get(token)
+            if ids is None:
+                continue
+            ids.discard(product_id)
+            if not ids:
+                del self._postings[token]
+
+        return True
+
+    # ---------------- READ PATH ----------------
+    def _expand_prefix(self, prefix):
+        if self._vocab_dirty:
+            self._vocab = sorted(self._postings)
+            self._vocab_dirty = False
+
+        start = bisect_left(self._vocab, prefix)
+        expanded = []
+
+        for token in self._vocab[start:]:
+            if not token.startswith(prefix):
+                break
+            if token != prefix:
+                expanded.append(token)
+
+        return expanded
+
+    def _idf(self, token, total):
+        return math.log(1 + total / len(self._postings[token]))
+
+    def search(self, q, limit=None):
+        """
+        Returns product ids ordered by relevance (best first).
+        """
+        return self.ranked(q, limit=limit)[0]
+
+    def ranked(self, q, limit=None):
+        """
+        → (product ids best first, matches before `limit` was applied)
+        """
+        tokens = tokenize(q)
+        if not tokens:
+            return [], 0
+
+        with self._lock:
+            total = len(self._doc_tokens) or 1
+            per_token_scores = []
+
+            for token in dict.fromkeys(tokens):
+                scores = {}
+
+                if token in self._postings:
+                    weight = self._idf(token, total)
+                    for pid in self._postings[token]:
+                        scores[pid] = weight
+
+                for expanded in self._expand_prefix(token):
+                    weight = self._idf(expanded, total) * self.PREFIX_WEIGHT
+                    for pid in self._postings[expanded]:
+                        if scores.get(pid, 0) < weight:
+                            scores[pid] = weight
+
+                if not scores:
+                    return [], 0
+
+                per_token_scores.append(scores)
+
+            # AND semantics → intersect starting from the rarest token
+            per_token_scores.sort(key=len)
+            candidates = set(per_token_scores[0])
+            for scores in per_token_scores[1:]:
+                candidates.intersection_update(scores)
+                if not candidates:
+                    return [], 0
+
+            phrase = q.strip().lower()
+            ranked = []
+
+            for pid in candidates:
+                score = sum(s[pid] for s in per_token_scores)
+                if self._doc_names.get(pid, "").startswith(phrase):
+                    score += self.START_BONUS
+                ranked.append((score, pid))
+
+        matched = len(ranked)
+
+        # best score first, newest id breaks ties
+        if limit is not None:
+            ranked = heapq.nlargest(limit, ranked)
+        else:
+            ranked.sort(reverse=True)
+
+        return [pid for _, pid in ranked], matched
+
+
+class InMemoryBackend(SearchBackend):
+    """
+    Lazily built from ACTIVE products on first use, kept fresh through
+    index_product / remove_product in this worker, and rebuilt in full
+    once older than `rebuild_seconds` (edits made by other workers).
+    """
+    name = "memory"
+
+    def __init__(self, max_candidates=1000, rebuild_seconds=300):
+        self.index = InvertedIndex()
+        self.max_candidates = max_candidates
+        self.rebuild_seconds = rebuild_seconds
+        self._loaded_at = None
+        self._load_lock = threading.Lock()
+
+    @property
+    def _loaded(self):
+        return self._loaded_at is not None
+
+    @property
+    def is_stale(self):
+        if not self._loaded:
+            return True
+        return time.monotonic() - self._loaded_at > self.rebuild_seconds
+
+    def ensure_loaded(self):
+        if not self.is_stale:
+            return
+
+        # first build: everyone waits; rebuild: one request does it,
+        # the others keep searching the current index
+        if not self._load_lock.acquire(blocking=not self._loaded):
+            return
+
+        try:
+            if not self.is_stale:
+                return
+
+            rows = (
+                db.session.query(Product.id, Product.name)
+                .filter(Product.status == "ACTIVE")
+                .all()
+            )
+            self.index.build(rows)
+            self._loaded_at = time.monotonic()
+
+        finally:
+            self._load_lock.release()
+
+    def search_ids(self, q, limit=None):
+        self.ensure_loaded()
+
+        ids, matched = self.index.ranked(q, limit=limit or self.max_candidates)
+
+        # not silent: routes show "N+" results (search_truncated)
+        g.search_truncated = (matched, len(ids)) if matched > len(ids) else None
+
+        return ids
+
+    def apply(self, query, q, rank=True):
+        ids = self.search_ids(q)
+
+        if not ids:
+            return query.filter(false())
+
+        query = query.filter(Product.id.in_(ids))
+
+        if rank:
+            position = {pid: pos for pos, pid in enumerate(ids)}
+            query = query.order_by(case(position, value=Product.id))
+
+        return query
+
+    def index_product(self, product):
+        if not self._loaded:
+            return  # picked up by the first full build
+
+        if product.status == "ACTIVE":
+            self.index.add(product.id, product.name)
+        else:
+            self.index.remove(product.id)
+
+    def remove_product(self, product_id):
+        if self._loaded:
+            self.index.remove(product_id)
+
+
+# --------------------------------------------------
+# BACKEND RESOLUTION (PER APP)
+# --------------------------------------------------
+BACKENDS = {
+    "mysql": MySQLFulltextBackend,
+    "memory": InMemoryBackend,
+    "like": LikeBackend,
+}
+
+
+def _create_backend():
+    name = current_app.config.get("SEARCH_BACKEND", "auto")
+
+    if name == "auto":
+        name = "mysql" if db.engine.dialect.name == "mysql" else "memory"
+
+    if name == "memory":
+        return InMemoryBackend(
+            max_candidates=current_app.config.get("SEARCH_MAX_CANDIDATES", 1000),
+            rebuild_seconds=current_app.config.get("SEARCH_INDEX_REBUILD_SECONDS", 300)
+        )
+
+    backend_cls = BACKENDS.get(name, LikeBackend)
+    return backend_cls()
+
+
+def get_search_backend():
+    backend = current_app.extensions.get("search_index")
+
+    if backend is None:
+        backend = _create_backend()
+        current_app.extensions["search_index"] = backend
+
+    return backend
+
+
+# --------------------------------------------------
+# PUBLIC HELPERS (USED BY ROUTES)
+# --------------------------------------------------
+def apply_search(query, q, rank=True):
+    return get_search_backend().apply(query, q, rank=rank)
+
+
+def search_truncated():
+    """
+    (matches, kept) when a search in this request had more matches than
+    SEARCH_MAX_CANDIDATES (only the best `kept` are listed), else None.
+    """
+    return g.get("search_truncated")
+
+
+def index_product(product):
+    get_search_backend().index_product(product)
+
+
+def remove_product(product_id):
+    get_search_backend().remove_product(product_id)
@@ -1,6 +1,6 @@
 from datetime import datetime, timedelta
-from sqlalchemy import func
-from app.models import AdminActivityLog
+from app.models import AuditRollup
+from app.services.audit_rollup_service import hour_bucket, events_where
 from app.services.risk_trend_service import RiskTrendService
 from app.services.confidence_score_service import ConfidenceScoreService
 from app.services.governance_rule_service import GovernanceRuleService
@@ -12,20 +12,31 @@ class SecurityHealthService:
     @staticmethod
     def analyze_last_24h(db):
         now = datetime.utcnow()
-        last_24h = now - timedelta(hours=24)
+        # hour buckets (audit_rollups granularity)
+        last_24h = hour_bucket(now - timedelta(hours=24))
         prev_24h = last_24h - timedelta(hours=24)
 
         # ----------------------------
         # STEP-1 : RAW COUNTS (READ-ONLY)
+        # audit_rollups, one aggregate query
         # ----------------------------
-        last_count = db.session.query(func.count(AdminActivityLog.id)) \
-            .filter(AdminActivityLog.created_at >= last_24h).scalar() or 0
-
-        prev_count = db.session.query(func.count(AdminActivityLog.id)) \
-            .filter(
-                AdminActivityLog.created_at >= prev_24h,
-                AdminActivityLog.created_at < last_24h
-            ).scalar() or 0
+        counts = db.session.query(
+            events_where(AuditRollup.hour >= last_24h),
+            events_where(
+                AuditRollup.hour >= prev_24h,
+                AuditRollup.hour < last_24h
+            ),
+            events_where(
+                AuditRollup.is_bulk.is_(True),
+                AuditRollup.hour >= last_24h
+            ),
+            events_where(
+                AuditRollup.actor_type == "SYSTEM",
+                AuditRollup.hour >= last_24h
+            )
+        ).filter(AuditRollup.hour >= prev_24h).one()
+
+        last_count, prev_count, bulk_count, system_events = (int(c) for c in counts)
 
         # ----------------------------
         # STEP-2 : RISK TREND VALIDATION
@@ -35,12 +46,6 @@ class SecurityHealthService:
             last_count
         )
 
-        bulk_count = db.session.query(func.count(AdminActivityLog.id)) \
-            .filter(
-                AdminActivityLog.is_bulk.is_(True),
-                AdminActivityLog.created_at >= last_24h
-            ).scalar() or 0
-
         prev_bulk_count = max(0, bulk_count - 2)
 
         bulk_status = RiskTrendService.classify_trend(
@@ -48,12 +53,6 @@ class SecurityHealthService:
             bulk_count
         )
 
-        system_events = db.session.query(func.count(AdminActivityLog.id)) \
-            .filter(
-                AdminActivityLog.actor_type == "SYSTEM",
-                AdminActivityLog.created_at >= last_24h
-            ).scalar() or 0
-
         prev_system_events = max(0, system_events - 1)
 
         automation_status = RiskTrendService.classify_trend(
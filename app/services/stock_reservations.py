@@ -0,0 +1,232 @@
+"""
+Stock Reservations (Time-Limited Cart Holds)
+============================================
+Adding to / changing a cart used to only *check* `products.stock`, so in
+a sale many users carried the last units and all but one failed at
+checkout.
+
+Now a logged-in cart line also holds its quantity in
+`stock_reservations` (one row per user & product, absolute quantity)
+until STOCK_RESERVATION_MINUTES pass without the line being touched:
+
+- available(product, user) = stock − active holds of OTHER users
+  → read path is one indexed SUM, no row lock on the product
+- reserve() (write path) locks the product row FOR UPDATE so two
+  reservers can never hold more than the stock together; it runs in the
+  caller's session → the hold commits / rolls back with the cart change
+- sharded (hot SKU) products never lock the products row here: holds
+  are partitioned over the shards and only the user's home shard is
+  locked (stock_shards.reserve_room)
+- checkout's conditional stock UPDATE subtracts other users' active
+  holds and deletes the buyer's holds in the same transaction
+- expired holds are ignored by every query right away; the sweeper only
+  deletes them in bulk (every minute)
+
+Guest (session) carts hold nothing; their lines are checked against
+`available` like everybody else's.
+"""
+
+from datetime import timedelta
+
+from flask import current_app
+from sqlalchemy import select, delete, func
+
+from app.extensions import db, scheduler
+from app.models import Product, StockReservation
+from app.services.stock_shards import live_stocks, reserve_room
+from app.utils.time_utils import utc_now
+
+
+SWEEP_BATCH_SIZE = 1000
+
+
+def reservation_ttl():
+    return timedelta(minutes=current_app.config.get("STOCK_RESERVATION_MINUTES", 15))
+
+
+def _naive_now():
+    # DATETIME columns are naive UTC
+    return utc_now().replace(tzinfo=None)
+
+
+def _active(now=None):
+    now = now.replace(tzinfo=None) if now else _naive_now()
+    return StockReservation.expires_at > now
+
+
+# --------------------------------------------------
+# READ PATH (NO LOCKS)
+# --------------------------------------------------
+def held_quantities(product_ids, exclude_user_id=None):
+    """
+    {product_id: units held by active reservations}
+    """
+    product_ids = list(product_ids)
+    if not product_ids:
+        return {}
+
+    query = (
+        db.session.query(StockReservation.product_id, func.sum(StockReservation.quantity))
+        .filter(StockReservation.product_id.in_(product_ids), _active())
+    )
+
+    if exclude_user_id is not None:
+        query = query.filter(StockReservation.user_id != exclude_user_id)
+
+    return {
+        product_id: int(held or 0)
+        for product_id, held in query.group_by(StockReservation.product_id)
+    }
+
+
+def available_quantities(products, user_id=None):
+    """
+    {product_id: stock − holds of other users} (never below 0).
+    The user's own hold is part of what they can have.
+    """
+    held = held_quantities((p.id for p in products), exclude_user_id=user_id)
+    stocks = live_stocks(products)
+
+    return {
+        p.id: max(0, stocks[p.id] - held.get(p.id, 0))
+        for p in products
+    }
+
+
+def available_quantity(product, user_id=None):
+    return available_quantities([product], user_id)[product.id]
+
+
+def others_held_subquery(product_id_column, user_id, now=None):
+    """
+    Correlated scalar subquery (for UPDATE ... WHERE): units held by
+    other users' active reservations of that product.
+    """
+    return (
+        select(func.coalesce(func.sum(StockReservation.quantity), 0))
+        .where(
+            StockReservation.product_id == product_id_column,
+            StockReservation.user_id != user_id,
+            _active(now)
+        )
+        .scalar_subquery()
+    )
+
+
+# --------------------------------------------------
+# WRITE PATH (CALLER COMMITS)
+# --------------------------------------------------
+def _room(user_id, product_id, quantity):
+    """
+    Units the user may hold, under the lock that serialises the
+    product's reservers (products row, or the user's home shard).
+    """
+    sharded = db.session.execute(
+        select(Product.stock_sharded).where(Product.id == product_id)
+    ).scalar()
+
+    if not sharded:
+        stock, sharded = db.session.execute(
+            select(Product.stock, Product.stock_sharded)
+            .where(Product.id == product_id)
+            .with_for_update()
+        ).one()
+
+    if sharded:
+        # hot SKU: never the products row
+        return reserve_room(product_id, user_id, quantity)
+
+    held = held_quantities([product_id], exclude_user_id=user_id).get(product_id, 0)
+    return (stock or 0) - held
+
+
+def reserve(user_id, product, quantity):
+    """
+    Sets the user's hold on `product` to `quantity` (TTL restarts).
+    Returns False (nothing changed) if fewer units are available.
+    """
+    if quantity <= 0:
+        release(user_id, [product.id])
+        return True
+
+    now = _naive_now()
+
+    hold = StockReservation.query.filter_by(
+        user_id=user_id,
+        product_id=product.id
+    ).first()
+
+    # shrinking an active hold is always allowed (no lock needed)
+    growing = not hold or hold.expires_at <= now or quantity > hold.quantity
+
+    if growing and quantity > _room(user_id, product.id, quantity):
+        return False
+
+    if hold:
+        hold.quantity = quantity
+        hold.expires_at = now + reservation_ttl()
+    else:
+        db.session.add(StockReservation(
+            user_id=user_id,
+            product_id=product.id,
+            quantity=quantity,
+            expires_at=now + reservation_ttl()
+        ))
+
+    return True
+
+
+def release(user_id, product_ids=None):
+    """
+    Drops the user's holds (all, or only these products).
+    """
+    stmt = delete(StockReservation).where(StockReservation.user_id == user_id)
+
+    if product_ids is not None:
+        product_ids = list(product_ids)
+        if not product_ids:
+            return 0
+        stmt = stmt.where(StockReservation.product_id.in_(product_ids))
+
+    return db.session.execute(
+        stmt.execution_options(synchronize_session=False)
+    ).rowcount
+
+
+# --------------------------------------------------
+# SWEEPER (BULK DELETE OF EXPIRED HOLDS)
+# --------------------------------------------------
+def release_expired_reservations(batch_size=SWEEP_BATCH_SIZE):
+    now = _naive_now()
+    released = 0
+
+    while True:
+        ids = db.session.execute(
+            select(StockReservation.id)
+            .where(StockReservation.expires_at <= now)
+            .order_by(StockReservation.expires_at)
+            .limit(batch_size)
+        ).scalars().all()
+
+        if not ids:
+            break
+
+        released += db.session.execute(
+            delete(StockReservation)
+            .where(StockReservation.id.in_(ids), StockReservation.expires_at <= now)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.session.commit()
+
+    return released
+
+
+def release_expired_reservations_job():
+    """
+    Runs via scheduler (outside any request)
+    """
+    with scheduler.app.app_context():
+        try:
+            release_expired_reservations()
+        finally:
+            db.session.remove()
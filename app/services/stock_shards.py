@@ -0,0 +1,442 @@
+"""
+Stock Shards (Hot SKU Counters)
+===============================
+Every checkout of a product runs a conditional UPDATE on its single
+`products` row → in a flash sale hundreds of buyers queue behind ONE row
+lock and throughput collapses to one decrement at a time.
+
+A product can opt in to sharded stock (`products.stock_sharded`): its
+units are split over STOCK_SHARDS rows in `product_stock_shards` and
+
+- cart holds are partitioned too: a user's hold counts against shard
+  `user_id % shards` (their home shard), and every shard keeps
+  stock >= the active holds of its partition
+- reserve_room() (add to cart / quantity change) locks ONLY the user's
+  home shard; if it is short, all shards are locked in shard order and
+  free units are moved over → reservers never touch the products row
+- decrement() picks a random shard whose free units (stock − holds of
+  its partition, buyer excluded) cover the quantity and runs one
+  conditional UPDATE on it → concurrent buyers mostly lock DIFFERENT
+  rows, and a hold check and its decrement share one row lock
+- only when no single shard can cover it (or every try lost its race)
+  all shards are locked in shard order and drained (never oversells)
+- total stock = SUM over the shards (one indexed GROUP BY)
+- consolidate() (scheduler, every STOCK_SHARD_CONSOLIDATE_SECONDS) writes
+  the total back to `products.stock` and rebalances the shards (holds
+  first, then evenly), so a drained shard does not push buyers into the
+  slow path for long
+
+`products.stock` of a sharded product is a snapshot for listings /
+admin; Product.live_stock / is_in_stock / can_fulfill_quantity read the
+shards. `flask shard-stock <id> --shards N` / `--off` toggles a product.
+"""
+
+import random
+
+from flask import current_app
+from sqlalchemy import select, update, insert, delete, func
+
+from app.extensions import db, scheduler
+from app.models import Product, ProductStockShard, StockReservation
+from app.services import product_cache
+from app.utils.time_utils import utc_now
+
+
+DEFAULT_SHARDS = 8
+
+
+def shard_count():
+    return max(1, current_app.config.get("STOCK_SHARDS", DEFAULT_SHARDS))
+
+
+def split_stock(total, shards, held=None):
+    """
+    Spreads `total` units as evenly as possible: [4, 4, 3, 3] for 14 / 4.
+    With `held` ({shard: units held by its partition}) every shard covers
+    its holds first and only the rest is spread.
+    """
+    held = held or {}
+    left = max(0, total)
+    floor = []
+
+    for shard in range(shards):
+        cover = min(max(0, held.get(shard, 0)), left)
+        floor.append(cover)
+        left -= cover
+
+    base, extra = divmod(left, shards)
+    return [floor[i] + base + (1 if i < extra else 0) for i in range(shards)]
+
+
+def home_shard(user_id, shards):
+    """
+    Shard whose stock covers this user's holds.
+    """
+    return user_id % shards
+
+
+# --------------------------------------------------
+# READ PATH (NO LOCKS)
+# --------------------------------------------------
+def shard_totals(product_ids):
+    """
+    {product_id: SUM(shard stock)} — products without shards are missing.
+    """
+    product_ids = list(product_ids)
+    if not product_ids:
+        return {}
+
+    rows = db.session.execute(
+        select(ProductStockShard.product_id, func.sum(ProductStockShard.stock))
+        .where(ProductStockShard.product_id.in_(product_ids))
+        .group_by(ProductStockShard.product_id)
+    )
+
+    return {product_id: int(total or 0) for product_id, total in rows}
+
+
+def shard_total(product_id):
+    return shard_totals([product_id]).get(product_id, 0)
+
+
+def live_stocks(products):
+    """
+    {product_id: current units} for plain and sharded products alike
+    (one query for all sharded ones).
+    """
+    sharded = [p.id for p in products if p.stock_sharded]
+    totals = shard_totals(sharded)
+
+    return {
+        p.id: totals.get(p.id, 0) if p.stock_sharded else (p.stock or 0)
+        for p in products
+    }
+
+
+def _shards(product_id):
+    return db.session.execute(
+        select(ProductStockShard.id, ProductStockShard.stock)
+        .where(ProductStockShard.product_id == product_id)
+        .order_by(ProductStockShard.shard)
+    ).all()
+
+
+def _held_by_partition(product_id, shards, exclude_user_id=None):
+    """
+    {shard: units held by active holds of the users mapped to it}
+    """
+    partition = StockReservation.user_id % shards
+
+    query = (
+        select(partition, func.sum(StockReservation.quantity))
+        .where(
+            StockReservation.product_id == product_id,
+            StockReservation.expires_at > utc_now().replace(tzinfo=None)
+        )
+        .group_by(partition)
+    )
+
+    if exclude_user_id is not None:
+        query = query.where(StockReservation.user_id != exclude_user_id)
+
+    return {int(shard): int(held or 0) for shard, held in db.session.execute(query)}
+
+
+def _held_by_partition_subquery(product_id, shards, exclude_user_id=None):
+    # correlated to the shard row being updated
+    query = select(func.coalesce(func.sum(StockReservation.quantity), 0)).where(
+        StockReservation.product_id == product_id,
+        StockReservation.user_id % shards == ProductStockShard.shard,
+        StockReservation.expires_at > utc_now().replace(tzinfo=None)
+    )
+
+    if exclude_user_id is not None:
+        query = query.where(StockReservation.user_id != exclude_user_id)
+
+    return query.scalar_subquery()
+
+
+def _free_units(shards, held):
+    return [stock - held.get(i, 0) for i, (_, stock) in enumerate(shards)]
+
+
+# --------------------------------------------------
+# WRITE PATH (CALLER COMMITS)
+# --------------------------------------------------
+def _locked_shards(product_id):
+    # shard order → every full-lock path locks rows in the same order
+    return db.session.execute(
+        select(ProductStockShard.id, ProductStockShard.stock)
+        .where(ProductStockShard.product_id == product_id)
+        .order_by(ProductStockShard.shard)
+        .with_for_update()
+    ).all()
+
+
+def _move_units(shard_id, units):
+    db.session.execute(
+        update(ProductStockShard)
+        .where(ProductStockShard.id == shard_id)
+        .values(stock=ProductStockShard.stock + units)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def reserve_room(product_id, user_id, quantity):
+    """
+    Units `user_id` may hold on the product (their own hold included);
+    moves free units to their home shard when it is short. The caller
+    refuses / clamps if it returns less than `quantity`.
+    """
+    shards = _shards(product_id)
+    if not shards:
+        return 0
+
+    home = home_shard(user_id, len(shards))
+    held = _held_by_partition(product_id, len(shards), exclude_user_id=user_id)
+
+    # 1️⃣ FAST PATH: the home shard has room → lock that row only
+    if _free_units(shards, held)[home] >= quantity:
+        stock = db.session.execute(
+            select(ProductStockShard.stock)
+            .where(ProductStockShard.id == shards[home].id)
+            .with_for_update()
+        ).scalar()
+
+        held = _held_by_partition(product_id, len(shards), exclude_user_id=user_id)
+        return (stock or 0) - held.get(home, 0)
+
+    # 2️⃣ SLOW PATH: all shards locked, free units moved home
+    shards = _locked_shards(product_id)
+    if not shards:
+        return 0
+
+    home = home_shard(user_id, len(shards))
+    free = _free_units(shards, _held_by_partition(product_id, len(shards), exclude_user_id=user_id))
+    room = moved = free[home]
+
+    for i, (shard_id, _) in enumerate(shards):
+        if room >= quantity:
+            break
+        if i == home or free[i] <= 0:
+            continue
+
+        take = min(free[i], quantity - room)
+        _move_units(shard_id, -take)
+        room += take
+
+    if room != moved:
+        _move_units(shards[home].id, room - moved)
+
+    return room
+
+
+def decrement(product_id, quantity, user_id=None):
+    """
+    Takes `quantity` units from the product's shards without eating into
+    other users' active holds (`user_id` = the buyer, whose own hold is
+    released by the caller). Returns False (nothing taken) if fewer
+    units are free.
+    """
+    if quantity <= 0:
+        return True
+
+    shards = _shards(product_id)
+    if not shards:
+        return False
+
+    # 1️⃣ FAST PATH: one random shard that can cover it (plain read)
+    free = _free_units(shards, _held_by_partition(product_id, len(shards), user_id))
+    candidates = [shard_id for (shard_id, _), units in zip(shards, free) if units >= quantity]
+    random.shuffle(candidates)
+
+    # holds re-checked under the shard's row lock
+    others_held = _held_by_partition_subquery(product_id, len(shards), user_id)
+
+    for shard_id in candidates:
+        taken = db.session.execute(
+            update(ProductStockShard)
+            .where(
+                ProductStockShard.id == shard_id,
+                ProductStockShard.stock - others_held >= quantity
+            )
+            .values(stock=ProductStockShard.stock - quantity)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+
+        if taken == 1:
+            return True
+
+    # 2️⃣ SLOW PATH: spread over several shards, all locked
+    shards = _locked_shards(product_id)
+    free = _free_units(shards, _held_by_partition(product_id, len(shards), user_id))
+
+    if sum(max(0, units) for units in free) < quantity:
+        return False
+
+    left = quantity
+    for (shard_id, _), units in zip(shards, free):
+        take = min(left, max(0, units))
+        if not take:
+            continue
+
+        _move_units(shard_id, -take)
+
+        left -= take
+        if not left:
+            break
+
+    return True
+
+
+def set_stock(product_id, total):
+    """
+    Admin set the absolute stock of a sharded product → rewrite shards.
+    """
+    shards = _locked_shards(product_id)
+    held = _held_by_partition(product_id, len(shards))
+
+    for (shard_id, _), stock in zip(shards, split_stock(total, len(shards), held)):
+        db.session.execute(
+            update(ProductStockShard)
+            .where(ProductStockShard.id == shard_id)
+            .values(stock=stock)
+            .execution_options(synchronize_session=False)
+        )
+
+
+# --------------------------------------------------
+# ENABLE / DISABLE (COMMITS)
+# --------------------------------------------------
+def enable_sharding(product_id, shards=None):
+    """
+    Moves the product's stock into `shards` counter rows.
+    Already sharded → re-splits the live total over `shards` rows.
+    """
+    shards = max(1, shards or shard_count())
+
+    product = db.session.execute(
+        select(Product).where(Product.id == product_id).with_for_update()
+    ).scalar_one()
+
+    total = product.stock or 0
+    if product.stock_sharded:
+        total = sum(stock for _, stock in _locked_shards(product_id))
+
+    # the new partitions must cover their users' holds again
+    held = _held_by_partition(product_id, shards)
+
+    db.session.execute(
+        delete(ProductStockShard)
+        .where(ProductStockShard.product_id == product_id)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.execute(insert(ProductStockShard), [
+        {"product_id": product_id, "shard": shard, "stock": stock}
+        for shard, stock in enumerate(split_stock(total, shards, held))
+    ])
+
+    product.stock = total
+    product.stock_sharded = True
+    db.session.commit()
+
+    product_cache.invalidate_product(product_id)
+    return total
+
+
+def disable_sharding(product_id):
+    """
+    Folds the shards back into products.stock and drops them.
+    """
+    product = db.session.execute(
+        select(Product).where(Product.id == product_id).with_for_update()
+    ).scalar_one()
+
+    if not product.stock_sharded:
+        return product.stock
+
+    total = sum(stock for _, stock in _locked_shards(product_id))
+
+    db.session.execute(
+        delete(ProductStockShard)
+        .where(ProductStockShard.product_id == product_id)
+        .execution_options(synchronize_session=False)
+    )
+
+    product.stock = total
+    product.stock_sharded = False
+    db.session.commit()
+
+    product_cache.invalidate_product(product_id)
+    return total
+
+
+# --------------------------------------------------
+# CONSOLIDATION (SCHEDULER)
+# --------------------------------------------------
+def consolidate(product_ids=None):
+    """
+    For each sharded product (one short transaction each): locks the
+    shards, writes SUM → products.stock and evens the shards out (each
+    still covering its partition's holds).
+    Returns {product_id: total}.
+    """
+    if product_ids is None:
+        product_ids = db.session.execute(
+            select(Product.id).where(Product.stock_sharded == True)
+        ).scalars().all()
+
+    totals = {}
+
+    for product_id in product_ids:
+        try:
+            shards = _locked_shards(product_id)
+            if not shards:
+                db.session.rollback()
+                continue
+
+            stocks = [stock for _, stock in shards]
+            total = sum(stocks)
+            held = _held_by_partition(product_id, len(shards))
+            balanced = split_stock(total, len(shards), held)
+
+            if stocks != balanced:
+                for (shard_id, _), stock in zip(shards, balanced):
+                    db.session.execute(
+                        update(ProductStockShard)
+                        .where(ProductStockShard.id == shard_id)
+                        .values(stock=stock)
+                        .execution_options(synchronize_session=False)
+                    )
+
+            changed = db.session.execute(
+                update(Product)
+                .where(Product.id == product_id, Product.stock != total)
+                .values(stock=total)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+
+            db.session.commit()
+
+        except Exception:
+            db.session.rollback()
+            current_app.logger.exception("Stock shard consolidation failed (product %s)", product_id)
+            continue
+
+        if changed:
+            product_cache.invalidate_product(product_id)
+
+        totals[product_id] = total
+
+    return totals
+
+
+def consolidate_stock_shards_job():
+    """
+    Runs via scheduler (outside any request)
+    """
+    with scheduler.app.app_context():
+        try:
+            consolidate()
+        finally:
+            db.session.remove()
@@ -0,0 +1,154 @@
+"""
+Admin User / Login Activity Queries
+===================================
+Filters of the admin users list and a user's login history, parsed from
+request args (or the same args stored on an export job), so listing,
+streamed CSV and background exports always return the same rows.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import or_
+
+from app.models import User, LoginActivity
+from app.utils.time_utils import utc_now, ist_date_to_utc, to_ist
+
+
+USER_FILTER_ARGS = ("q", "status", "email_verified", "from_date", "to_date")
+LOGIN_FILTER_ARGS = ("q", "status", "from_date", "to_date")
+
+
+def filter_args(args, names):
+    """
+    Only the filter params (non-empty) → safe to store / put in URLs.
+    """
+    return {name: args.get(name) for name in names if args.get(name)}
+
+
+def _ist_day_start(value):
+    start_date = datetime.strptime(value, "%Y-%m-%d")
+    start_date = start_date.replace(hour=0, minute=0, second=0)
+    return ist_date_to_utc(start_date)
+
+
+def _ist_day_end(value):
+    end_date = datetime.strptime(value, "%Y-%m-%d")
+    end_date = end_date.replace(hour=23, minute=59, second=59)
+    return ist_date_to_utc(end_date)
+
+
+# --------------------------------------------------
+# USERS LIST
+# --------------------------------------------------
+def filter_users(query, args):
+    q = (args.get("q") or "").strip()
+    status = args.get("status") or ""
+    email_verified = args.get("email_verified")
+    from_date = args.get("from_date")
+    to_date = args.get("to_date")
+
+    # SEARCH
+    if q:
+        if q.isdigit():
+            query = query.filter(User.id == int(q))
+        else:
+            query = query.filter(User.email.ilike(f"%{q}%"))
+
+    # STATUS
+    if status == "active":
+        now = utc_now()
+        query = query.filter(
+            User.is_active.is_(True),
+            or_(
+                User.lock_until.is_(None),
+                User.lock_until <= now
+            )
+        )
+
+    elif status == "disabled":
+        query = query.filter(User.is_active.is_(False))
+
+    elif status == "locked":
+        now = utc_now()
+        query = query.filter(
+            User.lock_until.isnot(None),
+            User.lock_until > now
+        )
+
+    # EMAIL VERIFIED
+    if email_verified == "true":
+        query = query.filter(User.email_verified.is_(True))
+    elif email_verified == "false":
+        query = query.filter(User.email_verified.is_(False))
+
+    # DATE RANGE
+    if from_date:
+        query = query.filter(User.created_at >= _ist_day_start(from_date))
+
+    if to_date:
+        query = query.filter(User.created_at <= _ist_day_end(to_date))
+
+    return query
+
+
+# --------------------------------------------------
+# LOGIN HISTORY (ONE USER)
+# --------------------------------------------------
+def filter_login_activity(query, args):
+    q = (args.get("q") or "").strip()
+    status = args.get("status")
+    from_date = args.get("from_date")
+    to_date = args.get("to_date")
+
+    # SEARCH
+    if q:
+        query = query.filter(
+            or_(
+                LoginActivity.ip_address.ilike(f"%{q}%"),
+                LoginActivity.user_agent.ilike(f"%{q}%"),
+                LoginActivity.login_status.ilike(f"%{q}%")
+            )
+        )
+
+    # STATUS FILTER
+    if status:
+        query = query.filter(LoginActivity.login_status == status)
+
+    # DATE RANGE (FULL DAY – UTC SAFE)
+    if from_date:
+        query = query.filter(LoginActivity.created_at >= _ist_day_start(from_date))
+
+    if to_date:
+        query = query.filter(LoginActivity.created_at <= _ist_day_end(to_date))
+
+    return query
+
+
+# --------------------------------------------------
+# CSV ROWS
+# --------------------------------------------------
+USER_CSV_HEADER = ["ID", "Email", "Status", "Created Date", "Created Time"]
+LOGIN_CSV_HEADER = ["Date", "Time", "IP Address", "Device", "Status"]
+
+
+def user_csv_row(u):
+    created_date = ""
+    created_time = ""
+
+    if u.created_at:
+        ist_time = to_ist(u.created_at)
+        created_date = ist_time.strftime("%d %b %Y")
+        created_time = ist_time.strftime("%I:%M %p")
+
+    return [u.id, u.email, u.status, created_date, created_time]
+
+
+def login_activity_csv_row(log):
+    ist_time = to_ist(log.created_at)
+    return [
+        ist_time.strftime("%d %b %Y"),
+        ist_time.strftime("%I:%M %p"),
+        log.ip_address,
+        log.user_agent,
+        log.login_status
+    ]
@@ -4,6 +4,7 @@ from app.extensions import db
 from . import user_bp
 from datetime import datetime, timedelta
 from app.models import Order, OrderItem, Product, Wishlist, UserAddress, CartItem
+from app.services.identity_cache import invalidate_user
 from sqlalchemy.orm import joinedload
 
 
@@ -32,6 +33,7 @@ def account():
         current_user.gender = gender or None
 
         db.session.commit()
+        invalidate_user(current_user.id)
         flash("✅ Profile updated successfully", "success")
 
         return redirect(url_for("user.account"))
@@ -425,6 +427,7 @@ def change_password():
         # 🔐 INVALIDATE ALL SESSIONS
         current_user.session_version += 1
         db.session.commit()
+        invalidate_user(current_user.id)
 
         flash("✅ Password changed successfully. Please login again.", "success")
         return redirect(url_for("auth.logout"))
@@ -1,9 +1,6 @@
 from flask import request, session
-from datetime import timezone
-import uuid
 
-from app.extensions import db
-from app.models import AdminActivityLog
+from app.services.audit_writer import enqueue_audit_log
 
 
 # ==================================================
@@ -39,12 +36,13 @@ def log_admin_action(
     reason: str | None = None,
     *,
     actor_type: str = "admin",   # admin | system
-    is_bulk: bool = False
+    is_bulk: bool = False,
+    severity: str | None = None
 ):
     """
-    ✔ Immutable-safe
+    ✔ Immutable-safe (insert only)
     ✔ No timezone conflict
-    ✔ Model-driven defaults
+    ✔ Batched async write → never commits the caller's session
     ✔ UI / analytics consistent
     """
 
@@ -62,25 +60,17 @@ def log_admin_action(
         actor_type = "system"
 
     try:
-        severity = SEVERITY_MAP.get(action, "LOW")
-
-        log = AdminActivityLog(
+        enqueue_audit_log(
+            action,
             admin_id=admin_id if actor_type == "admin" else None,
-            action=action,
             target_user_id=target_user_id,
             actor_type=actor_type,
             is_bulk=is_bulk,
             ip_address=request.remote_addr if actor_type == "admin" else None,
             user_agent=request.headers.get("User-Agent") if actor_type == "admin" else None,
-            severity=severity,
+            severity=severity or SEVERITY_MAP.get(action, "LOW"),
             reason=reason,
-            # ❌ DO NOT pass created_at
-            # ❌ DO NOT pass log_ref
         )
 
-        db.session.add(log)
-        db.session.commit()
-
     except Exception as e:
-        db.session.rollback()
         print("⚠️ Admin Activity Log Error:", e)
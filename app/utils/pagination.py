@@ -0,0 +1,410 @@
+"""
+Keyset (Seek) Pagination
+========================
+OFFSET / LIMIT + COUNT(*) gets linearly slower on deep pages.
+Keyset mode seeks with `WHERE (sort_col, id) < (last_sort_col, last_id)`
+so every page costs the same, and the position travels as an
+opaque cursor token.
+
+Request params understood by `paginate_request`:
+    cursor=<token>   → keyset mode ("" = first page)
+    page=<n>         → classic OFFSET mode (default); its pages carry
+                       next_cursor / prev_cursor too, so "Next" from a
+                       numbered page continues in keyset mode
+    total=exact|approx|none
+        exact  → COUNT(*)
+        approx → COUNT over a LIMITed subquery (bounded cost)
+        none   → skip counting (OFFSET pages fetch per_page + 1 rows
+                 to know whether there is a next page)
+        anything else → the mode's default (exact / approx)
+"""
+
+import base64
+import json
+from datetime import datetime, date
+from decimal import Decimal
+
+from flask_sqlalchemy.pagination import QueryPagination
+from sqlalchemy import and_, or_, func, select, literal_column
+
+
+APPROX_COUNT_CAP = 10000
+
+TOTAL_MODES = ("exact", "approx", "none")
+
+
+# --------------------------------------------------
+# SORT KEY
+# --------------------------------------------------
+class KeysetColumn:
+    """
+    One column of the seek key.
+    null_as → value used for NULLs (keeps comparisons total).
+    """
+
+    def __init__(self, column, descending=False, null_as=None):
+        self.column = column
+        self.descending = descending
+        self.null_as = null_as
+        self.key = column.key
+
+    @property
+    def expr(self):
+        if self.null_as is None:
+            return self.column
+        return func.coalesce(self.column, self.null_as)
+
+    def order_by(self, reverse=False):
+        descending = self.descending != reverse
+        return self.expr.desc() if descending else self.expr.asc()
+
+    def value_of(self, item):
+        value = getattr(item, self.key)
+        return self.null_as if value is None else value
+
+
+# --------------------------------------------------
+# CURSOR ENCODING (OPAQUE TOKEN)
+# --------------------------------------------------
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"dec": str(value)}
+    return value
+
+
+_TAGGED = {
+    "dt": datetime.fromisoformat,
+    "d": date.fromisoformat,
+    "dec": Decimal,
+}
+
+
+def _decode_value(value):
+    """
+    Only what _encode_value produces: a scalar or ONE known tag with a
+    string → anything else raises ValueError (never reaches SQL).
+    """
+    if isinstance(value, dict):
+        if len(value) != 1:
+            raise ValueError("malformed cursor value")
+
+        tag, raw = next(iter(value.items()))
+        if tag not in _TAGGED or not isinstance(raw, str):
+            raise ValueError("malformed cursor value")
+
+        decoded = _TAGGED[tag](raw)
+        if isinstance(decoded, Decimal) and not decoded.is_finite():
+            raise ValueError("malformed cursor value")
+        return decoded
+
+    if isinstance(value, (str, int, float)):
+        return value
+
+    raise ValueError("malformed cursor value")
+
+
+def _signature(keys):
+    return ",".join(
+        f"{k.key}:{'d' if k.descending else 'a'}" for k in keys
+    )
+
+
+def encode_cursor(keys, item, direction="next"):
+    payload = {
+        "s": _signature(keys),
+        "dir": direction,
+        "v": [_encode_value(k.value_of(item)) for k in keys],
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token, keys):
+    """
+    Returns (values, direction) or (None, "next") for a
+    missing / malformed / foreign cursor (→ first page).
+    """
+    if not token:
+        return None, "next"
+
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+
+        if not isinstance(payload, dict) or payload.get("s") != _signature(keys):
+            return None, "next"
+
+        if not isinstance(payload.get("v"), list) or len(payload["v"]) != len(keys):
+            return None, "next"
+
+        values = [_decode_value(v) for v in payload["v"]]
+
+        direction = "prev" if payload.get("dir") == "prev" else "next"
+        return values, direction
+
+    except (ValueError, TypeError, KeyError, ArithmeticError):
+        # ArithmeticError: decimal.InvalidOperation
+        return None, "next"
+
+
+# --------------------------------------------------
+# SEEK PREDICATE
+# --------------------------------------------------
+def _seek_filter(keys, values, reverse=False):
+    """
+    (a, b, c) after (x, y, z) expanded for mixed directions:
+        a > x
+        OR (a = x AND b > y)
+        OR (a = x AND b = y AND c > z)
+    """
+    clauses = []
+
+    for i, key in enumerate(keys):
+        descending = key.descending != reverse
+        expr = key.expr
+
+        step = expr < values[i] if descending else expr > values[i]
+
+        equal_prefix = [
+            keys[j].expr == values[j] for j in range(i)
+        ]
+        clauses.append(and_(*equal_prefix, step))
+
+    return or_(*clauses)
+
+
+# --------------------------------------------------
+# TOTAL COUNT MODES
+# --------------------------------------------------
+def count_total(query, mode="exact", offset=0):
+    """
+    Returns (total, is_estimate)
+    """
+    if mode == "none":
+        return None, False
+
+    query = query.order_by(None)
+
+    if mode == "approx":
+        cap = offset + APPROX_COUNT_CAP
+        limited = query.with_entities(literal_column("1")).limit(cap).subquery()
+        total = query.session.execute(
+            select(func.count()).select_from(limited)
+        ).scalar()
+        return total, total >= cap
+
+    return query.count(), False
+
+
+# --------------------------------------------------
+# KEYSET PAGE OBJECT
+# --------------------------------------------------
+class KeysetPagination:
+    """
+    Drop-in for templates that use Flask-SQLAlchemy's Pagination:
+    items / total / has_next / has_prev / iter_pages()
+    plus next_cursor / prev_cursor.
+    """
+
+    is_keyset = True
+    page = None
+    prev_num = None
+    next_num = None
+
+    def __init__(self, items, per_page, next_cursor=None, prev_cursor=None,
+                 total=None, total_is_estimate=False):
+        self.items = items
+        self.per_page = per_page
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+        self.total = total
+        self.total_is_estimate = total_is_estimate
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self):
+        return self.prev_cursor is not None
+
+    @property
+    def pages(self):
+        if not self.total:
+            return 0
+        return -(-self.total // self.per_page)
+
+    def iter_pages(self, *args, **kwargs):
+        return iter(())
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+class LookaheadPagination(QueryPagination):
+    """
+    OFFSET page without COUNT(*): one extra row tells whether a next
+    page exists (total / pages stay unknown).
+    """
+
+    def _query_items(self):
+        query = self._query_args["query"]
+        rows = query.limit(self.per_page + 1).offset(self._query_offset).all()
+
+        self._has_more = len(rows) > self.per_page
+        return rows[:self.per_page]
+
+    @property
+    def has_next(self):
+        return self._has_more
+
+    @property
+    def next_num(self):
+        return self.page + 1 if self._has_more else None
+
+
+def seek_rows(query, keys, values=None, backwards=False, limit=21):
+    """
+    Up to `limit` rows after the cursor position, in seek order
+    (reversed sort when walking backwards).
+    """
+    page_query = query.order_by(None)
+
+    if values is not None:
+        page_query = page_query.filter(
+            _seek_filter(keys, values, reverse=backwards)
+        )
+
+    return (
+        page_query
+        .order_by(*[k.order_by(reverse=backwards) for k in keys])
+        .limit(limit)
+        .all()
+    )
+
+
+def build_keyset_page(rows, keys, per_page, values=None, backwards=False,
+                      total=None, total_is_estimate=False):
+    """
+    KeysetPagination from up to per_page + 1 rows in seek order.
+    Shared by keyset_paginate and merged (multi-source) listings.
+    """
+    has_more = len(rows) > per_page
+    rows = list(rows[:per_page])
+
+    if backwards:
+        rows.reverse()
+
+    next_cursor = prev_cursor = None
+
+    if rows:
+        if has_more or backwards:
+            next_cursor = encode_cursor(keys, rows[-1], "next")
+        if values is not None and (has_more or not backwards):
+            prev_cursor = encode_cursor(keys, rows[0], "prev")
+
+    return KeysetPagination(
+        rows,
+        per_page,
+        next_cursor=next_cursor,
+        prev_cursor=prev_cursor,
+        total=total,
+        total_is_estimate=total_is_estimate
+    )
+
+
+def keyset_paginate(query, keys, cursor=None, per_page=20, total="approx"):
+    """
+    Seek-paginate `query` (without ORDER BY) on `keys`.
+    The last key MUST be unique (usually the primary key).
+    """
+    values, direction = decode_cursor(cursor, keys)
+    backwards = values is not None and direction == "prev"
+
+    rows = seek_rows(query, keys, values, backwards, limit=per_page + 1)
+
+    total_count, is_estimate = count_total(query, total)
+
+    return build_keyset_page(
+        rows,
+        keys,
+        per_page,
+        values=values,
+        backwards=backwards,
+        total=total_count,
+        total_is_estimate=is_estimate
+    )
+
+
+# --------------------------------------------------
+# ONE ENTRY POINT FOR LISTING ROUTES
+# --------------------------------------------------
+def paginate_request(query, keys, args, per_page=20, keyset=True):
+    """
+    Chooses keyset or OFFSET pagination from request args.
+    `keys` also defines the ORDER BY in OFFSET mode.
+    keyset=False forces OFFSET mode (e.g. relevance ordering).
+    """
+    total_mode = args.get("total")
+    if total_mode not in TOTAL_MODES:
+        total_mode = None
+
+    if keyset and "cursor" in args:
+        return keyset_paginate(
+            query,
+            keys,
+            cursor=args.get("cursor"),
+            per_page=per_page,
+            total=total_mode or "approx"
+        )
+
+    page = args.get("page", 1, type=int)
+
+    if keys:
+        query = query.order_by(*[k.order_by() for k in keys])
+
+    total_mode = total_mode or "exact"
+
+    if total_mode == "none":
+        pagination = LookaheadPagination(
+            query=query,
+            page=page,
+            per_page=per_page,
+            max_per_page=None,
+            error_out=False,
+            count=False
+        )
+    else:
+        pagination = query.paginate(
+            page=page,
+            per_page=per_page,
+            error_out=False,
+            count=total_mode == "exact"
+        )
+
+    if total_mode == "approx":
+        pagination.total, pagination.total_is_estimate = count_total(
+            query, "approx", offset=(page - 1) * per_page
+        )
+
+    # cursors from the page edges → the next hop is a keyset seek
+    items = pagination.items
+    can_seek = keyset and keys and items
+
+    pagination.next_cursor = (
+        encode_cursor(keys, items[-1], "next")
+        if can_seek and pagination.has_next else None
+    )
+    pagination.prev_cursor = (
+        encode_cursor(keys, items[0], "prev")
+        if can_seek and pagination.has_prev else None
+    )
+
+    return pagination
@@ -0,0 +1,241 @@
+"""
+Shared Rate Limit Storage (SQL)
+===============================
+`memory://` keeps one counter set per gunicorn worker, so a
+"5 per hour" limit really allows 5 × workers, and counters for
+every IP ever seen stay in RAM.
+
+This registers a `limits` storage backed by the
+`rate_limit_counters` table (fixed-window counters):
+
+    RATELIMIT_STORAGE_URI = "sql+mysql+mysqlconnector://user:pw@host/zentro"
+    RATELIMIT_STORAGE_URI = "sql+sqlite:////tmp/ratelimit.db"
+
+It is the default: config.py sets "sql+" + SQLALCHEMY_DATABASE_URI, so
+every worker shares the app database's counters; `memory://` is an
+explicit opt-in for development / tests.
+
+- incr() is ONE atomic upsert per hit (window reset happens inside
+  the same statement) → exact counts across processes
+- expired windows are purged in batches every `purge_every` hits
+- runs on its own small engine, never touching the request session
+- the table comes from the migrations; only SQLite (dev) creates it on
+  first use
+
+For a Redis-protocol server (Redis / Valkey / KeyDB) the stock
+`redis://host:6379` scheme from `limits` is used as-is.
+"""
+
+import threading
+import time
+
+from limits.storage import Storage
+from sqlalchemy import create_engine, select, delete, case, func, literal
+from sqlalchemy.dialects import mysql, sqlite, postgresql
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.extensions import db
+
+
+# --------------------------------------------------
+# TABLE (owned by this storage, migrated with the app)
+# --------------------------------------------------
+rate_limit_counters = db.Table(
+    "rate_limit_counters",
+    db.Column("key", db.String(255), primary_key=True),
+    db.Column("count", db.Integer, nullable=False, default=0),
+    db.Column("expires_at", db.Double, nullable=False, index=True),
+)
+
+
+class SQLStorage(Storage):
+    """
+    Fixed-window counters in a SQL table.
+    """
+
+    STORAGE_SCHEME = [
+        "sql+mysql",
+        "sql+mysql+mysqlconnector",
+        "sql+mysql+pymysql",
+        "sql+sqlite",
+        "sql+postgresql",
+        "sql+postgresql+psycopg2",
+    ]
+
+    PURGE_EVERY = 1000
+    PURGE_BATCH_SIZE = 500
+
+    def __init__(self, uri, wrap_exceptions=False, purge_every=None,
+                 purge_batch_size=None, **options):
+        super().__init__(uri, wrap_exceptions=wrap_exceptions)
+
+        self.engine = create_engine(
+            uri[len("sql+"):],
+            pool_pre_ping=True,
+            **options
+        )
+        self.table = rate_limit_counters
+
+        self.purge_every = int(purge_every or self.PURGE_EVERY)
+        self.purge_batch_size = int(purge_batch_size or self.PURGE_BATCH_SIZE)
+
+        self._hits = 0
+        self._hits_lock = threading.Lock()
+
+        # dev / tests (SQLite) → create on first use, MySQL → migration
+        if self.engine.dialect.name == "sqlite":
+            self.table.create(self.engine, checkfirst=True)
+
+    @property
+    def base_exceptions(self):
+        return SQLAlchemyError
+
+    # --------------------------------------------------
+    # ATOMIC UPSERT (ONE STATEMENT PER HIT)
+    # --------------------------------------------------
+    def _upsert_mysql(self, conn, key, amount, now, expires_at):
+        t = self.table
+
+        stmt = mysql.insert(t).values(
+            key=key,
+            count=func.last_insert_id(amount),
+            expires_at=expires_at
+        )
+
+        # MySQL applies assignments left → right: count is set first,
+        # so the `expires_at` CASE still compares the OLD window end.
+        # LAST_INSERT_ID(expr) hands the new count back on this connection.
+        window_over = t.c.expires_at <= now
+
+        stmt = stmt.on_duplicate_key_update(
+            count=func.last_insert_id(
+                case((window_over, amount), else_=t.c.count + amount)
+            ),
+            expires_at=case((window_over, expires_at), else_=t.c.expires_at)
+        )
+
+        conn.execute(stmt)
+        return conn.execute(select(func.last_insert_id())).scalar()
+
+    def _upsert_returning(self, conn, dialect, key, amount, now, expires_at):
+        t = self.table
+
+        stmt = dialect.insert(t).values(
+            key=key,
+            count=amount,
+            expires_at=expires_at
+        )
+
+        # ON CONFLICT SET uses the pre-update row on SQLite / PostgreSQL
+        window_over = t.c.expires_at <= now
+
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[t.c.key],
+            set_={
+                "count": case((window_over, amount), else_=t.c.count + amount),
+                "expires_at": case((window_over, expires_at), else_=t.c.expires_at),
+            }
+        ).returning(t.c.count)
+
+        return conn.execute(stmt).scalar()
+
+    def incr(self, key, expiry, amount=1):
+        now = time.time()
+        expires_at = now + expiry
+
+        with self.engine.begin() as conn:
+            name = self.engine.dialect.name
+
+            if name == "mysql":
+                count = self._upsert_mysql(conn, key, amount, now, expires_at)
+            elif name == "postgresql":
+                count = self._upsert_returning(conn, postgresql, key, amount, now, expires_at)
+            else:
+                count = self._upsert_returning(conn, sqlite, key, amount, now, expires_at)
+
+        self._maybe_purge()
+
+        return int(count)
+
+    # --------------------------------------------------
+    # READS
+    # --------------------------------------------------
+    def _row(self, key):
+        with self.engine.connect() as conn:
+            return conn.execute(
+                select(self.table.c.count, self.table.c.expires_at)
+                .where(self.table.c.key == key)
+            ).first()
+
+    def get(self, key):
+        row = self._row(key)
+
+        if row is None or row.expires_at <= time.time():
+            return 0
+
+        return int(row.count)
+
+    def get_expiry(self, key):
+        row = self._row(key)
+        now = time.time()
+
+        if row is None or row.expires_at <= now:
+            return now
+
+        return float(row.expires_at)
+
+    def check(self):
+        try:
+            with self.engine.connect() as conn:
+                conn.execute(select(literal(1)))
+            return True
+        except SQLAlchemyError:
+            return False
+
+    # --------------------------------------------------
+    # CLEARING / EXPIRY PURGE
+    # --------------------------------------------------
+    def clear(self, key):
+        with self.engine.begin() as conn:
+            conn.execute(delete(self.table).where(self.table.c.key == key))
+
+    def reset(self):
+        with self.engine.begin() as conn:
+            return conn.execute(delete(self.table)).rowcount
+
+    def _maybe_purge(self):
+        with self._hits_lock:
+            self._hits += 1
+            if self._hits < self.purge_every:
+                return
+            self._hits = 0
+
+        self.purge_expired()
+
+    def purge_expired(self):
+        """
+        Deletes expired windows in batches (short locks, bounded table).
+        Returns rows removed.
+        """
+        removed = 0
+        now = time.time()
+
+        while True:
+            with self.engine.begin() as conn:
+                keys = conn.execute(
+                    select(self.table.c.key)
+                    .where(self.table.c.expires_at <= now)
+                    .limit(self.purge_batch_size)
+                ).scalars().all()
+
+                if not keys:
+                    return removed
+
+                conn.execute(
+                    delete(self.table).where(
+                        self.table.c.key.in_(keys),
+                        self.table.c.expires_at <= now
+                    )
+                )
+
+            removed += len(keys)
@@ -0,0 +1,390 @@
+"""
+Server-Side Sessions (SQL)
+==========================
+Flask's default session IS the cookie: the whole dict (guest cart,
+flashes, CSRF token, ...) is serialised + signed into it on every
+change, so the cookie grows with the guest cart and every request
+uploads it again.
+
+With SESSION_STORE = "sql" the cookie only carries a signed random
+session id; the data lives in `server_sessions`:
+
+- row key = SHA-256 of the id → a leaked table cannot be replayed as
+  cookies; a forged / garbage cookie fails the signature check before
+  any query
+- data = tagged JSON (same types as Flask's cookie session), zlib
+  compressed → one small BLOB
+- LAZY LOAD: the row is read on first access of the session, only
+  when the request carries a session cookie; static files get Flask's
+  null session (Flask-Login reads the session after every response,
+  which would otherwise load it for each asset)
+- WRITE ONLY IF DIRTY: one upsert when the session changed; an
+  unchanged session only gets its expiry pushed (UPDATE of one column)
+  once less than half of its TTL is left
+- TTL: PERMANENT_SESSION_LIFETIME for permanent sessions,
+  SERVER_SESSION_TTL_HOURS otherwise; expired rows are ignored at once
+  and deleted in batches by the sweeper job
+- regenerate_session() issues a new id (login → no session fixation)
+
+All reads / writes run on their own connection, never touching the
+request's db.session transaction.
+"""
+
+import hashlib
+import secrets
+import zlib
+from datetime import timedelta
+
+from flask import current_app, session as flask_session
+from flask.sessions import SessionInterface, SessionMixin, session_json_serializer
+from itsdangerous import Signer, BadSignature
+from sqlalchemy import select, update, delete
+from sqlalchemy.dialects import mysql, sqlite, postgresql
+from werkzeug.datastructures import CallbackDict
+
+from app.extensions import db, scheduler
+from app.utils.time_utils import utc_now
+
+
+SWEEP_BATCH_SIZE = 1000
+
+
+# --------------------------------------------------
+# TABLE (owned by this module, migrated with the app)
+# --------------------------------------------------
+server_sessions = db.Table(
+    "server_sessions",
+    db.Column("id", db.String(64), primary_key=True),
+    db.Column("data", db.LargeBinary, nullable=False),
+    db.Column("expires_at", db.DateTime, nullable=False, index=True),
+    db.Column("updated_at", db.DateTime, nullable=False),
+)
+
+
+def _naive_now():
+    # DATETIME columns are naive UTC
+    return utc_now().replace(tzinfo=None)
+
+
+def _row_key(sid):
+    return hashlib.sha256(sid.encode("utf-8")).hexdigest()
+
+
+def encode_session(data):
+    return zlib.compress(session_json_serializer.dumps(data).encode("utf-8"))
+
+
+def decode_session(blob):
+    return session_json_serializer.loads(zlib.decompress(blob).decode("utf-8"))
+
+
+# --------------------------------------------------
+# STORE (SQL)
+# --------------------------------------------------
+class SqlSessionStore:
+    """
+    Rows of `server_sessions`, on the app engine.
+    """
+
+    def __init__(self, table=server_sessions):
+        self.table = table
+
+    def load(self, key, now):
+        """
+        → (data, expires_at) or None (missing / expired / unreadable)
+        """
+        with db.engine.connect() as conn:
+            row = conn.execute(
+                select(self.table.c.data, self.table.c.expires_at)
+                .where(self.table.c.id == key, self.table.c.expires_at > now)
+            ).first()
+
+        if row is None:
+            return None
+
+        try:
+            return decode_session(row.data), row.expires_at
+        except (zlib.error, ValueError):
+            return None
+
+    def save(self, key, data, expires_at, now, drop_keys=()):
+        t = self.table
+        values = {"id": key, "data": encode_session(data), "expires_at": expires_at, "updated_at": now}
+
+        with db.engine.begin() as conn:
+            name = conn.dialect.name
+
+            if name == "mysql":
+                stmt = mysql.insert(t).values(**values)
+                stmt = stmt.on_duplicate_key_update(
+                    data=stmt.inserted.data,
+                    expires_at=stmt.inserted.expires_at,
+                    updated_at=stmt.inserted.updated_at
+                )
+            else:
+                dialect = postgresql if name == "postgresql" else sqlite
+                stmt = dialect.insert(t).values(**values)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[t.c.id],
+                    set_={
+                        "data": stmt.excluded.data,
+                        "expires_at": stmt.excluded.expires_at,
+                        "updated_at": stmt.excluded.updated_at,
+                    }
+                )
+
+            conn.execute(stmt)
+
+            if drop_keys:
+                conn.execute(delete(t).where(t.c.id.in_(list(drop_keys))))
+
+    def touch(self, key, expires_at, now):
+        with db.engine.begin() as conn:
+            conn.execute(
+                update(self.table)
+                .where(self.table.c.id == key)
+                .values(expires_at=expires_at, updated_at=now)
+            )
+
+    def delete(self, keys):
+        keys = [key for key in keys if key]
+        if not keys:
+            return
+
+        with db.engine.begin() as conn:
+            conn.execute(delete(self.table).where(self.table.c.id.in_(keys)))
+
+    def purge_expired(self, now, batch_size=SWEEP_BATCH_SIZE):
+        t = self.table
+        purged = 0
+
+        while True:
+            with db.engine.begin() as conn:
+                ids = conn.execute(
+                    select(t.c.id)
+                    .where(t.c.expires_at <= now)
+                    .limit(batch_size)
+                ).scalars().all()
+
+                if not ids:
+                    break
+
+                purged += conn.execute(
+                    delete(t).where(t.c.id.in_(ids), t.c.expires_at <= now)
+                ).rowcount
+
+        return purged
+
+
+# --------------------------------------------------
+# SESSION OBJECT (LAZY)
+# --------------------------------------------------
+class ServerSession(CallbackDict, SessionMixin):
+    """
+    Dict that loads its row on first access and tracks changes.
+    """
+
+    def __init__(self, sid=None, loader=None):
+        def on_update(self):
+            self.modified = True
+            self.accessed = True
+
+        super().__init__(None, on_update)
+
+        self.sid = sid
+        self.had_cookie = sid is not None
+        self.row_expires_at = None      # None → no stored row
+        self.drop_sids = []             # replaced ids (regenerate)
+        self.modified = False
+        self.accessed = False
+
+        self._loader = loader
+        self.loaded = loader is None
+
+    @property
+    def new(self):
+        return self.row_expires_at is None
+
+    def _ensure_loaded(self):
+        self.accessed = True
+
+        if self.loaded:
+            return
+
+        self.loaded = True
+        stored = self._loader()
+        self._loader = None
+
+        if stored is None:
+            # unknown / expired id → never reuse it
+            self.sid = None
+            return
+
+        data, self.row_expires_at = stored
+        dict.update(self, data)
+
+    def regenerate(self):
+        """
+        Same data under a new id (the old row is dropped on save).
+        """
+        self._ensure_loaded()
+
+        if self.sid:
+            self.drop_sids.append(self.sid)
+
+        self.sid = None
+        self.row_expires_at = None
+        self.modified = True
+
+
+def _lazy(name):
+    method = getattr(CallbackDict, name)
+
+    def wrapper(self, *args, **kwargs):
+        self._ensure_loaded()
+        return method(self, *args, **kwargs)
+
+    wrapper.__name__ = name
+    return wrapper
+
+
+for _name in (
+    "__getitem__", "__setitem__", "__delitem__", "__contains__", "__iter__",
+    "__len__", "__eq__", "__repr__", "get", "keys", "values", "items",
+    "pop", "popitem", "setdefault", "update", "clear", "copy"
+):
+    setattr(ServerSession, _name, _lazy(_name))
+
+
+# --------------------------------------------------
+# SESSION INTERFACE
+# --------------------------------------------------
+class SqlSessionInterface(SessionInterface):
+
+    salt = "zentro-server-session"
+
+    def __init__(self, store=None):
+        self.store = store or SqlSessionStore()
+
+    def _signer(self, app):
+        return Signer(app.secret_key, salt=self.salt, key_derivation="hmac")
+
+    def ttl(self, app, session):
+        if session.permanent:
+            return app.permanent_session_lifetime
+
+        return timedelta(hours=app.config.get("SERVER_SESSION_TTL_HOURS", 72))
+
+    # --------------------------------------------------
+    # OPEN (NO QUERY)
+    # --------------------------------------------------
+    def open_session(self, app, request):
+        if not app.secret_key:
+            return None
+
+        if app.static_url_path and request.path.startswith(app.static_url_path + "/"):
+            return self.make_null_session(app)
+
+        cookie = request.cookies.get(self.get_cookie_name(app))
+        if not cookie:
+            return ServerSession()
+
+        try:
+            sid = self._signer(app).unsign(cookie).decode("utf-8")
+        except (BadSignature, UnicodeDecodeError):
+            return ServerSession()
+
+        def loader():
+            return self.store.load(_row_key(sid), _naive_now())
+
+        return ServerSession(sid, loader)
+
+    # --------------------------------------------------
+    # SAVE (ONLY IF DIRTY)
+    # --------------------------------------------------
+    def save_session(self, app, session, response):
+        if session.accessed:
+            response.vary.add("Cookie")
+
+        # never touched this request → no query, cookie left alone
+        if not session.loaded:
+            return
+
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        drop_keys = [_row_key(sid) for sid in session.drop_sids]
+
+        # empty → drop the row and the cookie
+        if not session:
+            if session.sid and not session.new:
+                drop_keys.append(_row_key(session.sid))
+
+            self.store.delete(drop_keys)
+
+            if session.had_cookie:
+                response.delete_cookie(
+                    name,
+                    domain=domain,
+                    path=path,
+                    secure=self.get_cookie_secure(app),
+                    samesite=self.get_cookie_samesite(app),
+                    httponly=self.get_cookie_httponly(app)
+                )
+            return
+
+        now = _naive_now()
+        ttl = self.ttl(app, session)
+
+        if session.modified or session.new:
+            session.sid = session.sid or secrets.token_urlsafe(32)
+            session.row_expires_at = now + ttl
+            self.store.save(_row_key(session.sid), dict(session), session.row_expires_at, now, drop_keys)
+
+        elif session.row_expires_at - now < ttl / 2:
+            session.row_expires_at = now + ttl
+            self.store.touch(_row_key(session.sid), session.row_expires_at, now)
+
+        else:
+            return
+
+        response.set_cookie(
+            name,
+            self._signer(app).sign(session.sid).decode("utf-8"),
+            expires=self.get_expiration_time(app, session),
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app)
+        )
+
+
+def regenerate_session():
+    """
+    New session id for the current session (call on login). No-op for
+    the cookie session.
+    """
+    if isinstance(flask_session._get_current_object(), ServerSession):
+        flask_session.regenerate()
+
+
+# --------------------------------------------------
+# SWEEPER (BULK DELETE OF EXPIRED SESSIONS)
+# --------------------------------------------------
+def purge_expired_sessions(batch_size=SWEEP_BATCH_SIZE):
+    interface = current_app.session_interface
+    store = interface.store if isinstance(interface, SqlSessionInterface) else SqlSessionStore()
+
+    return store.purge_expired(_naive_now(), batch_size)
+
+
+def purge_expired_sessions_job():
+    """
+    Runs via scheduler (outside any request)
+    """
+    with scheduler.app.app_context():
+        try:
+            purge_expired_sessions()
+        finally:
+            db.session.remove()
@@ -36,6 +36,24 @@ class DevelopmentConfig:
     MAIL_PASSWORD = os.getenv("MAIL_PASSWORD")
     MAIL_DEFAULT_SENDER = os.getenv("MAIL_DEFAULT_SENDER")
 
+    # email_outbox: requests enqueue, worker threads send
+    # (one SMTP connection per batch, retry with backoff, dead letters)
+    EMAIL_OUTBOX_ASYNC = os.getenv("EMAIL_OUTBOX_ASYNC", "True") == "True"
+    EMAIL_WORKERS = int(os.getenv("EMAIL_WORKERS", 2))
+    EMAIL_BATCH_SIZE = int(os.getenv("EMAIL_BATCH_SIZE", 20))
+    EMAIL_POLL_SECONDS = float(os.getenv("EMAIL_POLL_SECONDS", 2.0))
+    EMAIL_LEASE_SECONDS = int(os.getenv("EMAIL_LEASE_SECONDS", 120))
+    EMAIL_MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", 6))
+    EMAIL_RETRY_SECONDS = int(os.getenv("EMAIL_RETRY_SECONDS", 30))
+    EMAIL_RETRY_MAX_SECONDS = int(os.getenv("EMAIL_RETRY_MAX_SECONDS", 3600))
+    EMAIL_OUTBOX_KEEP_DAYS = int(os.getenv("EMAIL_OUTBOX_KEEP_DAYS", 7))
+
+    # templates/emails → compiled once per process, bytecode cached on disk
+    EMAIL_TEMPLATE_CACHE_DIR = os.getenv(
+        "EMAIL_TEMPLATE_CACHE_DIR",
+        os.path.join(os.path.abspath(os.path.dirname(__file__)), "instance", "email_template_cache")
+    )
+
     # --------------------------------------------------
     # CAPTCHA (Google reCAPTCHA v3)
     # --------------------------------------------------
@@ -45,6 +63,116 @@ class DevelopmentConfig:
         os.getenv("RECAPTCHA_SCORE_THRESHOLD", 0.5)
     )
 
+    # --------------------------------------------------
+    # PRODUCT SEARCH (auto | mysql | memory | like)
+    # --------------------------------------------------
+    SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "auto")
+    SEARCH_MAX_CANDIDATES = int(os.getenv("SEARCH_MAX_CANDIDATES", 1000))
+    # memory backend: full rebuild interval (picks up other workers' edits)
+    SEARCH_INDEX_REBUILD_SECONDS = int(os.getenv("SEARCH_INDEX_REBUILD_SECONDS", 300))
+
+    # live search suggestions (full in-memory rebuild interval)
+    AUTOCOMPLETE_REBUILD_SECONDS = int(os.getenv("AUTOCOMPLETE_REBUILD_SECONDS", 300))
+
+    # --------------------------------------------------
+    # PRODUCT DETAIL PAGE CACHE (memory | redis)
+    # --------------------------------------------------
+    PDP_CACHE_BACKEND = os.getenv("PDP_CACHE_BACKEND", "memory")
+    PDP_CACHE_URL = os.getenv("PDP_CACHE_URL")  # redis://localhost:6379/0
+    PDP_CACHE_TTL = int(os.getenv("PDP_CACHE_TTL", 300))
+    PDP_CACHE_MAXSIZE = int(os.getenv("PDP_CACHE_MAXSIZE", 1000))
+
+    # --------------------------------------------------
+    # IDENTITY CACHE (load_user / admin_required) (memory | redis)
+    # --------------------------------------------------
+    IDENTITY_CACHE_BACKEND = os.getenv("IDENTITY_CACHE_BACKEND", "memory")
+    IDENTITY_CACHE_URL = os.getenv("IDENTITY_CACHE_URL")  # redis://localhost:6379/2
+    IDENTITY_CACHE_TTL = int(os.getenv("IDENTITY_CACHE_TTL", 30))
+    IDENTITY_CACHE_MAXSIZE = int(os.getenv("IDENTITY_CACHE_MAXSIZE", 10000))
+    # memory backend: max delay before another worker sees a revocation
+    IDENTITY_REVOCATION_CHECK_SECONDS = int(os.getenv("IDENTITY_REVOCATION_CHECK_SECONDS", 5))
+
+    # --------------------------------------------------
+    # ADMIN DASHBOARD SNAPSHOT
+    # --------------------------------------------------
+    DASHBOARD_SNAPSHOT_SECONDS = int(os.getenv("DASHBOARD_SNAPSHOT_SECONDS", 60))
+
+    # --------------------------------------------------
+    # RATE LIMITER STORAGE (shared across workers)
+    # --------------------------------------------------
+    # default: sql+ + the app database      → rate_limit_counters table
+    # redis://localhost:6379/1                → Redis / Valkey / KeyDB
+    # memory://                               → per process, so limits are
+    #                                           × workers (dev / tests only)
+    RATELIMIT_STORAGE_URI = os.getenv(
+        "RATELIMIT_STORAGE_URI",
+        "sql+" + SQLALCHEMY_DATABASE_URI
+    )
+    RATELIMIT_STORAGE_OPTIONS = {}
+
+    # --------------------------------------------------
+    # AUDIT LOG WRITER (batched, background thread)
+    # --------------------------------------------------
+    AUDIT_LOG_ASYNC = os.getenv("AUDIT_LOG_ASYNC", "True") == "True"
+    AUDIT_LOG_BATCH_SIZE = int(os.getenv("AUDIT_LOG_BATCH_SIZE", 200))
+    AUDIT_LOG_FLUSH_SECONDS = float(os.getenv("AUDIT_LOG_FLUSH_SECONDS", 2.0))
+    AUDIT_LOG_MAX_PENDING = int(os.getenv("AUDIT_LOG_MAX_PENDING", 10000))
+    # rows that keep failing (value too long, FK, ...) → JSON lines file
+    AUDIT_LOG_MAX_ATTEMPTS = int(os.getenv("AUDIT_LOG_MAX_ATTEMPTS", 3))
+    AUDIT_DEAD_LETTER_PATH = os.getenv(
+        "AUDIT_DEAD_LETTER_PATH",
+        os.path.join(os.path.abspath(os.path.dirname(__file__)), "instance", "audit_dead_letters.jsonl")
+    )
+
+    # nightly archive / cleanup jobs (ids per set-based batch + pause)
+    AUDIT_JOB_BATCH_SIZE = int(os.getenv("AUDIT_JOB_BATCH_SIZE", 5000))
+    AUDIT_JOB_SLEEP_SECONDS = float(os.getenv("AUDIT_JOB_SLEEP_SECONDS", 0.1))
+
+    # cold storage: archived logs older than N days → monthly gzip segments
+    AUDIT_COLD_STORAGE_ENABLED = os.getenv("AUDIT_COLD_STORAGE_ENABLED", "True") == "True"
+    AUDIT_COLD_STORAGE_DAYS = int(os.getenv("AUDIT_COLD_STORAGE_DAYS", 120))
+    AUDIT_ARCHIVE_DIR = os.getenv(
+        "AUDIT_ARCHIVE_DIR",
+        os.path.join(os.path.abspath(os.path.dirname(__file__)), "instance", "audit_archive")
+    )
+
+    # --------------------------------------------------
+    # AUDIT INSIGHTS (scheduled, not on page view)
+    # --------------------------------------------------
+    AUDIT_INSIGHTS_MINUTES = int(os.getenv("AUDIT_INSIGHTS_MINUTES", 15))
+
+    # --------------------------------------------------
+    # STOCK RESERVATIONS (cart holds, released after inactivity)
+    # --------------------------------------------------
+    STOCK_RESERVATION_MINUTES = int(os.getenv("STOCK_RESERVATION_MINUTES", 15))
+
+    # --------------------------------------------------
+    # STOCK SHARDS (hot SKU counters, `flask shard-stock`)
+    # --------------------------------------------------
+    STOCK_SHARDS = int(os.getenv("STOCK_SHARDS", 8))
+    STOCK_SHARD_CONSOLIDATE_SECONDS = int(os.getenv("STOCK_SHARD_CONSOLIDATE_SECONDS", 30))
+
+    # --------------------------------------------------
+    # BACKGROUND EXPORT JOBS (gzip CSV artifacts)
+    # --------------------------------------------------
+    EXPORT_DIR = os.getenv(
+        "EXPORT_DIR",
+        os.path.join(os.path.abspath(os.path.dirname(__file__)), "instance", "exports")
+    )
+    EXPORT_JOB_TTL_HOURS = int(os.getenv("EXPORT_JOB_TTL_HOURS", 24))
+    EXPORT_JOB_STALE_MINUTES = int(os.getenv("EXPORT_JOB_STALE_MINUTES", 10))
+    # running jobs touch updated_at this often, even while no rows flow
+    EXPORT_JOB_HEARTBEAT_SECONDS = int(os.getenv("EXPORT_JOB_HEARTBEAT_SECONDS", 30))
+
+    # --------------------------------------------------
+    # SESSIONS (server-side, cookie holds only a signed id)
+    # --------------------------------------------------
+    # sql    → server_sessions table (app/utils/server_session.py)
+    # cookie → Flask default (whole session signed into the cookie)
+    SESSION_STORE = os.getenv("SESSION_STORE", "sql")
+    SERVER_SESSION_TTL_HOURS = int(os.getenv("SERVER_SESSION_TTL_HOURS", 72))
+    SERVER_SESSION_SWEEP_MINUTES = int(os.getenv("SERVER_SESSION_SWEEP_MINUTES", 15))
+
     # --------------------------------------------------
     # DEV FLAGS
     # --------------------------------------------------
@@ -0,0 +1,63 @@
+"""add product rating aggregates
+
+Revision ID: a7c2e9f4d1b3
+Revises: f3b8d1a6c7e2
+Create Date: 2026-10-17 16:02:18.550371
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7c2e9f4d1b3'
+down_revision = 'f3b8d1a6c7e2'
+branch_labels = None
+depends_on = None
+
+
+AGGREGATE_COLUMNS = [
+    'rating_sum',
+    'rating_1_count',
+    'rating_2_count',
+    'rating_3_count',
+    'rating_4_count',
+    'rating_5_count',
+]
+
+
+def upgrade():
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        for column in AGGREGATE_COLUMNS:
+            batch_op.add_column(
+                sa.Column(column, sa.Integer(), nullable=False, server_default='0')
+            )
+
+    # backfill from approved, non-deleted ratings
+    approved = (
+        "FROM product_reviews r "
+        "WHERE r.product_id = products.id "
+        "AND r.is_active = 1 AND r.is_deleted = 0 AND r.rating IS NOT NULL"
+    )
+
+    assignments = [
+        f"rating_sum = COALESCE((SELECT SUM(r.rating) {approved}), 0)",
+        f"rating_count = (SELECT COUNT(*) {approved})",
+    ] + [
+        f"rating_{star}_count = (SELECT COUNT(*) {approved} AND r.rating = {star})"
+        for star in range(1, 6)
+    ]
+
+    op.execute("UPDATE products SET " + ", ".join(assignments))
+
+    op.execute(
+        "UPDATE products SET avg_rating = "
+        "CASE WHEN rating_count > 0 "
+        "THEN ROUND(rating_sum * 1.0 / rating_count, 1) ELSE 0 END"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        for column in reversed(AGGREGATE_COLUMNS):
+            batch_op.drop_column(column)
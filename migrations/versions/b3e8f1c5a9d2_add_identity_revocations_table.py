@@ -0,0 +1,28 @@
+"""add identity revocations table (cross-worker identity cache invalidation)
+
+Revision ID: b3e8f1c5a9d2
+Revises: f2c6a9e4b7d3
+Create Date: 2026-10-18 21:12:40.518327
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3e8f1c5a9d2'
+down_revision = 'f2c6a9e4b7d3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('identity_revocations',
+    sa.Column('name', sa.String(length=20), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('identity_revocations')
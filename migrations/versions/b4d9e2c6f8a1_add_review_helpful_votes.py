@@ -0,0 +1,58 @@
+"""add review helpful votes and review page indexes
+
+Revision ID: b4d9e2c6f8a1
+Revises: a7c2e9f4d1b3
+Create Date: 2026-10-17 17:48:33.091265
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b4d9e2c6f8a1'
+down_revision = 'a7c2e9f4d1b3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('product_reviews', schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column('helpful_count', sa.Integer(), nullable=False, server_default='0')
+        )
+        batch_op.create_index(
+            'idx_review_product_helpful',
+            ['product_id', 'is_active', 'helpful_count'],
+            unique=False
+        )
+        batch_op.create_index(
+            'idx_review_product_active_rating',
+            ['product_id', 'is_active', 'rating'],
+            unique=False
+        )
+
+    op.create_table('review_helpful_votes',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('review_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['review_id'], ['product_reviews.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('review_id', 'user_id', name='uq_review_helpful_vote')
+    )
+    with op.batch_alter_table('review_helpful_votes', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_review_helpful_votes_user_id'), ['user_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('review_helpful_votes', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_review_helpful_votes_user_id'))
+
+    op.drop_table('review_helpful_votes')
+
+    with op.batch_alter_table('product_reviews', schema=None) as batch_op:
+        batch_op.drop_index('idx_review_product_active_rating')
+        batch_op.drop_index('idx_review_product_helpful')
+        batch_op.drop_column('helpful_count')
@@ -0,0 +1,28 @@
+"""add order idempotency key (checkout retries)
+
+Revision ID: c4d9e2a7f1b3
+Revises: b8f3c1e6d4a2
+Create Date: 2026-10-18 10:42:17.305118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4d9e2a7f1b3'
+down_revision = 'b8f3c1e6d4a2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('idempotency_key', sa.String(length=64), nullable=True))
+        batch_op.create_unique_constraint('uq_orders_user_idempotency_key', ['user_id', 'idempotency_key'])
+
+
+def downgrade():
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_orders_user_idempotency_key', type_='unique')
+        batch_op.drop_column('idempotency_key')
@@ -0,0 +1,36 @@
+"""add job checkpoints table (resumable batch jobs)
+
+Revision ID: d5f2b8e4a6c1
+Revises: c1e7a3f9b2d4
+Create Date: 2026-10-17 19:12:47.208531
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5f2b8e4a6c1'
+down_revision = 'c1e7a3f9b2d4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('job_checkpoints',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('cutoff', sa.DateTime(), nullable=True),
+    sa.Column('last_id', sa.BigInteger(), nullable=False),
+    sa.Column('processed', sa.BigInteger(), nullable=False),
+    sa.Column('batches', sa.Integer(), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('job_checkpoints')
@@ -0,0 +1,26 @@
+"""add export job lease token
+
+Revision ID: d8a2c6f4e1b9
+Revises: b3e8f1c5a9d2
+Create Date: 2026-10-18 21:48:03.204915
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd8a2c6f4e1b9'
+down_revision = 'b3e8f1c5a9d2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('export_jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('lease_token', sa.String(length=32), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('export_jobs', schema=None) as batch_op:
+        batch_op.drop_column('lease_token')
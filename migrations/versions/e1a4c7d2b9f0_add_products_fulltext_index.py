@@ -0,0 +1,36 @@
+"""add products fulltext index
+
+Revision ID: e1a4c7d2b9f0
+Revises: 551626283b4f
+Create Date: 2026-10-17 10:12:04.118532
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'e1a4c7d2b9f0'
+down_revision = '551626283b4f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # FULLTEXT is MySQL only (SQLite uses the in-memory search index)
+    if op.get_bind().dialect.name != "mysql":
+        return
+
+    op.create_index(
+        'ft_products_name',
+        'products',
+        ['name'],
+        unique=False,
+        mysql_prefix='FULLTEXT'
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != "mysql":
+        return
+
+    op.drop_index('ft_products_name', table_name='products')
@@ -0,0 +1,37 @@
+"""add product stock shards (hot SKU counters)
+
+Revision ID: e5b9c2d8a4f1
+Revises: d7a3f5c1e9b2
+Create Date: 2026-10-18 15:32:10.204117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5b9c2d8a4f1'
+down_revision = 'd7a3f5c1e9b2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('product_stock_shards',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('shard', sa.Integer(), nullable=False),
+    sa.Column('stock', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('product_id', 'shard', name='uq_product_stock_shard')
+    )
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('stock_sharded', sa.Boolean(), nullable=False, server_default=sa.false()))
+
+
+def downgrade():
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.drop_column('stock_sharded')
+
+    op.drop_table('product_stock_shards')
@@ -0,0 +1,35 @@
+"""add audit rollups table (hourly audit analytics counters)
+
+Revision ID: e8c4a2f6b1d9
+Revises: d5f2b8e4a6c1
+Create Date: 2026-10-17 21:03:18.554210
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8c4a2f6b1d9'
+down_revision = 'd5f2b8e4a6c1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('audit_rollups',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('hour', sa.DateTime(), nullable=False),
+    sa.Column('actor_type', sa.String(length=20), nullable=False),
+    sa.Column('severity', sa.String(length=20), nullable=False),
+    sa.Column('action', sa.String(length=255), nullable=False),
+    sa.Column('is_bulk', sa.Boolean(), nullable=False),
+    sa.Column('events', sa.BigInteger(), nullable=False),
+    sa.Column('archived_events', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('hour', 'actor_type', 'severity', 'action', 'is_bulk', name='uq_audit_rollup_bucket')
+    )
+
+
+def downgrade():
+    op.drop_table('audit_rollups')
@@ -0,0 +1,35 @@
+"""add server sessions table (server-side session store)
+
+Revision ID: f2c6a9e4b7d3
+Revises: e5b9c2d8a4f1
+Create Date: 2026-10-18 19:48:26.731902
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2c6a9e4b7d3'
+down_revision = 'e5b9c2d8a4f1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('server_sessions',
+    sa.Column('id', sa.String(length=64), nullable=False),
+    sa.Column('data', sa.LargeBinary(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('server_sessions', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_server_sessions_expires_at'), ['expires_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('server_sessions', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_server_sessions_expires_at'))
+
+    op.drop_table('server_sessions')
@@ -0,0 +1,52 @@
+"""add audit insight content hash (unique dedupe key)
+
+Revision ID: f6a1d3c8e2b7
+Revises: e8c4a2f6b1d9
+Create Date: 2026-10-17 22:14:36.918402
+
+"""
+import hashlib
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f6a1d3c8e2b7'
+down_revision = 'e8c4a2f6b1d9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('audit_insights', sa.Column('content_hash', sa.String(length=64), nullable=True))
+
+    # backfill: keep the oldest row per message, drop later duplicates
+    conn = op.get_bind()
+    rows = conn.execute(sa.text('SELECT id, message FROM audit_insights ORDER BY id')).fetchall()
+
+    seen = set()
+    for row in rows:
+        content_hash = hashlib.sha256(row.message.strip().encode('utf-8')).hexdigest()
+
+        if content_hash in seen:
+            conn.execute(sa.text('DELETE FROM audit_insights WHERE id = :id'), {'id': row.id})
+            continue
+
+        seen.add(content_hash)
+        conn.execute(
+            sa.text('UPDATE audit_insights SET content_hash = :h WHERE id = :id'),
+            {'h': content_hash, 'id': row.id}
+        )
+
+    with op.batch_alter_table('audit_insights', schema=None) as batch_op:
+        batch_op.alter_column('content_hash', existing_type=sa.String(length=64), nullable=False)
+        batch_op.create_unique_constraint('uq_audit_insights_content_hash', ['content_hash'])
+        batch_op.create_index('ix_audit_insights_active', ['is_archived', 'generated_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('audit_insights', schema=None) as batch_op:
+        batch_op.drop_index('ix_audit_insights_active')
+        batch_op.drop_constraint('uq_audit_insights_content_hash', type_='unique')
+        batch_op.drop_column('content_hash')
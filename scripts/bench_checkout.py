@@ -0,0 +1,228 @@
+"""
+Checkout Concurrency Benchmark (hot SKU)
+----------------------------------------
+• N users each have 1 × HOT product (+ 1 random cold product) in their
+  cart; the hot product has only --stock units
+• All N checkouts run at once through app.services.checkout_service
+  (--concurrency threads); every user also fires a duplicate request
+  with the same idempotency key (--duplicates)
+• Verifies: no overselling (hot stock never < 0, units sold == stock
+  taken), exactly min(N, stock) orders, never two orders per user
+• Reports orders/sec and p50 / p95 checkout latency
+
+Default DB is a throwaway SQLite file (writes serialise, BEGIN IMMEDIATE).
+For real row-lock contention point it at an EMPTY MySQL database:
+    python scripts/bench_checkout.py --database-url mysql+mysqlconnector://u:p@localhost/zentro_bench
+
+Run (from project root):
+    python scripts/bench_checkout.py
+    python scripts/bench_checkout.py --users 2000 --stock 500 --concurrency 64
+"""
+import sys
+import os
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+import argparse
+import random
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import Flask
+from sqlalchemy import event, insert, func
+
+from app.extensions import db
+from app.models import Category, Product, User, UserAddress, CartItem, Order, OrderItem
+from app.services.checkout_service import place_order, CheckoutError
+
+
+def create_script_app(database_url):
+    """
+    Minimal Flask app only for scripts.
+    """
+    app = Flask(__name__)
+    app.config.from_object("config.DevelopmentConfig")
+    app.config["SQLALCHEMY_DATABASE_URI"] = database_url
+
+    if database_url.startswith("sqlite"):
+        app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+            "connect_args": {"check_same_thread": False, "timeout": 60}
+        }
+
+    db.init_app(app)
+    return app
+
+
+def sqlite_begin_immediate(engine):
+    """
+    pysqlite starts transactions lazily (read lock first) → concurrent
+    writers fail with "database is locked". Take the write lock upfront.
+    """
+    @event.listens_for(engine, "connect")
+    def _connect(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _begin(conn):
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def populate(args):
+    category = Category(name="Bench", slug=f"bench-{int(time.time())}")
+    db.session.add(category)
+    db.session.flush()
+
+    cold = [
+        Product(name=f"Cold {i}", sku=f"BENCH-COLD-{category.id}-{i}", category_id=category.id,
+                price=50 + i, stock=args.users * 10)
+        for i in range(args.cold_products)
+    ]
+    hot = Product(name="Hot SKU", sku=f"BENCH-HOT-{category.id}", category_id=category.id,
+                  price=999, stock=args.stock)
+    db.session.add_all(cold + [hot])
+    db.session.flush()
+
+    tag = category.id
+    db.session.execute(insert(User), [
+        {
+            "username": f"bench{tag}_{i}",
+            "email": f"bench{tag}_{i}@bench.test",
+            "notification_email": f"bench{tag}_{i}@bench.test",
+            "password_hash": "x",
+        }
+        for i in range(args.users)
+    ])
+    user_ids = [
+        uid for (uid,) in db.session.query(User.id)
+        .filter(User.username.like(f"bench{tag}\\_%", escape="\\"))
+        .order_by(User.id)
+    ]
+
+    rng = random.Random(42)
+    db.session.execute(insert(UserAddress), [
+        {"user_id": uid, "full_name": "Bench", "phone": "9999999999", "house_no": "1",
+         "area": "Area", "city": "City", "state": "State", "pincode": "560001", "is_default": True}
+        for uid in user_ids
+    ])
+
+    cart = []
+    for uid in user_ids:
+        cart.append({"user_id": uid, "product_id": hot.id, "quantity": 1, "price_at_add": hot.price})
+        if cold:
+            c = rng.choice(cold)
+            cart.append({"user_id": uid, "product_id": c.id, "quantity": 1, "price_at_add": c.price})
+    db.session.execute(insert(CartItem), cart)
+
+    db.session.commit()
+    return hot.id, user_ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Checkout concurrency benchmark")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--stock", type=int, default=300, help="units of the hot SKU")
+    parser.add_argument("--cold-products", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duplicates", type=float, default=1.0,
+                        help="fraction of users that also send a same-key retry")
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    tmp = None
+    database_url = args.database_url
+    if not database_url:
+        tmp = tempfile.TemporaryDirectory()
+        database_url = f"sqlite:///{os.path.join(tmp.name, 'bench_checkout.db')}"
+
+    app = create_script_app(database_url)
+
+    with app.app_context():
+        if database_url.startswith("sqlite"):
+            sqlite_begin_immediate(db.engine)
+        db.create_all()
+
+        print(f"⏳ seeding {args.users:,} users / carts, hot stock {args.stock}...", flush=True)
+        hot_id, user_ids = populate(args)
+
+    requests = [(uid, f"bench-{uid}") for uid in user_ids]
+    requests += [(uid, f"bench-{uid}") for uid in user_ids[: int(len(user_ids) * args.duplicates)]]
+    random.Random(7).shuffle(requests)
+
+    lock = threading.Lock()
+    outcome = {"created": 0, "replayed": 0, "rejected": 0, "errors": 0}
+    latencies = []
+    error_samples = []
+
+    def checkout(request):
+        user_id, key = request
+        started = time.perf_counter()
+
+        with app.app_context():
+            try:
+                _, created = place_order(user_id, idempotency_key=key)
+                result = "created" if created else "replayed"
+            except CheckoutError:
+                result = "rejected"
+            except Exception as e:
+                result = "errors"
+                if len(error_samples) < 5:
+                    error_samples.append(repr(e))
+            finally:
+                db.session.remove()
+
+        with lock:
+            outcome[result] += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(checkout, requests))
+    elapsed = time.perf_counter() - started
+
+    with app.app_context():
+        hot_stock = db.session.get(Product, hot_id).stock
+        hot_sold = db.session.query(func.coalesce(func.sum(OrderItem.quantity), 0)).filter(
+            OrderItem.product_id == hot_id
+        ).scalar()
+        orders = db.session.query(func.count(Order.id)).filter(Order.user_id.in_(user_ids)).scalar()
+        max_per_user = db.session.query(func.count(Order.id)).filter(
+            Order.user_id.in_(user_ids)
+        ).group_by(Order.user_id).order_by(func.count(Order.id).desc()).limit(1).scalar() or 0
+
+    if tmp:
+        tmp.cleanup()
+
+    expected = min(args.users, args.stock)
+    lat = sorted(latencies)
+
+    print(f"requests        {len(requests):,} ({len(user_ids):,} users + {len(requests) - len(user_ids):,} same-key retries), "
+          f"{args.concurrency} threads")
+    print(f"outcome         {outcome}")
+    print(f"orders          {orders} (expected {expected}), max per user {max_per_user}")
+    print(f"hot SKU         stock left {hot_stock}, units sold {hot_sold}, "
+          f"{'✅ no oversell' if hot_stock >= 0 and hot_sold + hot_stock == args.stock else '❌ OVERSOLD'}")
+    print(f"throughput      {outcome['created'] / elapsed:,.0f} orders/s, "
+          f"{len(requests) / elapsed:,.0f} checkouts/s")
+    print(f"latency         p50 {statistics.median(lat) * 1000:.1f} ms, "
+          f"p95 {lat[int(len(lat) * 0.95) - 1] * 1000:.1f} ms")
+    for sample in error_samples:
+        print("  error:", sample)
+
+    ok = (
+        orders == expected
+        and max_per_user <= 1
+        and hot_stock >= 0
+        and hot_sold + hot_stock == args.stock
+        and not outcome["errors"]
+    )
+    print("✅ OK" if ok else "❌ MISMATCH")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
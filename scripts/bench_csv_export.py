@@ -0,0 +1,176 @@
+"""
+CSV Export Memory Benchmark
+---------------------------
+• Exports N login_activities rows three ways and reports peak RSS:
+    buffered   → old path (.all() + StringIO)
+    streaming  → app.utils.csv_export.iter_csv over yield_per
+    gzip       → streaming + iter_gzip
+• Each run is a fresh process, so peaks don't leak between modes
+• Uses a throwaway SQLite file (no MySQL needed); the streaming peak
+  should stay flat while the buffered peak grows with N
+
+Run (from project root):
+    python scripts/bench_csv_export.py
+    python scripts/bench_csv_export.py --sizes 100000,1000000
+"""
+import sys
+import os
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+import argparse
+import csv
+import multiprocessing
+import resource
+import tempfile
+import time
+from datetime import datetime, timedelta
+from io import StringIO
+
+from flask import Flask
+from sqlalchemy import insert
+
+from app.extensions import db
+from app.models import LoginActivity
+from app.utils.csv_export import iter_csv, iter_gzip, YIELD_PER
+from app.utils.time_utils import to_ist
+
+
+HEADER = ["Date", "Time", "IP Address", "Device", "Status"]
+
+
+def create_script_app(db_path):
+    """
+    Minimal Flask app only for scripts (SQLite file).
+    """
+    app = Flask(__name__)
+    app.config.from_object("config.DevelopmentConfig")
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{db_path}"
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {}
+    db.init_app(app)
+    return app
+
+
+def to_row(log):
+    ist_time = to_ist(log.created_at)
+    return [
+        ist_time.strftime("%d %b %Y"),
+        ist_time.strftime("%I:%M %p"),
+        log.ip_address,
+        log.user_agent,
+        log.login_status
+    ]
+
+
+def peak_rss_mb():
+    # ru_maxrss: KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def populate(db_path, rows):
+    app = create_script_app(db_path)
+
+    with app.app_context():
+        LoginActivity.__table__.create(db.engine)
+
+        start = datetime(2024, 1, 1)
+        batch = []
+
+        with db.engine.begin() as conn:
+            for i in range(rows):
+                batch.append({
+                    "user_id": 1 + i % 5000,
+                    "ip_address": f"10.{i % 256}.{(i // 256) % 256}.{i % 97}",
+                    "user_agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 Chrome/120.0",
+                    "device": "desktop",
+                    "login_status": "success" if i % 7 else "failed",
+                    "created_at": start + timedelta(seconds=i * 30),
+                })
+
+                if len(batch) == 10000:
+                    conn.execute(insert(LoginActivity.__table__), batch)
+                    batch = []
+
+            if batch:
+                conn.execute(insert(LoginActivity.__table__), batch)
+
+
+def run_export(db_path, mode, result_queue):
+    app = create_script_app(db_path)
+
+    with app.app_context():
+        query = LoginActivity.query.order_by(LoginActivity.created_at.desc())
+        baseline = peak_rss_mb()
+        started = time.perf_counter()
+        written = 0
+
+        with open(os.devnull, "wb") as sink:
+            if mode == "buffered":
+                output = StringIO()
+                writer = csv.writer(output)
+                writer.writerow(HEADER)
+                for log in query.all():
+                    writer.writerow(to_row(log))
+                data = output.getvalue().encode("utf-8")
+                sink.write(data)
+                written = len(data)
+
+            else:
+                chunks = iter_csv(HEADER, query.yield_per(YIELD_PER), to_row)
+                body = iter_gzip(chunks) if mode == "gzip" else (c.encode("utf-8") for c in chunks)
+
+                for data in body:
+                    sink.write(data)
+                    written += len(data)
+
+        result_queue.put({
+            "seconds": time.perf_counter() - started,
+            "bytes": written,
+            "baseline_mb": baseline,
+            "peak_mb": peak_rss_mb(),
+        })
+
+
+def measure(db_path, mode):
+    ctx = multiprocessing.get_context("spawn")
+    result_queue = ctx.Queue()
+    process = ctx.Process(target=run_export, args=(db_path, mode, result_queue))
+    process.start()
+    result = result_queue.get()
+    process.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CSV export memory benchmark")
+    parser.add_argument("--sizes", default="100000,1000000", help="comma separated row counts")
+    parser.add_argument("--modes", default="buffered,streaming,gzip")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+    modes = args.modes.split(",")
+
+    print(f"{'rows':>10} {'mode':>10} {'seconds':>8} {'output MB':>10} {'peak RSS MB':>12} {'Δ RSS MB':>9}")
+
+    for rows in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, "bench_export.db")
+
+            print(f"⏳ populating {rows:,} rows...", flush=True)
+            populate(db_path, rows)
+
+            for mode in modes:
+                r = measure(db_path, mode)
+                print(
+                    f"{rows:>10,} {mode:>10} {r['seconds']:>8.1f} "
+                    f"{r['bytes'] / 1e6:>10.1f} {r['peak_mb']:>12.1f} "
+                    f"{r['peak_mb'] - r['baseline_mb']:>9.1f}",
+                    flush=True
+                )
+
+
+if __name__ == "__main__":
+    main()
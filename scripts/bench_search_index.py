@@ -0,0 +1,184 @@
+"""
+Search Index Benchmark
+----------------------
+• Measures query latency (p50 / p95 / p99) of the product search
+  index at catalogue sizes of 100k and 1M products
+• memory backend → synthetic catalogue, no DB needed
+• mysql backend  → runs against the configured DB (products table
+  must already be populated)
+
+Run (from project root):
+    python scripts/bench_search_index.py
+    python scripts/bench_search_index.py --sizes 100000 --queries 2000
+    python scripts/bench_search_index.py --backend mysql
+"""
+import sys
+import os
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+import argparse
+import random
+import statistics
+import time
+
+from flask import Flask
+
+from app.extensions import db
+
+
+BRANDS = [
+    "samsung", "apple", "oneplus", "xiaomi", "realme", "sony", "lg",
+    "boat", "noise", "lenovo", "asus", "hp", "dell", "puma", "nike",
+]
+
+NOUNS = [
+    "phone", "smartphone", "laptop", "headphones", "earbuds", "watch",
+    "charger", "cable", "tablet", "monitor", "keyboard", "mouse",
+    "shoes", "tshirt", "jacket", "backpack", "speaker", "camera",
+]
+
+MODIFIERS = [
+    "pro", "max", "ultra", "lite", "plus", "mini", "wireless", "gaming",
+    "slim", "classic", "sport", "neo", "prime", "edge", "air",
+]
+
+COLOURS = ["black", "white", "blue", "red", "green", "silver", "gold"]
+
+
+def create_script_app():
+    """
+    Minimal Flask app only for scripts.
+    Avoids loading blueprints, limiter, login manager.
+    """
+    app = Flask(__name__)
+    app.config.from_object("config.DevelopmentConfig")
+    db.init_app(app)
+    return app
+
+
+def synthetic_name(rng):
+    return " ".join([
+        rng.choice(BRANDS),
+        rng.choice(NOUNS),
+        rng.choice(MODIFIERS),
+        f"{rng.choice('abcdefgmsxz')}{rng.randint(1, 99)}",
+        rng.choice(COLOURS),
+    ])
+
+
+def synthetic_queries(rng, count):
+    """
+    Mix of typeahead prefixes and full multi-word searches.
+    """
+    queries = []
+
+    for _ in range(count):
+        kind = rng.random()
+
+        if kind < 0.4:
+            word = rng.choice(BRANDS + NOUNS)
+            queries.append(word[:rng.randint(2, len(word))])
+        elif kind < 0.8:
+            queries.append(f"{rng.choice(BRANDS)} {rng.choice(NOUNS)}")
+        else:
+            queries.append(
+                f"{rng.choice(BRANDS)} {rng.choice(NOUNS)} {rng.choice(MODIFIERS)[:3]}"
+            )
+
+    return queries
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def report(label, samples):
+    ms = [s * 1000 for s in samples]
+    print(
+        f"{label:<22} "
+        f"p50={percentile(ms, 50):7.2f}ms  "
+        f"p95={percentile(ms, 95):7.2f}ms  "
+        f"p99={percentile(ms, 99):7.2f}ms  "
+        f"mean={statistics.mean(ms):7.2f}ms"
+    )
+
+
+def bench_memory(sizes, query_count, limit, seed):
+    from app.services.search_index import InvertedIndex
+
+    rng = random.Random(seed)
+    queries = synthetic_queries(rng, query_count)
+
+    for size in sizes:
+        index = InvertedIndex()
+
+        started = time.perf_counter()
+        index.build((pid, synthetic_name(rng)) for pid in range(1, size + 1))
+        build_seconds = time.perf_counter() - started
+
+        samples = []
+        for q in queries:
+            t0 = time.perf_counter()
+            index.search(q, limit=limit)
+            samples.append(time.perf_counter() - t0)
+
+        print(f"\n=== memory backend | {size:,} products ===")
+        print(f"build: {build_seconds:.2f}s")
+        report("search", samples)
+
+
+def bench_mysql(query_count, limit, seed):
+    from app.models import Product
+    from app.services.search_index import MySQLFulltextBackend
+
+    app = create_script_app()
+    rng = random.Random(seed)
+    queries = synthetic_queries(rng, query_count)
+    backend = MySQLFulltextBackend()
+
+    with app.app_context():
+        size = db.session.query(db.func.count(Product.id)).scalar()
+
+        fulltext, legacy = [], []
+        for q in queries:
+            base = Product.query.filter(Product.status == "ACTIVE")
+
+            t0 = time.perf_counter()
+            backend.apply(base, q).limit(limit).all()
+            fulltext.append(time.perf_counter() - t0)
+
+            t0 = time.perf_counter()
+            base.filter(Product.name.ilike(f"%{q}%")).limit(limit).all()
+            legacy.append(time.perf_counter() - t0)
+
+        print(f"\n=== mysql backend | {size:,} products ===")
+        report("MATCH ... AGAINST", fulltext)
+        report("ILIKE '%q%' (legacy)", legacy)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Product search benchmark")
+    parser.add_argument("--backend", choices=["memory", "mysql"], default="memory")
+    parser.add_argument(
+        "--sizes",
+        type=lambda v: [int(x) for x in v.split(",")],
+        default=[100_000, 1_000_000]
+    )
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    if args.backend == "mysql":
+        bench_mysql(args.queries, args.limit, args.seed)
+    else:
+        bench_memory(args.sizes, args.queries, args.limit, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""
+Hot SKU Stock Benchmark (single row vs sharded)
+-----------------------------------------------
+• --workers threads (default 200) each run decrement transactions of
+  1 unit against ONE product until it is sold out
+• mode "single":  conditional UPDATE on products.stock (one row lock)
+• mode "sharded": app.services.stock_shards.decrement over --shards rows
+• every transaction holds its lock for --hold-ms (the rest of checkout:
+  order insert, cart delete, ...) before COMMIT
+• Verifies: units sold == initial stock, stock never < 0, shards
+  consolidate back to 0
+• Reports decrements/sec and p50 / p95 transaction latency per mode
+
+Default DB is a throwaway SQLite file. SQLite has ONE write lock for the
+whole database, so both modes serialise there and show the same
+throughput — only a row-locking database shows the sharding win. Point
+it at an EMPTY MySQL database for that:
+    python scripts/bench_stock_shards.py --database-url mysql+mysqlconnector://u:p@localhost/zentro_bench
+
+Run (from project root):
+    python scripts/bench_stock_shards.py
+    python scripts/bench_stock_shards.py --workers 200 --stock 5000 --shards 16 --hold-ms 5
+"""
+import sys
+import os
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+import argparse
+import statistics
+import tempfile
+import threading
+import time
+
+from flask import Flask
+from sqlalchemy import event, update
+
+from app.extensions import db
+from app.models import Category, Product
+from app.services import stock_shards
+
+
+def create_script_app(database_url, workers):
+    """
+    Minimal Flask app only for scripts.
+    """
+    app = Flask(__name__)
+    app.config.from_object("config.DevelopmentConfig")
+    app.config["SQLALCHEMY_DATABASE_URI"] = database_url
+
+    if database_url.startswith("sqlite"):
+        app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+            "connect_args": {"check_same_thread": False, "timeout": 120}
+        }
+    else:
+        app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+            "pool_size": workers,
+            "max_overflow": 10
+        }
+
+    db.init_app(app)
+    return app
+
+
+def sqlite_begin_immediate(engine):
+    """
+    pysqlite starts transactions lazily (read lock first) → concurrent
+    writers fail with "database is locked". Take the write lock upfront.
+    """
+    @event.listens_for(engine, "connect")
+    def _connect(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _begin(conn):
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def populate(args):
+    category = Category(name="Bench", slug=f"bench-shards-{int(time.time())}")
+    db.session.add(category)
+    db.session.flush()
+
+    single = Product(name="Hot single", sku=f"BENCH-SINGLE-{category.id}",
+                     category_id=category.id, price=999, stock=args.stock)
+    sharded = Product(name="Hot sharded", sku=f"BENCH-SHARDED-{category.id}",
+                      category_id=category.id, price=999, stock=args.stock)
+    db.session.add_all([single, sharded])
+    db.session.commit()
+
+    stock_shards.enable_sharding(sharded.id, args.shards)
+    return single.id, sharded.id
+
+
+def decrement_single(product_id):
+    return db.session.execute(
+        update(Product)
+        .where(Product.id == product_id, Product.stock >= 1)
+        .values(stock=Product.stock - 1)
+        .execution_options(synchronize_session=False)
+    ).rowcount == 1
+
+
+def decrement_sharded(product_id):
+    return stock_shards.decrement(product_id, 1)
+
+
+def run(app, mode, product_id, args):
+    decrement = decrement_single if mode == "single" else decrement_sharded
+
+    lock = threading.Lock()
+    outcome = {"sold": 0, "errors": 0}
+    latencies = []
+    error_samples = []
+
+    def worker():
+        with app.app_context():
+            while True:
+                started = time.perf_counter()
+                try:
+                    sold = decrement(product_id)
+                    if sold and args.hold_ms:
+                        time.sleep(args.hold_ms / 1000)
+                    db.session.commit()
+                except Exception as e:
+                    db.session.rollback()
+                    with lock:
+                        outcome["errors"] += 1
+                        if len(error_samples) < 5:
+                            error_samples.append(repr(e))
+                    continue
+                finally:
+                    db.session.remove()
+
+                if not sold:
+                    return
+
+                with lock:
+                    outcome["sold"] += 1
+                    latencies.append(time.perf_counter() - started)
+
+    threads = [threading.Thread(target=worker) for _ in range(args.workers)]
+
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    with app.app_context():
+        if mode == "sharded":
+            stock_shards.consolidate([product_id])
+        left = db.session.get(Product, product_id).stock
+
+    lat = sorted(latencies) or [0]
+    ok = outcome["sold"] == args.stock and left == 0
+
+    print(f"{mode:<8} {outcome['sold'] / elapsed:>10,.0f} decrements/s   "
+          f"p50 {statistics.median(lat) * 1000:6.1f} ms   "
+          f"p95 {lat[max(0, int(len(lat) * 0.95) - 1)] * 1000:7.1f} ms   "
+          f"sold {outcome['sold']} / {args.stock}, left {left}, errors {outcome['errors']}   "
+          f"{'✅' if ok else '❌ MISMATCH'}")
+    for sample in error_samples:
+        print("  error:", sample)
+
+    return ok, outcome["sold"] / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hot SKU stock benchmark")
+    parser.add_argument("--workers", type=int, default=200, help="concurrent decrementers")
+    parser.add_argument("--stock", type=int, default=2000, help="units of the hot SKU")
+    parser.add_argument("--shards", type=int, default=16)
+    parser.add_argument("--hold-ms", type=float, default=2.0,
+                        help="time each transaction keeps its lock before COMMIT")
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    tmp = None
+    database_url = args.database_url
+    if not database_url:
+        tmp = tempfile.TemporaryDirectory()
+        database_url = f"sqlite:///{os.path.join(tmp.name, 'bench_stock_shards.db')}"
+
+    app = create_script_app(database_url, args.workers)
+
+    with app.app_context():
+        if database_url.startswith("sqlite"):
+            sqlite_begin_immediate(db.engine)
+        db.create_all()
+        single_id, sharded_id = populate(args)
+
+    print(f"⏳ {args.workers} workers, {args.stock:,} units, {args.shards} shards, "
+          f"lock held {args.hold_ms} ms per transaction ({database_url.split(':')[0]})")
+
+    ok_single, single_rate = run(app, "single", single_id, args)
+    ok_sharded, sharded_rate = run(app, "sharded", sharded_id, args)
+
+    if tmp:
+        tmp.cleanup()
+
+    print(f"speedup  {sharded_rate / single_rate:.2f}×")
+    ok = ok_single and ok_sharded
+    print("✅ OK" if ok else "❌ MISMATCH")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+Email Outbox Check (local SMTP sink)
+------------------------------------
+• Starts an aiosmtpd sink on localhost and points Flask-Mail at it
+• Enqueues N emails through app.services.email_outbox and lets the
+  worker pool deliver them
+• The sink rejects the first --flaky messages with 451 (→ retried with
+  backoff) and always rejects *@bounce.test with 550 (→ dead-lettered)
+• Reports delivered / dead counts, SMTP connections used (one per batch)
+  and throughput
+
+Needs aiosmtpd (dev only):
+    pip install aiosmtpd
+
+Run (from project root):
+    python scripts/check_email_outbox.py
+    python scripts/check_email_outbox.py --emails 500 --workers 4 --batch-size 50
+"""
+import sys
+import os
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+import argparse
+import socket
+import tempfile
+import threading
+import time
+
+from flask import Flask
+from sqlalchemy import func
+
+from app.extensions import db, mail
+from app.models import EmailOutbox
+from app.services.email_outbox import enqueue_email, get_email_worker
+
+try:
+    from aiosmtpd.controller import Controller
+except ImportError:  # pragma: no cover
+    print("❌ aiosmtpd is not installed: pip install aiosmtpd")
+    sys.exit(1)
+
+
+class SinkHandler:
+    def __init__(self, flaky):
+        self.flaky = flaky
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.delivered = []
+        self.rejected = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        with self.lock:
+            self.connections += 1
+        session.host_name = hostname
+        return responses
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address.endswith("@bounce.test"):
+            return "550 mailbox unavailable"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        with self.lock:
+            if self.flaky > 0:
+                self.flaky -= 1
+                self.rejected += 1
+                return "451 try again later"
+            self.delivered.append(envelope.rcpt_tos[0])
+        return "250 Message accepted"
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def create_script_app(db_path, port, args):
+    """
+    Minimal Flask app only for scripts (SQLite file + local sink).
+    """
+    app = Flask(__name__)
+    app.config.from_object("config.DevelopmentConfig")
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{db_path}",
+        SQLALCHEMY_ENGINE_OPTIONS={"connect_args": {"check_same_thread": False, "timeout": 30}},
+        MAIL_SERVER="127.0.0.1",
+        MAIL_PORT=port,
+        MAIL_USE_TLS=False,
+        MAIL_USE_SSL=False,
+        MAIL_DEBUG=False,
+        MAIL_USERNAME=None,
+        MAIL_PASSWORD=None,
+        MAIL_DEFAULT_SENDER="ZENTRO <no-reply@zentro.test>",
+        EMAIL_OUTBOX_ASYNC=True,
+        EMAIL_WORKERS=args.workers,
+        EMAIL_BATCH_SIZE=args.batch_size,
+        EMAIL_POLL_SECONDS=0.2,
+        EMAIL_MAX_ATTEMPTS=3,
+        EMAIL_RETRY_SECONDS=0.5,
+        EMAIL_RETRY_MAX_SECONDS=2,
+    )
+    db.init_app(app)
+    mail.init_app(app)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Email outbox check against a local SMTP sink")
+    parser.add_argument("--emails", type=int, default=200)
+    parser.add_argument("--bounces", type=int, default=3, help="emails to *@bounce.test (dead letters)")
+    parser.add_argument("--flaky", type=int, default=10, help="first N deliveries answered with 451")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--batch-size", type=int, default=20)
+    parser.add_argument("--timeout", type=float, default=60)
+    args = parser.parse_args()
+
+    port = free_port()
+    handler = SinkHandler(args.flaky)
+    controller = Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_script_app(os.path.join(tmp, "outbox.db"), port, args)
+
+        with app.app_context():
+            EmailOutbox.__table__.create(db.engine)
+
+            started = time.perf_counter()
+
+            for i in range(args.emails):
+                enqueue_email(f"user{i}@example.test", f"Check #{i}", html=f"<p>Hello {i}</p>", body=f"Hello {i}")
+            for i in range(args.bounces):
+                enqueue_email(f"nobody{i}@bounce.test", "Bounce", body="x")
+
+            enqueue_seconds = time.perf_counter() - started
+            worker = get_email_worker()
+
+            deadline = time.time() + args.timeout
+            while time.time() < deadline:
+                pending = db.session.query(func.count(EmailOutbox.id)).filter(
+                    EmailOutbox.status == "queued"
+                ).scalar()
+                db.session.rollback()
+                if not pending:
+                    break
+                time.sleep(0.2)
+
+            elapsed = time.perf_counter() - started
+            worker.stop()
+
+            counts = dict(
+                db.session.query(EmailOutbox.status, func.count(EmailOutbox.id))
+                .group_by(EmailOutbox.status)
+                .all()
+            )
+
+    controller.stop()
+
+    total = args.emails + args.bounces
+    print(f"enqueued        {total} in {enqueue_seconds * 1000:.0f} ms "
+          f"({enqueue_seconds * 1000 / total:.2f} ms per request)")
+    print(f"outbox status   {counts}")
+    print(f"sink delivered  {len(handler.delivered)} (unique {len(set(handler.delivered))}), "
+          f"451 rejections {handler.rejected}")
+    print(f"SMTP sessions   {handler.connections} for {worker.sent + worker.failed} send attempts")
+    print(f"throughput      {len(handler.delivered) / elapsed:.0f} emails/s")
+
+    ok = (
+        counts.get("sent") == args.emails
+        and counts.get("dead", 0) == args.bounces
+        and len(set(handler.delivered)) == args.emails
+    )
+    print("✅ OK" if ok else "❌ MISMATCH")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
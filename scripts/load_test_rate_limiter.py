@@ -0,0 +1,141 @@
+"""
+Rate Limiter Load Test
+----------------------
+• Starts N worker processes (default 8, like gunicorn -w 8), each with
+  its own Flask app + limiter on the same storage URI
+• Every worker hammers one "LIMIT per minute" route from the same IP
+• Reports how many requests were let through in total
+
+  memory://          → each worker counts alone → ~ LIMIT × workers
+  sql+... / redis:// → shared counter           → exactly LIMIT
+
+Run (from project root):
+    python scripts/load_test_rate_limiter.py
+    python scripts/load_test_rate_limiter.py --storage memory://
+    python scripts/load_test_rate_limiter.py --storage redis://localhost:6379/1
+    python scripts/load_test_rate_limiter.py --storage "sql+mysql+mysqlconnector://u:p@localhost/zentro"
+"""
+import sys
+import os
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+import argparse
+import multiprocessing
+import tempfile
+import time
+
+from flask import Flask
+from flask_limiter import Limiter
+from flask_limiter.util import get_remote_address
+
+from app.utils import rate_limit_storage  # noqa: F401 (registers sql+... schemes)
+
+
+def create_limited_app(storage_uri, limit):
+    """
+    Minimal app per worker: limiter + one limited route.
+    """
+    app = Flask(__name__)
+    app.config["RATELIMIT_STORAGE_URI"] = storage_uri
+
+    limiter = Limiter(key_func=get_remote_address, default_limits=[])
+    limiter.init_app(app)
+
+    @app.route("/login", methods=["POST"])
+    @limiter.limit(f"{limit} per minute")
+    def login():
+        return "ok"
+
+    return app
+
+
+def worker(storage_uri, limit, requests_per_worker, start_at, results):
+    app = create_limited_app(storage_uri, limit)
+    client = app.test_client()
+
+    # line all workers up so the hits really overlap
+    time.sleep(max(0.0, start_at - time.time()))
+
+    allowed = blocked = 0
+    started = time.perf_counter()
+
+    for _ in range(requests_per_worker):
+        status = client.post("/login").status_code
+        if status == 200:
+            allowed += 1
+        elif status == 429:
+            blocked += 1
+
+    results.put((allowed, blocked, time.perf_counter() - started))
+
+
+def run(storage_uri, workers, limit, requests_per_worker):
+    results = multiprocessing.Queue()
+    start_at = time.time() + 1.0
+
+    procs = [
+        multiprocessing.Process(
+            target=worker,
+            args=(storage_uri, limit, requests_per_worker, start_at, results)
+        )
+        for _ in range(workers)
+    ]
+
+    for p in procs:
+        p.start()
+
+    rows = [results.get() for _ in procs]
+
+    for p in procs:
+        p.join()
+
+    allowed = sum(r[0] for r in rows)
+    blocked = sum(r[1] for r in rows)
+    total = workers * requests_per_worker
+    slowest = max(r[2] for r in rows)
+
+    print(f"\nstorage   : {storage_uri}")
+    print(f"workers   : {workers} × {requests_per_worker} requests")
+    print(f"limit     : {limit} per minute (shared IP)")
+    print(f"allowed   : {allowed}   (expected {limit})")
+    print(f"blocked   : {blocked}")
+    print(f"throughput: {total / slowest:.0f} req/s")
+
+    if allowed == limit:
+        print("✅ limit enforced across processes")
+    else:
+        print(f"❌ over-admitted by {allowed - limit} (≈ {allowed / limit:.1f}× limit)")
+
+    return allowed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-process rate limiter load test")
+    parser.add_argument("--storage", action="append",
+                        help="storage URI (repeatable); default: memory:// and a temp SQLite file")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=100,
+                        help="requests per worker")
+    args = parser.parse_args()
+
+    storages = args.storage
+    tmp_dir = None
+
+    if not storages:
+        tmp_dir = tempfile.mkdtemp(prefix="ratelimit-")
+        sqlite_path = os.path.join(tmp_dir, "ratelimit.db")
+        storages = ["memory://", f"sql+sqlite:///{sqlite_path}"]
+
+        # create the table once, before workers race on it
+        rate_limit_storage.SQLStorage(storages[1])
+
+    for uri in storages:
+        run(uri, args.workers, args.limit, args.requests)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+/* ==================================================
+   BACKGROUND EXPORTS
+   <button data-export-url="/admin/exports/users?...">
+   → POST, poll status, download when ready
+================================================== */
+document.addEventListener("DOMContentLoaded", function () {
+
+  const csrfMeta = document.querySelector('meta[name="csrf-token"]');
+
+  document.querySelectorAll("[data-export-url]").forEach(function (btn) {
+
+    btn.addEventListener("click", function () {
+
+      const label = btn.innerHTML;
+      btn.disabled = true;
+      btn.innerText = "Queued...";
+
+      const reset = function (message) {
+        if (message) alert(message);
+        btn.disabled = false;
+        btn.innerHTML = label;
+      };
+
+      const poll = function (statusUrl) {
+        fetch(statusUrl, { headers: { "X-Requested-With": "XMLHttpRequest" } })
+          .then(res => {
+            if (!res.ok) throw new Error("Status failed");
+            return res.json();
+          })
+          .then(job => {
+            if (job.status === "done") {
+              reset();
+              window.location = job.download_url;
+            } else if (job.status === "failed") {
+              reset("Export failed. Please try again.");
+            } else {
+              btn.innerText = job.percent !== null
+                ? `Exporting ${job.percent}%`
+                : `Exporting ${job.rows_written} rows`;
+              setTimeout(() => poll(statusUrl), 2000);
+            }
+          })
+          .catch(() => reset("Could not check export status."));
+      };
+
+      fetch(btn.dataset.exportUrl, {
+        method: "POST",
+        headers: {
+          "X-CSRFToken": csrfMeta ? csrfMeta.getAttribute("content") : "",
+          "X-Requested-With": "XMLHttpRequest"
+        }
+      })
+        .then(res => {
+          if (!res.ok) throw new Error("Request failed");
+          return res.json();
+        })
+        .then(job => poll(job.status_url))
+        .catch(() => reset("Could not start export."));
+    });
+  });
+
+});
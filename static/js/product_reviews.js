@@ -0,0 +1,88 @@
+// ===============================
+// PDP REVIEWS (CURSOR PAGES ON SCROLL + SORT + HELPFUL)
+// ===============================
+
+document.addEventListener("DOMContentLoaded", () => {
+
+  const list = document.getElementById("reviewList");
+  const sentinel = document.getElementById("reviewSentinel");
+  const sortSelect = document.getElementById("reviewSort");
+
+  if (!list || !sentinel) return;
+
+  let nextCursor = list.dataset.nextCursor || "";
+  let sort = sortSelect ? sortSelect.value : "newest";
+  let loading = false;
+
+  // ---------- FETCH ONE PAGE ----------
+  async function loadPage(cursor, replace) {
+    if (loading) return;
+    loading = true;
+    sentinel.textContent = "Loading reviews...";
+
+    try {
+      const params = new URLSearchParams({ sort: sort, cursor: cursor });
+      const res = await fetch(`${list.dataset.url}?${params}`, {
+        headers: { "X-Requested-With": "XMLHttpRequest" }
+      });
+      const data = await res.json();
+
+      if (!data.success) throw new Error("reviews");
+
+      if (replace) list.innerHTML = "";
+      list.insertAdjacentHTML("beforeend", data.html);
+
+      nextCursor = data.next_cursor || "";
+      sentinel.textContent = "";
+
+    } catch (err) {
+      sentinel.textContent = "Could not load reviews.";
+    } finally {
+      loading = false;
+    }
+  }
+
+  // ---------- INFINITE SCROLL ----------
+  const observer = new IntersectionObserver((entries) => {
+    if (entries[0].isIntersecting && nextCursor) {
+      loadPage(nextCursor, false);
+    }
+  }, { rootMargin: "200px" });
+
+  observer.observe(sentinel);
+
+  // ---------- SORT ----------
+  if (sortSelect) {
+    sortSelect.addEventListener("change", () => {
+      sort = sortSelect.value;
+      loadPage("", true);
+    });
+  }
+
+  // ---------- HELPFUL VOTE ----------
+  list.addEventListener("click", async (e) => {
+    const btn = e.target.closest(".review-helpful");
+    if (!btn || btn.disabled) return;
+
+    btn.disabled = true;
+
+    const res = await fetch(`/api/reviews/${btn.dataset.reviewId}/helpful`, {
+      method: "POST",
+      headers: {
+        "X-CSRFToken": getCSRFToken(),
+        "X-Requested-With": "XMLHttpRequest"
+      }
+    });
+
+    if (res.status === 401) {
+      window.location.href = "/auth/login";
+      return;
+    }
+
+    const data = await res.json();
+    if (data.success) {
+      btn.querySelector(".helpful-count").textContent = data.helpful_count;
+    }
+  });
+
+});
@@ -386,9 +386,47 @@ checkPincodeBtn?.addEventListener("click", async () => {
 });
 
 /* ==========================
-   PLACE ORDER (PHASE-4 READY)
+   PLACE ORDER (COD)
+   same key for every retry of this checkout → never ordered twice
 ========================== */
-document.getElementById("placeOrderBtn")?.addEventListener("click", () => {
-  showToast?.("Checkout Coming Next 🚀", "info");
+const placeOrderBtn = document.getElementById("placeOrderBtn");
+let checkoutKey = crypto.randomUUID();
+
+placeOrderBtn?.addEventListener("click", async () => {
+  placeOrderBtn.disabled = true;
+
+  try {
+    const res = await fetch("/api/order/create", {
+      method: "POST",
+      headers: {
+        "Content-Type": "application/json",
+        "X-CSRFToken": csrfToken,
+        "Idempotency-Key": checkoutKey
+      },
+      body: JSON.stringify({})
+    });
+
+    const data = await res.json();
+
+    if (!data.success) {
+      showToast?.(data.message || "Order failed", "error");
+
+      // cart / stock changed → new attempt gets a new key
+      if (res.status === 409) {
+        checkoutKey = crypto.randomUUID();
+        loadCart();
+      }
+      return;
+    }
+
+    showToast?.(`Order ${data.order_number} placed 🎉`, "success");
+    checkoutKey = crypto.randomUUID();
+    loadCart();
+
+  } catch {
+    showToast?.("Unable to place order, please retry", "error");
+  } finally {
+    placeOrderBtn.disabled = false;
+  }
 });
 }
\ No newline at end of file
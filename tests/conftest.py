@@ -0,0 +1,18 @@
+"""
+Shared test settings. create_app() reads config.DevelopmentConfig, so
+overrides are patched onto the class for one test module and restored
+afterwards (nothing leaks into other modules).
+"""
+
+import pytest
+
+import config
+
+
+@pytest.fixture(scope="module")
+def config_patch():
+    with pytest.MonkeyPatch.context() as patch:
+        # the default limiter storage is the app DB URI from the env;
+        # per-process counters are enough for tests
+        patch.setattr(config.DevelopmentConfig, "RATELIMIT_STORAGE_URI", "memory://")
+        yield patch
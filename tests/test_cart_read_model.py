@@ -0,0 +1,145 @@
+"""
+Cart read model: hydrating a cart costs the same number of queries
+whatever its size (no N+1 over cart lines).
+"""
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.pool import StaticPool
+
+import config
+
+
+@pytest.fixture(scope="module")
+def app(config_patch):
+    # patched for this module only (restored by config_patch)
+    settings = {
+        "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+        "SQLALCHEMY_ENGINE_OPTIONS": {
+            "poolclass": StaticPool,
+            "connect_args": {"check_same_thread": False}
+        },
+        "SCHEDULER_API_ENABLED": False,
+        "EMAIL_OUTBOX_ASYNC": False,
+        "AUDIT_LOG_ASYNC": False,
+    }
+    for name, value in settings.items():
+        config_patch.setattr(config.DevelopmentConfig, name, value, raising=False)
+
+    from app import create_app
+    from app.extensions import db, scheduler
+
+    app = create_app()
+    app.config["TESTING"] = True
+
+    with app.app_context():
+        db.create_all()
+        yield app
+
+    if scheduler.running:
+        scheduler.shutdown(wait=False)
+
+
+@pytest.fixture(scope="module")
+def catalogue(app):
+    from app.extensions import db
+    from app.models import Category, Product, User
+
+    category = Category(name="Phones", slug="phones")
+    db.session.add(category)
+    db.session.flush()
+
+    products = [
+        Product(name=f"Phone {i}", sku=f"PHONE-{i}", category_id=category.id,
+                price=100 + i, stock=50, images=[f"img/{i}.png"])
+        for i in range(25)
+    ]
+    users = [
+        User(username=f"cart{i}", email=f"cart{i}@test.local",
+             notification_email=f"cart{i}@test.local", password_hash="x")
+        for i in range(2)
+    ]
+    db.session.add_all(products + users)
+    db.session.commit()
+
+    return products, users
+
+
+def _fill_cart(user, products):
+    from app.extensions import db
+    from app.models import CartItem
+
+    db.session.add_all([
+        CartItem(user_id=user.id, product_id=p.id, quantity=2, price_at_add=p.price)
+        for p in products
+    ])
+    db.session.commit()
+
+
+def _count_queries(app, user_id):
+    from app.extensions import db
+    from app.services.cart_read_model import load_cart
+
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.test_request_context("/api/cart"):
+        event.listen(db.engine, "before_cursor_execute", count)
+        try:
+            lines, pricing, adjusted = load_cart(user_id)
+        finally:
+            event.remove(db.engine, "before_cursor_execute", count)
+
+    return len(statements), lines, pricing, adjusted
+
+
+def test_cart_hydrates_in_constant_queries(app, catalogue):
+    products, (small, large) = catalogue
+
+    _fill_cart(small, products[:1])
+    _fill_cart(large, products)
+
+    one_item, lines, _, adjusted = _count_queries(app, small.id)
+    assert len(lines) == 1 and not adjusted
+
+    many_items, lines, pricing, adjusted = _count_queries(app, large.id)
+    assert len(lines) == len(products) and not adjusted
+
+    assert one_item == many_items
+    assert many_items <= 3
+
+    expected = sum((100 + i) * 2 for i in range(len(products)))
+    assert pricing["subtotal"] == expected
+
+
+def test_stale_lines_are_fixed_in_bulk(app, catalogue):
+    from app.extensions import db
+    from app.models import CartItem
+
+    products, (_, large) = catalogue
+
+    products[0].status = "INACTIVE"
+    products[1].stock = 0
+    products[2].stock = 1
+    db.session.commit()
+
+    corrected, lines, _, adjusted = _count_queries(app, large.id)
+    assert adjusted
+
+    # DELETE + release holds + UPDATE cart + UPDATE holds, whatever the count
+    assert corrected <= 3 + 4
+
+    quantities = dict(
+        db.session.query(CartItem.product_id, CartItem.quantity)
+        .filter(CartItem.user_id == large.id)
+    )
+    assert products[0].id not in quantities
+    assert products[1].id not in quantities
+    assert quantities[products[2].id] == 1
+    assert len(lines) == len(products) - 2
+
+    again, _, _, adjusted = _count_queries(app, large.id)
+    assert not adjusted
+    assert again <= 3